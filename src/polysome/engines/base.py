@@ -1,6 +1,8 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from itertools import islice
 
 # Configure logging
 logging.basicConfig(
@@ -13,6 +15,11 @@ class Engine(ABC):
     """Abstract base class for language model inference engines."""
 
     AVAILABLE = True
+    # Rough characters per token, for length estimates without a tokenizer
+    CHARS_PER_TOKEN = 4
+    # Whether a batch is padded to its longest prompt (memory grows with
+    # batch size x longest prompt rather than with the sum of prompts)
+    PADS_BATCHES = False
 
     @classmethod
     def is_available(cls) -> bool:
@@ -74,6 +81,98 @@ class Engine(ABC):
             results.append(result)
         return results
 
+    def submit_text_batch(
+        self,
+        messages_batch: List[List[Dict[str, str]]],
+        **kwargs: Any,
+    ) -> Future:
+        """
+        Submits a batch for generation and returns a future for its results.
+
+        Lets callers keep several batches in flight so the engine is never idle
+        between batches. The default implementation runs ``generate_text_batch``
+        synchronously and returns an already completed future; engines that can
+        queue work asynchronously should override this.
+
+        Args:
+            messages_batch: A list of message lists for batch processing.
+            **kwargs: Additional generation-specific options for the specific engine.
+        Returns:
+            A future resolving to the list of generated text strings.
+        """
+        future = Future()
+        try:
+            future.set_result(self.generate_text_batch(messages_batch, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def generate_text_stream(
+        self,
+        requests: Iterable[Tuple[Any, List[Dict[str, str]]]],
+        max_in_flight: int,
+        **kwargs: Any,
+    ) -> Iterator[Tuple[Any, Optional[str], Optional[Exception]]]:
+        """
+        Generates text for a stream of requests, yielding results as they complete.
+
+        Keeps up to ``max_in_flight`` requests running and pulls a new request
+        from ``requests`` as soon as one finishes, so a few long generations do
+        not hold back the rest. Results are yielded in completion order.
+
+        The default implementation falls back to consecutive
+        ``generate_text_batch`` calls of ``max_in_flight`` requests, since
+        models and tokenizers are rarely safe to drive from several threads.
+        Engines that can run requests independently (vLLM's request-level
+        API, the llama.cpp worker pool) override this.
+
+        Args:
+            requests: Iterable of (request_id, messages) pairs.
+            max_in_flight: Maximum number of concurrently running requests.
+            **kwargs: Additional generation-specific options for the specific engine.
+        Yields:
+            Tuples of (request_id, generated_text, error). Exactly one of
+            generated_text and error is None.
+        """
+        requests = iter(requests)
+        while True:
+            chunk = list(islice(requests, max_in_flight))
+            if not chunk:
+                return
+            try:
+                outputs = self.generate_text_batch([m for _, m in chunk], **kwargs)
+                for (request_id, _), output in zip(chunk, outputs):
+                    yield request_id, output, None
+            except Exception as e:
+                for request_id, _ in chunk:
+                    yield request_id, None, e
+
+    def count_prompt_tokens(self, messages_batch: List[List[Dict[str, str]]]) -> List[int]:
+        """
+        Estimates the prompt length in tokens of each message list.
+
+        Uses the engine tokenizer on the chat-templated prompts, encoding the
+        whole batch in one call, when a tokenizer is loaded. Otherwise, or if
+        tokenization fails, falls back to ``CHARS_PER_TOKEN`` characters per
+        token. Meant for batch planning, not for exact limits.
+
+        Args:
+            messages_batch: A list of message lists.
+        Returns:
+            A list of estimated token counts.
+        """
+        if self.tokenizer is not None:
+            try:
+                prompts = [self._apply_chat_template(messages) for messages in messages_batch]
+                input_ids = self.tokenizer(prompts, add_special_tokens=False)["input_ids"]
+                return [len(ids) for ids in input_ids]
+            except Exception as e:
+                logging.debug(f"Falling back to character-based token estimate: {e}")
+        return [
+            sum(len(m["content"]) for m in messages) // self.CHARS_PER_TOKEN + 1
+            for messages in messages_batch
+        ]
+
     def supports_native_batching(self) -> bool:
         """
         Returns whether this engine supports native batch processing.
@@ -5,6 +5,7 @@ from typing import Dict, Any, Optional, Tuple, List
 from dataclasses import dataclass
 from contextlib import contextmanager
 from polysome.engines.base import Engine
+from polysome.engines.request_scheduler import SharedEngineScheduler
 import json
 
 logger = logging.getLogger(__name__)
@@ -418,6 +419,7 @@ class EnginePool:
             return
             
         self._engines: Dict[str, EngineInfo] = {}
+        self._schedulers: Dict[str, SharedEngineScheduler] = {}
         self._defer_cleanup = False  # Flag to defer cleanup until workflow end
         self._initialized = True
         
@@ -530,6 +532,54 @@ class EnginePool:
                     del self._engines[engine_key]
             raise
     
+    def get_request_scheduler(
+        self,
+        engine_name: str,
+        model_name: str,
+        engine_options: Optional[Dict[str, Any]] = None,
+        node_id: str = "unknown",
+        max_batch_prompts: Optional[int] = None,
+    ) -> Optional[SharedEngineScheduler]:
+        """
+        Get the request scheduler for a loaded engine, creating it on first use.
+
+        All nodes sharing the engine get the same scheduler, so their batches
+        can be merged into common engine calls. The scheduler is configured by
+        the first node that asks for it.
+
+        Args:
+            engine_name: Name of the engine
+            model_name: Model identifier or path
+            engine_options: Engine-specific options (default: {})
+            node_id: ID of the requesting node (for logging)
+            max_batch_prompts: Upper bound on prompts per merged engine call
+
+        Returns:
+            The scheduler, or None if the engine is not loaded in the pool
+        """
+        if engine_options is None:
+            engine_options = {}
+
+        engine_key = self._generate_engine_key(engine_name, model_name, engine_options)
+        with self._lock_manager.timed_lock("scheduler acquisition", node_id):
+            engine_info = self._engines.get(engine_key)
+            if engine_info is None:
+                return None
+
+            scheduler = self._schedulers.get(engine_key)
+            if scheduler is None:
+                scheduler = SharedEngineScheduler(
+                    engine_info.engine,
+                    max_batch_prompts=max_batch_prompts,
+                    name=f"{engine_name}::{model_name}",
+                )
+                self._schedulers[engine_key] = scheduler
+                logger.info(
+                    f"Node '{node_id}': Created shared request scheduler for engine "
+                    f"'{engine_name}' model '{model_name}'"
+                )
+            return scheduler
+
     def set_defer_cleanup(self, defer: bool) -> None:
         """
         Set whether to defer engine cleanup until explicitly called.
@@ -567,6 +617,7 @@ class EnginePool:
         
         # Atomically decrement reference count and check if cleanup needed
         engine_to_unload = None
+        scheduler_to_stop = None
         with self._lock_manager.timed_lock("engine release", node_id) as lock_wait_time:
             if engine_key not in self._engines:
                 self._metrics.log_non_existent_engine_release(
@@ -585,6 +636,7 @@ class EnginePool:
                 # No more references and not deferring cleanup, prepare for unload
                 engine_to_unload = engine_info.engine
                 del self._engines[engine_key]
+                scheduler_to_stop = self._schedulers.pop(engine_key, None)
                 self._metrics.log_engine_release(
                     engine_name, model_name, node_id, ref_count, lock_wait_time,
                     scheduled_for_unload=True
@@ -596,6 +648,8 @@ class EnginePool:
                 )
         
         # Perform engine unloading outside the lock to prevent deadlock
+        if scheduler_to_stop is not None:
+            scheduler_to_stop.shutdown()
         if engine_to_unload is not None:
             self._lifecycle_manager.destroy_engine(
                 engine=engine_to_unload,
@@ -649,6 +703,7 @@ class EnginePool:
         
         # Find engines that need to be cleaned up
         engines_to_cleanup = []
+        schedulers_to_stop = []
         with self._lock_manager.timed_lock("force cleanup between engines", "system"):
             ref_counts = self._ref_counter.get_all_counts()
             
@@ -670,10 +725,14 @@ class EnginePool:
                     # Remove from pool immediately to prevent reuse
                     del self._engines[engine_key]
                     self._ref_counter.set_count(engine_key, 0)
+                    if engine_key in self._schedulers:
+                        schedulers_to_stop.append(self._schedulers.pop(engine_key))
                     
                     logger.debug(f"Marked engine for forced cleanup: {engine_key} (had {ref_count} refs)")
         
         # Perform cleanup outside the lock to prevent deadlock
+        for scheduler in schedulers_to_stop:
+            scheduler.shutdown()
         for engine_key, engine_info, ref_count in engines_to_cleanup:
             try:
                 logger.info(f"Force unloading engine: {engine_info.engine_name} (model: {engine_info.model_name})")
@@ -742,8 +801,12 @@ class EnginePool:
             # Clear the pool immediately
             self._engines.clear()
             self._ref_counter.clear()
+            schedulers_to_stop = list(self._schedulers.values())
+            self._schedulers.clear()
         
         # Perform cleanup outside the lock to prevent deadlock
+        for scheduler in schedulers_to_stop:
+            scheduler.shutdown()
         for engine_key, engine_info, ref_count in engines_to_cleanup:
             try:
                 self._metrics.log_force_unload_engine(
@@ -9,6 +9,9 @@ from typing import List, Dict, Any
 class HuggingFaceEngine(Engine):
     """Inference engine using Hugging Face Transformers library."""
 
+    # model.generate pads every prompt of a batch to the longest one
+    PADS_BATCHES = True
+
     def __init__(
         self,
         model_name: str,
@@ -25,15 +28,15 @@ class HuggingFaceEngine(Engine):
         self.model = None  # Initialize model attribute
         self.tokenizer = None  # Initialize tokenizer attribute
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
             if self.tokenizer.pad_token is None:
                 logging.warning(
                     "Tokenizer does not have a pad token. Setting to eos_token."
                 )
                 self.tokenizer.pad_token = self.tokenizer.eos_token
-                self.tokenizer.padding_side = (
-                    "left"  # Important for decoder-only models
-                )
+            # Decoder-only models continue from the last position, so batches
+            # must be left padded whatever the tokenizer default is
+            self.tokenizer.padding_side = "left"
 
             self.model = AutoModelForCausalLM.from_pretrained(
                 self.model_name,
@@ -129,41 +132,43 @@ class HuggingFaceEngine(Engine):
             
             logging.debug(f"Applied chat templates to {len(prompt_strings)} prompts")
 
-            # Tokenize all prompts in a batch
+            # Tokenize all prompts once, left padded to the longest prompt
             inputs = self.tokenizer(
-                prompt_strings, 
-                return_tensors="pt", 
+                prompt_strings,
+                return_tensors="pt",
                 return_attention_mask=True,
                 padding=True,  # Pad to the same length for batching
-                truncation=True  # Truncate if too long
+                truncation=True,  # Truncate if too long
+                padding_side="left",
             ).to(self.model.device)
-            
-            # Store original lengths for each item (before padding)
-            original_lengths = []
-            for prompt in prompt_strings:
-                tokenized = self.tokenizer(prompt, return_tensors="pt")
-                original_lengths.append(tokenized["input_ids"].shape[-1])
-            
-            logging.debug(f"Tokenized batch: {inputs['input_ids'].shape}, original lengths: {original_lengths}")
+
+            # With left padding every prompt ends at the padded width, and
+            # the generated tokens of all rows start right after it
+            padded_width = inputs["input_ids"].shape[-1]
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                prompt_lengths = inputs["attention_mask"].sum(dim=-1).tolist()
+                logging.debug(
+                    f"Tokenized batch: {tuple(inputs['input_ids'].shape)}, prompt lengths: {prompt_lengths}"
+                )
 
             # Generate for the entire batch
             with torch.inference_mode():
                 outputs = self.model.generate(**inputs, **kwargs)
 
-            # Decode each output individually
-            results = []
-            for i, output_ids in enumerate(outputs):
-                # Extract only the newly generated tokens (after original input)
-                original_length = original_lengths[i]
-                generation = output_ids[original_length:]
-                decoded_output = self.tokenizer.decode(generation, skip_special_tokens=True)
-                results.append(decoded_output.strip())
-            
+            # Decode only the newly generated tokens, for the whole batch at once
+            decoded_outputs = self.tokenizer.batch_decode(
+                outputs[:, padded_width:], skip_special_tokens=True
+            )
+            results = [decoded_output.strip() for decoded_output in decoded_outputs]
+
             logging.debug(f"HF batch generation completed successfully for {len(results)} items")
             return results
 
         except Exception as e:
             logging.exception(f"Error during HF batch text generation: {e}")
+            if isinstance(e, torch.cuda.OutOfMemoryError) and torch.cuda.is_available():
+                # Release the failed batch's blocks so a smaller retry can fit
+                torch.cuda.empty_cache()
             return [f"Error generating text with HF: {e}"] * len(messages_batch)
 
     def supports_native_batching(self) -> bool:
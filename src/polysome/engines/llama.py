@@ -1,5 +1,12 @@
+import itertools
 import logging
-from typing import List, Dict, Any, cast, TYPE_CHECKING
+import os
+import threading
+import time
+from multiprocessing import Pipe, Process, Queue
+from multiprocessing.connection import Connection, wait
+from queue import Empty
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Set, Tuple, cast, TYPE_CHECKING
 from polysome.engines.base import Engine  # Assuming this is the correct path
 
 if TYPE_CHECKING:
@@ -14,6 +21,373 @@ except ImportError as e:
     logging.debug(f"llama-cpp-python not available: {e}")
 
 
+def _completion_text(output: Any) -> str:
+    """Extract the response text of a create_chat_completion result."""
+    if output and output.get("choices"):
+        choice = output["choices"][0]
+        message = choice.get("message")
+        if message:
+            if (content := message.get("content")) is not None:
+                logging.debug(f"Llama.cpp Generated text: {content}")
+                return str(content).strip()
+            else:
+                logging.error("Llama.cpp message content is None.")
+                return "Error: Llama.cpp returned message with None content."
+        else:
+            logging.error("Llama.cpp choice missing 'message' field.")
+            return "Error: Llama.cpp returned unexpected choice format."
+    else:
+        logging.error(f"Llama.cpp returned no/empty choices: {output}")
+        return "Error: Llama.cpp generation failed."
+
+
+class _ResultSender:
+    """
+    Write end of one worker's result pipe, with the ``put`` of a queue.
+
+    Every worker reports on a pipe of its own: a queue shared by all
+    workers has a cross-process write lock, which stays held forever if a
+    worker dies while sending, and then blocks every other worker.
+    """
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+
+    def put(self, item: Any) -> None:
+        self.connection.send(item)
+
+
+def _llama_pool_worker(
+    rank: int,
+    model_path: str,
+    llama_kwargs: Dict[str, Any],
+    cpu_ids: Optional[List[int]],
+    task_queue: Queue,
+    result_queue: _ResultSender,
+):
+    """
+    Worker process owning one Llama instance.
+
+    Takes (batch_id, index, messages, kwargs) tasks from its task queue
+    until it receives None. Reports ("ready", rank, None, error) once loaded,
+    then ("done", rank, (batch_id, index), text) for every task.
+    """
+    if cpu_ids and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpu_ids)
+
+    try:
+        llm = Llama(model_path=model_path, **llama_kwargs)
+    except Exception as e:
+        result_queue.put(("ready", rank, None, f"{type(e).__name__}: {e}"))
+        return
+    result_queue.put(("ready", rank, None, None))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        batch_id, index, messages, kwargs = task
+        try:
+            text = _completion_text(llm.create_chat_completion(messages=messages, **kwargs))
+        except Exception as e:
+            logging.exception(f"Error during Llama.cpp generation in worker {rank}: {e}")
+            text = f"Error generating text with Llama.cpp: {e}"
+        result_queue.put(("done", rank, (batch_id, index), text))
+
+
+class LlamaCppWorkerPool:
+    """
+    Runs several Llama instances in worker processes and fans batches out
+    over them.
+
+    Each worker gets its own slice of the CPUs (``n_threads`` and, where
+    supported, CPU affinity), so instances do not compete for cores. GGUF
+    weights are memory-mapped (``use_mmap``), so all instances share one
+    copy of the weights through the OS page cache. Each idle worker is handed
+    the next prompt, which balances uneven generation lengths and tells the
+    pool exactly which prompt a crashed worker was holding.
+
+    The task each worker holds is tracked across batches, so a batch that was
+    abandoned (e.g. interrupted by a timeout) does not get new prompts queued
+    behind its unfinished ones. A worker that exceeds ``task_timeout`` on one
+    prompt is killed and restarted, and only that prompt fails.
+    """
+
+    STARTUP_TIMEOUT = 600.0
+    POLL_INTERVAL = 1.0
+    TASK_TIMEOUT = 600.0
+
+    def __init__(
+        self,
+        model_path: str,
+        llama_kwargs: Dict[str, Any],
+        num_instances: int,
+        pin_threads: bool = True,
+        worker_target: Optional[Callable] = None,
+        task_timeout: Optional[float] = None,
+    ):
+        self.model_path = model_path
+        self.llama_kwargs = llama_kwargs
+        self.num_instances = num_instances
+        self.pin_threads = pin_threads
+        self.worker_target = worker_target or _llama_pool_worker
+        self.task_timeout = task_timeout or self.TASK_TIMEOUT
+
+        self.task_queues: List[Queue] = []
+        # Read end of each worker's result pipe; None once it reported EOF
+        self.result_connections: List[Optional[Connection]] = []
+        self.processes: List[Process] = []
+        self._cpu_slices: List[List[int]] = []
+        self._dead_ranks = set()
+        # Restarted workers that have not finished loading the model
+        self._starting_ranks: Set[int] = set()
+        # Task held by each busy worker, (batch_id, index), and its deadline
+        self._busy: Dict[int, Tuple[Tuple[int, int], float]] = {}
+        self._lock = threading.Lock()
+        self._batch_counter = itertools.count()
+
+    @staticmethod
+    def _split_cpus(num_instances: int) -> List[List[int]]:
+        """Divide the CPUs available to this process into equal slices."""
+        if hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            cpus = list(range(os.cpu_count() or 1))
+        per_instance = max(1, len(cpus) // num_instances)
+        return [
+            cpus[rank * per_instance : (rank + 1) * per_instance] or cpus
+            for rank in range(num_instances)
+        ]
+
+    def _start_worker(self, rank: int) -> Process:
+        """Start the worker process of one rank with a fresh task queue and result pipe."""
+        cpu_ids = self._cpu_slices[rank]
+        worker_kwargs = {"n_threads": len(cpu_ids), "use_mmap": True, **self.llama_kwargs}
+        task_queue = Queue()
+        receiver, sender = Pipe(duplex=False)
+        process = Process(
+            target=self.worker_target,
+            args=(
+                rank,
+                self.model_path,
+                worker_kwargs,
+                cpu_ids if self.pin_threads else None,
+                task_queue,
+                _ResultSender(sender),
+            ),
+            daemon=True,
+        )
+        process.start()
+        # Only the worker keeps the write end, so its exit closes the pipe
+        sender.close()
+        if rank < len(self.processes):
+            self.task_queues[rank] = task_queue
+            old_receiver = self.result_connections[rank]
+            if old_receiver is not None:
+                old_receiver.close()
+            self.result_connections[rank] = receiver
+            self.processes[rank] = process
+        else:
+            self.task_queues.append(task_queue)
+            self.result_connections.append(receiver)
+            self.processes.append(process)
+        return process
+
+    def _get_result(self, timeout: float) -> Tuple[str, int, Any, Optional[str]]:
+        """
+        Return the next message of any worker, like ``Queue.get``.
+
+        Raises:
+            Empty: If no worker reported within ``timeout``.
+        """
+        connections = [c for c in self.result_connections if c is not None]
+        for connection in wait(connections, timeout):
+            try:
+                return connection.recv()
+            except (EOFError, OSError):
+                # The worker exited; _check_workers handles its task
+                rank = self.result_connections.index(connection)
+                self.result_connections[rank] = None
+                connection.close()
+        raise Empty
+
+    def start(self) -> None:
+        """Start the workers and wait until every instance has loaded the model."""
+        self._cpu_slices = self._split_cpus(self.num_instances)
+        for rank in range(self.num_instances):
+            self._start_worker(rank)
+        logging.info(
+            f"Started {self.num_instances} llama.cpp workers with "
+            f"{len(self._cpu_slices[0])} threads each for {self.model_path}"
+        )
+
+        ready, errors = set(), []
+        deadline = time.time() + self.STARTUP_TIMEOUT
+        while len(ready) + len(errors) < self.num_instances:
+            if time.time() > deadline:
+                errors.append(f"timed out after {self.STARTUP_TIMEOUT}s")
+                break
+            try:
+                kind, rank, _, error = self._get_result(self.POLL_INTERVAL)
+            except Empty:
+                exited = [r for r, p in enumerate(self.processes) if not p.is_alive() and r not in ready]
+                if exited:
+                    errors.append(f"workers {exited} exited during startup")
+                    break
+                continue
+            if kind != "ready":
+                continue
+            if error is None:
+                ready.add(rank)
+            else:
+                errors.append(f"worker {rank}: {error}")
+
+        if errors:
+            self.shutdown()
+            raise RuntimeError(f"Failed to start llama.cpp workers: {'; '.join(errors)}")
+
+    def generate(self, messages_batch: List[List[Dict[str, str]]], kwargs: Dict[str, Any]) -> List[str]:
+        """Generate a batch across all workers and return results in input order."""
+        results: List[Optional[str]] = [None] * len(messages_batch)
+        for index, text in self.generate_stream(enumerate(messages_batch), kwargs):
+            results[index] = text
+        return cast(List[str], results)
+
+    def generate_stream(
+        self,
+        requests: Iterable[Tuple[Any, List[Dict[str, str]]]],
+        kwargs: Dict[str, Any],
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[Tuple[Any, str]]:
+        """
+        Generate a stream of requests, yielding (request_id, text) as workers finish.
+
+        Each idle worker is handed the next request as soon as it is free, so
+        a long generation only occupies its own worker. Requests are pulled
+        from ``requests`` lazily. A prompt whose worker died or timed out
+        yields error text, like ``generate``.
+
+        Args:
+            requests: Iterable of (request_id, messages) pairs.
+            kwargs: Generation options passed to create_chat_completion().
+            max_in_flight: Upper bound on running requests; defaults to one
+                per worker.
+        """
+        with self._lock:
+            batch_id = next(self._batch_counter)
+            requests = enumerate(requests)
+            # Request id of each index still running
+            running: Dict[int, Any] = {}
+            limit = max_in_flight or len(self.processes)
+            exhausted = False
+
+            def dispatch():
+                nonlocal exhausted
+                for rank in range(len(self.processes)):
+                    if exhausted or len(running) >= limit:
+                        return
+                    if (
+                        rank in self._busy
+                        or rank in self._dead_ranks
+                        or rank in self._starting_ranks
+                    ):
+                        continue
+                    try:
+                        index, (request_id, messages) = next(requests)
+                    except StopIteration:
+                        exhausted = True
+                        return
+                    running[index] = request_id
+                    self._busy[rank] = ((batch_id, index), time.time() + self.task_timeout)
+                    self.task_queues[rank].put((batch_id, index, messages, kwargs))
+
+            dispatch()
+            next_check = time.time() + self.POLL_INTERVAL
+            while running or not exhausted:
+                try:
+                    kind, rank, task_id, text = self._get_result(self.POLL_INTERVAL)
+                except Empty:
+                    kind = None
+                if kind == "ready":
+                    # A restarted worker finished loading, or failed to
+                    self._starting_ranks.discard(rank)
+                    if text is not None:
+                        logging.error(f"llama.cpp worker {rank} failed to restart: {text}")
+                        self._dead_ranks.add(rank)
+                elif kind == "done":
+                    if rank in self._busy and self._busy[rank][0] == task_id:
+                        del self._busy[rank]
+                    if task_id[0] == batch_id and task_id[1] in running:
+                        yield running.pop(task_id[1]), text
+                    # Otherwise left over from an earlier, abandoned batch
+                if kind is None or time.time() >= next_check:
+                    next_check = time.time() + self.POLL_INTERVAL
+                    for index, error_text in self._check_workers(batch_id):
+                        if index in running:
+                            yield running.pop(index), error_text
+                dispatch()
+
+    def _check_workers(self, batch_id: int) -> List[Tuple[int, str]]:
+        """
+        Fail the prompt of any worker that died or exceeded task_timeout.
+
+        A worker past its deadline is killed and restarted. Raises if no
+        workers are left.
+
+        Returns:
+            (index, error text) of the failed prompts of batch ``batch_id``.
+        """
+        failed = []
+        now = time.time()
+        for rank, process in enumerate(self.processes):
+            if rank in self._dead_ranks:
+                continue
+            task = self._busy.get(rank)
+            if process.is_alive():
+                if task is None or now < task[1]:
+                    continue
+                logging.error(
+                    f"llama.cpp worker {rank} exceeded task_timeout of {self.task_timeout}s, "
+                    f"restarting it"
+                )
+                process.kill()
+                process.join(timeout=5)
+                self._start_worker(rank)
+                self._starting_ranks.add(rank)
+                error = f"worker {rank} timed out after {self.task_timeout}s"
+            else:
+                self._dead_ranks.add(rank)
+                self._starting_ranks.discard(rank)
+                logging.error(f"llama.cpp worker {rank} exited with code {process.exitcode}")
+                error = f"worker {rank} exited"
+            self._busy.pop(rank, None)
+            if task is not None and task[0][0] == batch_id:
+                # Not retried: the prompt may be what crashed or hung the worker
+                failed.append((task[0][1], f"Error generating text with Llama.cpp: {error}"))
+        if len(self._dead_ranks) == len(self.processes):
+            raise RuntimeError("All llama.cpp workers have exited")
+        return failed
+
+    def shutdown(self) -> None:
+        """Stop all workers."""
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=5)
+        for connection in self.result_connections:
+            if connection is not None:
+                connection.close()
+        self.processes = []
+        self.task_queues = []
+        self.result_connections = []
+        self._busy.clear()
+        self._starting_ranks.clear()
+        logging.info(f"Shut down llama.cpp workers for {self.model_path}")
+
+
 class LlamaCppEngine(Engine):
     """
     Inference engine using the llama-cpp-python library for GGUF models.
@@ -32,6 +406,23 @@ class LlamaCppEngine(Engine):
             raise RuntimeError("llama-cpp-python library not installed")
         super().__init__(model_name)
         self.llm = None
+        self.pool = None
+
+        # --- Multi-instance mode: one Llama per worker process ---
+        num_instances = kwargs.pop("num_instances", 1)
+        pin_threads = kwargs.pop("pin_threads", True)
+        task_timeout = kwargs.pop("task_timeout", None)
+        if num_instances > 1:
+            if kwargs.get("n_gpu_layers", 0) != 0:
+                logging.warning(
+                    "num_instances > 1 with GPU offload loads one copy of the "
+                    "offloaded layers per instance into GPU memory."
+                )
+            self.pool = LlamaCppWorkerPool(
+                model_name, kwargs, num_instances, pin_threads, task_timeout=task_timeout
+            )
+            self.pool.start()
+            return
 
         # --- GPU Detection and Fallback Logic ---
         original_gpu_layers = kwargs.get('n_gpu_layers', 0)
@@ -87,6 +478,8 @@ class LlamaCppEngine(Engine):
         **kwargs: Any,
     ) -> str:
         logging.debug(f"Generating text for {len(messages)} messages.")
+        if self.pool is not None:
+            return self.pool.generate([messages], kwargs)[0]
         if not self.llm:
             raise RuntimeError("Llama.cpp LLM object not initialized.")
 
@@ -99,22 +492,7 @@ class LlamaCppEngine(Engine):
                 self.llm.create_chat_completion(messages=typed_messages, **kwargs),
             )
             # --- Extract the response ---
-            if output and output.get("choices"):
-                choice = output["choices"][0]
-                message = choice.get("message")
-                if message:
-                    if (content := message.get("content")) is not None:
-                        logging.debug(f"Llama.cpp Generated text: {content}")
-                        return str(content).strip()
-                    else:
-                        logging.error("Llama.cpp message content is None.")
-                        return "Error: Llama.cpp returned message with None content."
-                else:
-                    logging.error("Llama.cpp choice missing 'message' field.")
-                    return "Error: Llama.cpp returned unexpected choice format."
-            else:
-                logging.error(f"Llama.cpp returned no/empty choices: {output}")
-                return "Error: Llama.cpp generation failed."
+            return _completion_text(output)
 
         except Exception as e:
             logging.exception(f"Error during Llama.cpp generation: {e}")
@@ -127,8 +505,10 @@ class LlamaCppEngine(Engine):
         **kwargs: Any,
     ) -> List[str]:
         """
-        Generates text for a batch of message lists using simulated batching.
-        LlamaCpp does not support native batching, so this processes items sequentially.
+        Generates text for a batch of message lists.
+
+        With ``num_instances`` > 1 the batch is spread over the worker
+        processes. A single instance processes the items sequentially.
         
         Args:
             messages_batch: A list of message lists, where each message list 
@@ -138,6 +518,9 @@ class LlamaCppEngine(Engine):
         Returns:
             A list of generated text strings.
         """
+        if self.pool is not None:
+            return self.pool.generate(messages_batch, kwargs)
+
         logging.warning(
             f"LlamaCpp engine does not support native batching. "
             f"Processing {len(messages_batch)} items sequentially."
@@ -152,17 +535,39 @@ class LlamaCppEngine(Engine):
         logging.debug(f"LlamaCpp simulated batch processing completed for {len(results)} items")
         return results
 
+    def generate_text_stream(
+        self,
+        requests: Iterable[Tuple[Any, List[Dict[str, str]]]],
+        max_in_flight: int,
+        **kwargs: Any,
+    ) -> Iterator[Tuple[Any, Optional[str], Optional[Exception]]]:
+        """
+        Generates text for a stream of requests, yielding results as they complete.
+
+        With ``num_instances`` > 1 every worker takes the next request as soon
+        as it is done, so results come in completion order. A single instance
+        falls back to the default consecutive batches.
+        """
+        if self.pool is None:
+            yield from super().generate_text_stream(requests, max_in_flight, **kwargs)
+            return
+        for request_id, text in self.pool.generate_stream(requests, kwargs, max_in_flight):
+            yield request_id, text, None
+
     def supports_native_batching(self) -> bool:
         """
-        LlamaCpp does not support native batch processing.
+        Batches run in parallel only with a pool of several instances.
         """
-        return False
+        return self.pool is not None
 
     def unload_model(self) -> None:
         """
         Unloads the llama.cpp model from memory to free up GPU/CPU resources.
         """
-        if self.llm is not None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        elif self.llm is not None:
             logging.info(f"Unloading llama.cpp model: {self.model_name}")
             try:
                 # llama-cpp-python doesn't have an explicit unload method,
@@ -0,0 +1,232 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from polysome.engines.base import Engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingRequest:
+    """A batch of prompts submitted by one node, waiting to be dispatched."""
+
+    node_id: str
+    messages_batch: List[List[Dict[str, str]]]
+    generation_options: Dict[str, Any]
+    options_key: str
+    future: Future = field(default_factory=Future)
+
+
+class SharedEngineScheduler:
+    """
+    Multiplexes batch requests from several nodes onto one shared engine.
+
+    Nodes that share an engine (same engine key in the EnginePool) submit their
+    batches here instead of calling ``generate_text_batch`` directly. A single
+    dispatcher thread merges pending requests with identical generation options
+    into one engine call and hands each node back exactly its own slice of the
+    results, in submission order. This keeps engines with continuous batching
+    (e.g. vLLM) saturated while sibling nodes run concurrently.
+
+    Nodes count prompt tokens through :meth:`count_prompt_tokens` as well, so
+    the engine tokenizer is never used by a node while the dispatcher runs a
+    batch on it.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_batch_prompts: Optional[int] = None,
+        coalesce_window: float = 0.05,
+        name: str = "engine",
+    ):
+        """
+        Args:
+            engine: The shared engine to dispatch to.
+            max_batch_prompts: Upper bound on prompts per merged engine call.
+                A single request larger than this is still sent whole.
+                None means no limit.
+            coalesce_window: Seconds to wait after the first pending request
+                for sibling requests to arrive before dispatching.
+            name: Label used in log messages.
+        """
+        self.engine = engine
+        self.max_batch_prompts = max_batch_prompts
+        self.coalesce_window = coalesce_window
+        self.name = name
+
+        self._pending: Deque[_PendingRequest] = deque()
+        self._condition = threading.Condition()
+        # Held for every use of the engine; tokenizers are not thread safe
+        self._engine_lock = threading.Lock()
+        self._shutdown = False
+        self._merged_calls = 0
+        self._requests_served = 0
+
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop,
+            name=f"polysome-scheduler-{name}",
+            daemon=True,
+        )
+        self._dispatcher.start()
+
+    def submit(
+        self,
+        messages_batch: List[List[Dict[str, str]]],
+        node_id: str = "unknown",
+        **generation_options: Any,
+    ) -> Future:
+        """
+        Queue a batch for generation.
+
+        Returns:
+            Future resolving to the list of generated texts for this batch.
+        """
+        request = _PendingRequest(
+            node_id=node_id,
+            messages_batch=messages_batch,
+            generation_options=generation_options,
+            options_key=json.dumps(generation_options, sort_keys=True, default=str),
+        )
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError(f"Scheduler for '{self.name}' has been shut down")
+            self._pending.append(request)
+            self._condition.notify()
+        return request.future
+
+    def generate_text_batch(
+        self,
+        messages_batch: List[List[Dict[str, str]]],
+        node_id: str = "unknown",
+        timeout: Optional[float] = None,
+        **generation_options: Any,
+    ) -> List[str]:
+        """
+        Blocking counterpart of :meth:`submit`.
+
+        Raises:
+            TimeoutError: If the results are not available within ``timeout``.
+        """
+        future = self.submit(messages_batch, node_id=node_id, **generation_options)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(
+                f"Shared batch for node '{node_id}' timed out after {timeout} seconds"
+            )
+
+    def count_prompt_tokens(self, messages_batch: List[List[Dict[str, str]]]) -> List[int]:
+        """
+        Estimate prompt lengths with the shared engine's tokenizer.
+
+        Waits for a running engine call to finish, since the tokenizer is
+        shared with it.
+        """
+        with self._engine_lock:
+            return self.engine.count_prompt_tokens(messages_batch)
+
+    def _take_compatible_requests(self) -> List[_PendingRequest]:
+        """Pop the oldest request plus any queued requests with the same options."""
+        first = self._pending.popleft()
+        selected = [first]
+        prompt_count = len(first.messages_batch)
+
+        remaining: Deque[_PendingRequest] = deque()
+        while self._pending:
+            request = self._pending.popleft()
+            fits = (
+                self.max_batch_prompts is None
+                or prompt_count + len(request.messages_batch) <= self.max_batch_prompts
+            )
+            if request.options_key == first.options_key and fits:
+                selected.append(request)
+                prompt_count += len(request.messages_batch)
+            else:
+                remaining.append(request)
+        self._pending = remaining
+        return selected
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown and not self._pending:
+                    return
+
+            # Give sibling nodes a moment to submit their next batch
+            if self.coalesce_window > 0:
+                time.sleep(self.coalesce_window)
+
+            with self._condition:
+                if not self._pending:
+                    continue
+                requests = [
+                    r for r in self._take_compatible_requests()
+                    if r.future.set_running_or_notify_cancel()
+                ]
+            if requests:
+                self._run_merged(requests)
+
+    def _run_merged(self, requests: List[_PendingRequest]) -> None:
+        merged_messages: List[List[Dict[str, str]]] = []
+        for request in requests:
+            merged_messages.extend(request.messages_batch)
+
+        node_ids = sorted({r.node_id for r in requests})
+        logger.debug(
+            f"Scheduler '{self.name}': dispatching {len(merged_messages)} prompts "
+            f"from {len(requests)} request(s) of nodes {node_ids}"
+        )
+
+        try:
+            with self._engine_lock:
+                outputs = self.engine.generate_text_batch(
+                    merged_messages, **requests[0].generation_options
+                )
+            if len(outputs) != len(merged_messages):
+                raise RuntimeError(
+                    f"Engine returned {len(outputs)} outputs for {len(merged_messages)} prompts"
+                )
+        except Exception as e:
+            logger.error(f"Scheduler '{self.name}': merged batch failed: {e}")
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        offset = 0
+        for request in requests:
+            count = len(request.messages_batch)
+            request.future.set_result(outputs[offset : offset + count])
+            offset += count
+
+        self._merged_calls += 1
+        self._requests_served += len(requests)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return dispatch counters for logging."""
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            "merged_calls": self._merged_calls,
+            "requests_served": self._requests_served,
+            "pending_requests": pending,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the dispatcher after draining already queued requests."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait and self._dispatcher.is_alive():
+            self._dispatcher.join()
+        logger.debug(f"Scheduler '{self.name}' shut down: {self.get_stats()}")
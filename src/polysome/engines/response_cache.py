@@ -0,0 +1,364 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from polysome.engines.base import Engine
+
+logger = logging.getLogger(__name__)
+
+# Engines report generation failures as text starting with this prefix
+_ERROR_PREFIX = "Error"
+
+_caches: Dict[Path, "ResponseCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def is_deterministic(generation_options: Dict[str, Any]) -> bool:
+    """
+    Whether generation with these options always returns the same completion.
+
+    True for greedy decoding (temperature 0 or ``do_sample=False``) and for
+    sampling with a fixed seed. Without an explicit setting the engine default
+    applies, which samples.
+    """
+    if generation_options.get("seed") is not None:
+        return True
+    if generation_options.get("do_sample") is False:
+        return True
+    temperature = generation_options.get("temperature")
+    return temperature is not None and float(temperature) == 0.0
+
+
+def cache_key(
+    context: Dict[str, Any],
+    generation_options: Dict[str, Any],
+    messages: Any,
+) -> str:
+    """
+    Content hash identifying one completion.
+
+    Args:
+        context: Engine identity: engine name, model name and engine options.
+        generation_options: Generation options of the request.
+        messages: The rendered messages sent to the engine.
+    """
+    payload = json.dumps(
+        [context, generation_options, messages],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk store of completions in SQLite, evicting least recently used
+    entries once the stored text exceeds ``max_bytes``.
+
+    A single connection is shared by all threads and serialised with a lock.
+    Use ``get_response_cache`` to share one instance per file between nodes.
+    """
+
+    # Fraction of max_bytes to shrink to when evicting, so eviction is batched
+    EVICT_TO = 0.9
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Return the cached responses for those of ``keys`` that are present."""
+        if not keys:
+            return {}
+        found: Dict[str, str] = {}
+        with self._lock:
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, response FROM responses WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE responses SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Store (key, response) pairs, evicting old entries if over budget."""
+        now = time.time()
+        rows = [(key, response, len(response.encode("utf-8")), now) for key, response in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for key, _, size, _ in rows:
+                    replaced = self._conn.execute(
+                        "SELECT size FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    self._size += size - (replaced[0] if replaced else 0)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO responses (key, response, size, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                if self._size > self.max_bytes:
+                    self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._size = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()[0]
+                raise
+
+    def _evict(self) -> None:
+        """Delete least recently used entries down to EVICT_TO of the budget."""
+        target = self.max_bytes * self.EVICT_TO
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ):
+            if self._size <= target:
+                break
+            doomed.append((key,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+        logger.debug(f"Evicted {len(doomed)} entries from response cache {self.path}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size_bytes": self._size,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def get_response_cache(path: Path, max_bytes: int) -> ResponseCache:
+    """Return the process-wide ResponseCache for ``path``, opening it if needed."""
+    path = Path(path).resolve()
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ResponseCache(path, max_bytes)
+            _caches[path] = cache
+        else:
+            cache.max_bytes = max(cache.max_bytes, max_bytes)
+        return cache
+
+
+class CachedEngine(Engine):
+    """
+    Engine wrapper that serves repeated deterministic requests from a
+    ResponseCache.
+
+    Only requests whose generation options are deterministic (see
+    ``is_deterministic``) are looked up; all others, and every cache miss,
+    go to the wrapped engine. Error outputs are never stored.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        cache: ResponseCache,
+        engine_name: str,
+        engine_options: Optional[Dict[str, Any]] = None,
+    ):
+        # No super().__init__: the wrapped engine owns the model
+        self.engine = engine
+        self.cache = cache
+        self.model_name = engine.model_name
+        self.tokenizer = getattr(engine, "tokenizer", None)
+        self.PADS_BATCHES = engine.PADS_BATCHES
+        # Lookups made through this wrapper; the cache counts all users
+        self.hits = 0
+        self.misses = 0
+        self._context = {
+            "engine": engine_name,
+            "model": engine.model_name,
+            "engine_options": engine_options or {},
+        }
+
+    def _lookup(
+        self, messages_batch: List[Any], kwargs: Dict[str, Any]
+    ) -> Tuple[List[Optional[str]], List[str], List[int]]:
+        """Return (results with None for misses, keys, miss indices)."""
+        keys = [cache_key(self._context, kwargs, messages) for messages in messages_batch]
+        found = self.cache.get_many(keys)
+        results = [found.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        self.hits += len(keys) - len(misses)
+        self.misses += len(misses)
+        return results, keys, misses
+
+    def _store(self, keys: List[str], outputs: List[Any]) -> None:
+        try:
+            self.cache.put_many(
+                (key, output)
+                for key, output in zip(keys, outputs)
+                if isinstance(output, str) and not output.startswith(_ERROR_PREFIX)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not store responses in cache {self.cache.path}: {e}")
+
+    def generate_batch_cached(
+        self,
+        messages_batch: List[List[Dict[str, str]]],
+        generate: Callable[[List[List[Dict[str, str]]]], List[str]],
+        generation_options: Dict[str, Any],
+    ) -> List[str]:
+        """
+        Run ``generate`` for the cache misses of a batch only.
+
+        Lets callers that do not go through this engine directly, such as the
+        shared request scheduler, still benefit from the cache.
+        """
+        if not is_deterministic(generation_options):
+            return generate(messages_batch)
+        results, keys, misses = self._lookup(messages_batch, generation_options)
+        if misses:
+            outputs = generate([messages_batch[i] for i in misses])
+            self._store([keys[i] for i in misses], outputs)
+            for i, output in zip(misses, outputs):
+                results[i] = output
+        return results
+
+    def submit_batch_cached(
+        self,
+        messages_batch: List[List[Dict[str, str]]],
+        submit: Callable[[List[List[Dict[str, str]]]], Future],
+        generation_options: Dict[str, Any],
+    ) -> Future:
+        """Like ``generate_batch_cached`` for an asynchronous ``submit``."""
+        if not is_deterministic(generation_options):
+            return submit(messages_batch)
+        results, keys, misses = self._lookup(messages_batch, generation_options)
+        future = Future()
+        if not misses:
+            future.set_result(results)
+            return future
+
+        def merge(inner: Future) -> None:
+            try:
+                outputs = inner.result()
+            except Exception as e:
+                future.set_exception(e)
+                return
+            self._store([keys[i] for i in misses], outputs)
+            for i, output in zip(misses, outputs):
+                results[i] = output
+            future.set_result(results)
+
+        submit([messages_batch[i] for i in misses]).add_done_callback(merge)
+        return future
+
+    def generate_text(self, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+        return self.generate_batch_cached(
+            [messages], lambda batch: [self.engine.generate_text(batch[0], **kwargs)], kwargs
+        )[0]
+
+    def generate_text_batch(
+        self, messages_batch: List[List[Dict[str, str]]], **kwargs: Any
+    ) -> List[str]:
+        return self.generate_batch_cached(
+            messages_batch, lambda batch: self.engine.generate_text_batch(batch, **kwargs), kwargs
+        )
+
+    def submit_text_batch(
+        self, messages_batch: List[List[Dict[str, str]]], **kwargs: Any
+    ) -> Future:
+        return self.submit_batch_cached(
+            messages_batch, lambda batch: self.engine.submit_text_batch(batch, **kwargs), kwargs
+        )
+
+    def generate_text_stream(
+        self,
+        requests: Iterable[Tuple[Any, List[Dict[str, str]]]],
+        max_in_flight: int,
+        **kwargs: Any,
+    ) -> Iterator[Tuple[Any, Optional[str], Optional[Exception]]]:
+        if not is_deterministic(kwargs):
+            yield from self.engine.generate_text_stream(requests, max_in_flight, **kwargs)
+            return
+
+        keys: Dict[Any, str] = {}
+        hits: Deque[Tuple[Any, str]] = deque()
+
+        def misses():
+            # Answer hits inline; only misses take an engine slot
+            for request_id, messages in requests:
+                results, request_keys, _ = self._lookup([messages], kwargs)
+                if results[0] is not None:
+                    hits.append((request_id, results[0]))
+                    continue
+                keys[request_id] = request_keys[0]
+                yield request_id, messages
+
+        for request_id, output, error in self.engine.generate_text_stream(
+            misses(), max_in_flight, **kwargs
+        ):
+            while hits:
+                yield (*hits.popleft(), None)
+            key = keys.pop(request_id)
+            if error is None:
+                self._store([key], [output])
+            yield request_id, output, error
+        while hits:
+            yield (*hits.popleft(), None)
+
+    def count_prompt_tokens(self, messages_batch: List[List[Dict[str, str]]]) -> List[int]:
+        return self.engine.count_prompt_tokens(messages_batch)
+
+    def supports_native_batching(self) -> bool:
+        return self.engine.supports_native_batching()
+
+    def unload_model(self) -> None:
+        self.engine.unload_model()
@@ -1,5 +1,6 @@
+import itertools
 import logging
-from typing import List, Dict, Any, TYPE_CHECKING
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
 from polysome.engines.base import Engine
 
 if TYPE_CHECKING:
@@ -48,6 +49,7 @@ class VLLMEngine(Engine):
         
         super().__init__(model_name)
         self.llm = None
+        self._request_counter = itertools.count()
         
         # Set default values for common vLLM parameters
         vllm_kwargs = {
@@ -75,6 +77,23 @@ class VLLMEngine(Engine):
             logger.error(f"Failed to initialize vLLM engine for model {model_name}: {e}")
             raise
 
+    def _build_sampling_params(self, kwargs: Dict[str, Any]) -> "SamplingParams":
+        """Convert generation kwargs to SamplingParams with the engine defaults."""
+        # Set defaults for common parameters
+        sampling_kwargs = {
+            "temperature": 1.0,
+            "top_p": 1.0,
+            "top_k": -1,
+            "max_tokens": 16,
+            **kwargs
+        }
+
+        # Handle max_new_tokens -> max_tokens conversion for compatibility
+        if "max_new_tokens" in sampling_kwargs:
+            sampling_kwargs["max_tokens"] = sampling_kwargs.pop("max_new_tokens")
+
+        return SamplingParams(**sampling_kwargs)
+
     def generate_text(
         self,
         messages: List[Dict[str, str]],
@@ -111,20 +130,7 @@ class VLLMEngine(Engine):
             logger.debug(f"Applied chat template, prompt length: {len(prompt_string)}")
 
             # Convert generation kwargs to SamplingParams
-            # Set defaults for common parameters
-            sampling_kwargs = {
-                "temperature": 1.0,
-                "top_p": 1.0,
-                "top_k": -1,
-                "max_tokens": 16,
-                **kwargs
-            }
-            
-            # Handle max_new_tokens -> max_tokens conversion for compatibility
-            if "max_new_tokens" in sampling_kwargs:
-                sampling_kwargs["max_tokens"] = sampling_kwargs.pop("max_new_tokens")
-            
-            sampling_params = SamplingParams(**sampling_kwargs)
+            sampling_params = self._build_sampling_params(kwargs)
             logger.debug(f"Created SamplingParams: {sampling_params}")
 
             # Generate text using vLLM
@@ -182,19 +188,7 @@ class VLLMEngine(Engine):
             logger.debug(f"Applied chat templates to {len(prompt_strings)} prompts")
 
             # Convert generation kwargs to SamplingParams
-            sampling_kwargs = {
-                "temperature": 1.0,
-                "top_p": 1.0,
-                "top_k": -1,
-                "max_tokens": 16,
-                **kwargs
-            }
-            
-            # Handle max_new_tokens -> max_tokens conversion for compatibility
-            if "max_new_tokens" in sampling_kwargs:
-                sampling_kwargs["max_tokens"] = sampling_kwargs.pop("max_new_tokens")
-            
-            sampling_params = SamplingParams(**sampling_kwargs)
+            sampling_params = self._build_sampling_params(kwargs)
             logger.debug(f"Created SamplingParams for batch: {sampling_params}")
 
             # Generate text using vLLM batch processing
@@ -226,6 +220,89 @@ class VLLMEngine(Engine):
             logger.exception(f"Error during vLLM batch text generation: {e}")
             return [f"Error generating text with vLLM: {e}"] * len(messages_batch)
 
+    def generate_text_stream(
+        self,
+        requests: Iterable[Tuple[Any, List[Dict[str, str]]]],
+        max_in_flight: int,
+        **kwargs: Any,
+    ) -> Iterator[Tuple[Any, Optional[str], Optional[Exception]]]:
+        """
+        Generates text for a stream of requests using vLLM's request-level API.
+
+        Requests are added to the underlying LLMEngine one at a time and the
+        engine is stepped directly, so a finished request is yielded and
+        replaced by a new one immediately instead of waiting for the slowest
+        request of a batch.
+
+        Args:
+            requests: Iterable of (request_id, messages) pairs.
+            max_in_flight: Maximum number of requests queued in the engine.
+            **kwargs: Generation parameters that will be converted to SamplingParams.
+
+        Yields:
+            Tuples of (request_id, generated_text, error) in completion order.
+        """
+        if not self.llm:
+            raise RuntimeError("vLLM model not initialized")
+
+        llm_engine = self.llm.llm_engine
+        sampling_params = self._build_sampling_params(kwargs)
+        requests = iter(requests)
+        in_flight: Dict[str, Any] = {}
+        failed: List[Tuple[Any, Exception]] = []
+
+        def refill():
+            for request_id, messages in itertools.islice(requests, max_in_flight - len(in_flight)):
+                engine_request_id = f"polysome-{next(self._request_counter)}"
+                try:
+                    prompt_string = self._apply_chat_template(messages)
+                    llm_engine.add_request(engine_request_id, prompt_string, sampling_params)
+                    in_flight[engine_request_id] = request_id
+                except Exception as e:
+                    logger.error(f"Failed to add vLLM request for '{request_id}': {e}")
+                    failed.append((request_id, e))
+
+        refill()
+        try:
+            while in_flight or failed:
+                while failed:
+                    request_id, error = failed.pop(0)
+                    yield request_id, None, error
+
+                if not in_flight:
+                    refill()
+                    continue
+
+                try:
+                    step_outputs = llm_engine.step()
+                except Exception as e:
+                    logger.exception(f"Error during vLLM engine step: {e}")
+                    llm_engine.abort_request(list(in_flight.keys()))
+                    aborted = list(in_flight.values())
+                    in_flight.clear()
+                    for request_id in aborted:
+                        yield request_id, None, e
+                    refill()
+                    continue
+
+                for output in step_outputs:
+                    if not output.finished or output.request_id not in in_flight:
+                        continue
+                    request_id = in_flight.pop(output.request_id)
+                    if output.outputs:
+                        yield request_id, output.outputs[0].text.strip(), None
+                    else:
+                        yield request_id, None, RuntimeError("vLLM returned no completions")
+                refill()
+        finally:
+            # The consumer stopped early or failed: do not leave requests running
+            if in_flight:
+                try:
+                    llm_engine.abort_request(list(in_flight.keys()))
+                except Exception as e:
+                    logger.warning(f"Failed to abort {len(in_flight)} vLLM request(s): {e}")
+                in_flight.clear()
+
     def supports_native_batching(self) -> bool:
         """
         vLLM supports native batch processing.
@@ -1,9 +1,16 @@
+import itertools
 import logging
+import math
 import os
 import time
 import multiprocessing
-from typing import List, Dict, Any, TYPE_CHECKING
-from multiprocessing import Process, Queue, Manager
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, Optional, Set, Tuple, TYPE_CHECKING
+from multiprocessing import Process, Queue
 from queue import Empty
 from polysome.engines.base import Engine
 
@@ -95,6 +102,56 @@ def setup_worker_logging(dp_rank: int, log_level: int = logging.INFO):
     return root_logger
 
 
+def _concatenate_messages(messages: List[Dict[str, str]]) -> str:
+    """Basic role-prefixed prompt used when no chat template is available."""
+    return "\n".join([f"{m['role']}: {m['content']}" for m in messages]) + "\nassistant:"
+
+
+def _make_prompt_renderer(
+    tokenizer: Any, cache_size: int = 4096
+) -> Callable[[Any], str]:
+    """
+    Build the prompt renderer used inside a data parallel worker.
+
+    Applies the model's own chat template, as ``VLLMEngine`` does, so both
+    engines send identical prompts. Rendered prompts are cached per worker,
+    which makes requeued chunks and repeated conversations free. Falls back to
+    basic concatenation if the tokenizer has no chat template.
+
+    Args:
+        tokenizer: Tokenizer from ``llm.get_tokenizer()``, or None.
+        cache_size: Maximum number of rendered prompts kept.
+
+    Returns:
+        Callable turning a message list (or an already rendered string) into
+        a prompt string.
+    """
+    has_template = tokenizer is not None and (
+        getattr(tokenizer, "chat_template", None)
+        or getattr(tokenizer, "default_chat_template", None)
+    )
+    if not has_template:
+        logger.warning(
+            "Tokenizer has no chat template, using basic concatenation (may not work well)"
+        )
+
+    @lru_cache(maxsize=cache_size)
+    def render(message_key: Tuple[Tuple[str, str], ...]) -> str:
+        messages = [{"role": role, "content": content} for role, content in message_key]
+        if not has_template:
+            return _concatenate_messages(messages)
+        return tokenizer.apply_chat_template(
+            messages, tokenize=False, add_generation_prompt=True
+        )
+
+    def render_prompt(messages: Any) -> str:
+        if isinstance(messages, str):
+            return messages
+        return render(tuple((m["role"], m["content"]) for m in messages))
+
+    return render_prompt
+
+
 def _vllm_dp_worker(
     dp_rank: int,
     dp_size: int,
@@ -108,7 +165,14 @@ def _vllm_dp_worker(
     error_queue: Queue,
     ready_queue: Queue,
 ):
-    """Worker process for a single data parallel rank."""
+    """
+    Worker process for a single data parallel rank.
+
+    Pulls work chunks of raw message lists from the queue shared by all ranks,
+    renders them with the model's chat template, announces each chunk with
+    ``(batch_id, dp_rank, None)`` on the output queue and sends the results as
+    ``(batch_id, dp_rank, results)``.
+    """
     try:
         # Set up logging for this worker process
         setup_worker_logging(dp_rank, log_level=logging.INFO)
@@ -163,12 +227,21 @@ def _vllm_dp_worker(
 
         llm = LLM(model=model_name, **vllm_kwargs_copy)
 
+        # Render chat templates here, where the model's tokenizer is loaded
+        try:
+            tokenizer = llm.get_tokenizer()
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer from vLLM engine: {e}")
+            tokenizer = None
+        render_prompt = _make_prompt_renderer(tokenizer)
+
         # Signal that this worker is ready
         ready_queue.put(dp_rank)
         logger.info(f"vLLM engine successfully initialized and ready for processing")
 
         # Process work items
         while True:
+            work_item = None
             try:
                 work_item = input_queue.get(timeout=1.0)
                 if work_item is None:  # Shutdown signal
@@ -177,13 +250,17 @@ def _vllm_dp_worker(
 
                 batch_id, prompts, sampling_params_dict = work_item
 
+                # Let the coordinator know which rank holds this chunk
+                output_queue.put((batch_id, dp_rank, None))
+
                 # Convert sampling params dict back to SamplingParams object
                 sampling_params = SamplingParams(**sampling_params_dict)
 
                 logger.info(f"Processing batch {batch_id} with {len(prompts)} prompts")
 
                 # Generate responses
-                outputs = llm.generate(prompts=prompts, sampling_params=sampling_params)
+                prompt_strings = [render_prompt(messages) for messages in prompts]
+                outputs = llm.generate(prompts=prompt_strings, sampling_params=sampling_params)
 
                 # Extract generated texts
                 results = []
@@ -195,7 +272,7 @@ def _vllm_dp_worker(
                         results.append("Error: No output generated")
 
                 # Send results back
-                output_queue.put((batch_id, results))
+                output_queue.put((batch_id, dp_rank, results))
                 logger.info(f"Completed batch {batch_id}")
 
             except Empty:
@@ -205,6 +282,16 @@ def _vllm_dp_worker(
                 # This is a real error during batch processing
                 logger.error(f"Error processing batch: {type(e).__name__}: {e}")
                 error_queue.put((dp_rank, f"{type(e).__name__}: {e}"))
+                # Answer the chunk so the coordinator does not wait on it forever
+                if work_item:
+                    output_queue.put(
+                        (
+                            work_item[0],
+                            dp_rank,
+                            [f"Error generating text with data parallel vLLM: {e}"]
+                            * len(work_item[1]),
+                        )
+                    )
 
     except Exception as e:
         logger.error(f"Fatal error during initialization: {e}")
@@ -230,8 +317,37 @@ def _vllm_dp_worker(
             logger.error(f"Worker {dp_rank} cleanup error: {cleanup_error}")
 
 
+@dataclass(eq=False)
+class _DPBatch:
+    """Bookkeeping for one batch submitted to the coordinator."""
+
+    future: Future
+    prompts: List[Any]
+    sampling_params_dict: Dict[str, Any]
+    results: List[Any]
+    outstanding: Set[str] = field(default_factory=set)
+    start_time: float = field(default_factory=time.time)
+
+
 class DataParallelCoordinator:
-    """Manages the lifecycle of data parallel worker processes."""
+    """
+    Manages the lifecycle of data parallel worker processes.
+
+    Batches are split into small chunks that are put on a single work queue
+    shared by all ranks. Each rank pulls the next chunk as soon as it is done
+    with the previous one, so ranks that draw short prompts simply process
+    more chunks and uneven requests balance themselves. Batches are submitted
+    asynchronously and results are routed back by a collector thread, so
+    several batches can be in flight at once.
+    """
+
+    # Target number of chunks per healthy worker when chunk_size is not set
+    CHUNKS_PER_WORKER = 4
+    # Seconds between result queue polls and between worker health checks
+    COLLECT_POLL_INTERVAL = 1.0
+    HEALTH_CHECK_INTERVAL = 5.0
+    # Seconds distribute_batch waits for a batch before giving up on it
+    BATCH_TIMEOUT = 3600.0
 
     def __init__(
         self,
@@ -239,20 +355,52 @@ class DataParallelCoordinator:
         gpus_per_dp_rank: int,
         dp_master_ip: str = "127.0.0.1",
         dp_master_port: int = None,
+        chunk_size: Optional[int] = None,
+        worker_target: Callable = None,
     ):
+        """
+        Args:
+            dp_size: Number of data parallel ranks.
+            gpus_per_dp_rank: Number of GPUs per rank.
+            dp_master_ip: Master IP for coordination.
+            dp_master_port: Master port for coordination (auto-assigned if None).
+            chunk_size: Prompts per work chunk. None derives it from the batch
+                size so each worker gets about CHUNKS_PER_WORKER chunks.
+            worker_target: Worker process function, defaults to the vLLM worker.
+                Must accept the same arguments as ``_vllm_dp_worker``.
+        """
         self.dp_size = dp_size
         self.gpus_per_dp_rank = gpus_per_dp_rank
         self.dp_master_ip = dp_master_ip
-        self.dp_master_port = dp_master_port or get_open_port()
+        if dp_master_port is None and VLLM_AVAILABLE:
+            dp_master_port = get_open_port()
+        self.dp_master_port = dp_master_port
+        self.chunk_size = chunk_size
+        self.worker_target = worker_target or _vllm_dp_worker
 
         self.processes = []
-        self.input_queues = []
-        self.manager = Manager()
-        self.output_queue = self.manager.Queue()
-        self.error_queue = self.manager.Queue()
-        self.ready_queue = self.manager.Queue()
+        # Plain pipe-backed queues: each message is pickled once and written
+        # straight to the worker, without a Manager proxy process in between.
+        # Single work queue shared by all ranks; workers pull chunks as they free up
+        self.work_queue = Queue()
+        self.output_queue = Queue()
+        self.error_queue = Queue()
+        self.ready_queue = Queue()
+        # Unclaimed chunks left at shutdown must not block interpreter exit
+        self.work_queue.cancel_join_thread()
 
         self._is_initialized = False
+        self._chunk_counter = itertools.count()
+
+        # In-flight chunks (chunk id -> batch, prompt indices) and the rank
+        # that picked each one up, shared with the collector thread
+        self._lock = threading.Lock()
+        self._chunks: Dict[str, Tuple[_DPBatch, List[int]]] = {}
+        self._chunk_owners: Dict[str, int] = {}
+        # Ranks already known to be dead
+        self._dead_workers: Set[int] = set()
+        self._collector = None
+        self._collector_stop = threading.Event()
 
         # Progress tracking
         self.batch_stats = {
@@ -275,13 +423,9 @@ class DataParallelCoordinator:
         self._validate_gpu_availability()
 
         for dp_rank in range(self.dp_size):
-            # Create input queue for this worker
-            input_queue = self.manager.Queue()
-            self.input_queues.append(input_queue)
-
             # Start worker process
             process = Process(
-                target=_vllm_dp_worker,
+                target=self.worker_target,
                 args=(
                     dp_rank,
                     self.dp_size,
@@ -290,7 +434,7 @@ class DataParallelCoordinator:
                     self.gpus_per_dp_rank,
                     model_name,
                     vllm_kwargs,
-                    input_queue,
+                    self.work_queue,
                     self.output_queue,
                     self.error_queue,
                     self.ready_queue,
@@ -400,172 +544,257 @@ class DataParallelCoordinator:
             "worker_batch_counts": {i: 0 for i in range(self.dp_size)},
         }
 
-    def distribute_batch(
-        self, prompts: List[str], sampling_params_dict: Dict[str, Any]
-    ) -> List[str]:
-        """Distribute a batch across workers and collect results with failure recovery."""
+    @staticmethod
+    def _prompt_length(prompt: Any) -> int:
+        """Cheap size estimate of a prompt used to order chunks."""
+        if isinstance(prompt, str):
+            return len(prompt)
+        return sum(len(str(m.get("content", ""))) for m in prompt)
+
+    def _make_chunks(self, prompts: List[Any], num_workers: int) -> List[List[int]]:
+        """
+        Split prompt indices into work chunks, longest prompts first.
+
+        Prompts of similar length end up in the same chunk, and the longest
+        chunks are queued first so the short ones fill in the tail.
+
+        Returns:
+            List of chunks, each a list of indices into ``prompts``.
+        """
+        chunk_size = self.chunk_size or max(
+            1, math.ceil(len(prompts) / (num_workers * self.CHUNKS_PER_WORKER))
+        )
+        order = sorted(
+            range(len(prompts)), key=lambda i: self._prompt_length(prompts[i]), reverse=True
+        )
+        return [order[i : i + chunk_size] for i in range(0, len(order), chunk_size)]
+
+    def _queue_chunk(self, batch: "_DPBatch", indices: List[int]) -> str:
+        """Put one chunk of a batch on the shared work queue. Caller holds the lock."""
+        batch_id = f"chunk_{next(self._chunk_counter)}"
+        self._chunks[batch_id] = (batch, indices)
+        batch.outstanding.add(batch_id)
+        self.work_queue.put(
+            (batch_id, [batch.prompts[i] for i in indices], batch.sampling_params_dict)
+        )
+        self.batch_stats["total_batches"] += 1
+        return batch_id
+
+    def submit_batch(
+        self, prompts: List[Any], sampling_params_dict: Dict[str, Any]
+    ) -> Future:
+        """
+        Queue a batch on the workers without waiting for its results.
+
+        Several batches may be in flight at once; their chunks share the work
+        queue, so workers move on to the next batch without a round trip through
+        the caller. Results are collected by a background thread.
+
+        Returns:
+            Future resolving to the generated texts in prompt order. It fails
+            with RuntimeError if all workers die before the batch completes.
+        """
         if not self._is_initialized:
             raise RuntimeError("Workers not initialized")
 
-        # Reset progress stats for new batch
-        self._reset_progress_stats()
-
         # Check if we have any healthy workers
         healthy_workers = self._get_healthy_workers()
         if not healthy_workers:
             raise RuntimeError("No healthy workers available")
 
-        # Split prompts across healthy workers only
-        prompts_per_worker = len(prompts) // len(healthy_workers)
-        remainder = len(prompts) % len(healthy_workers)
-
-        # Initialize progress tracking
-        self.batch_stats["total_prompts"] = len(prompts)
-
-        # Distribute work
-        batch_assignments = {}
-        start_idx = 0
+        batch = _DPBatch(
+            future=Future(),
+            prompts=prompts,
+            sampling_params_dict=sampling_params_dict,
+            results=[None] * len(prompts),
+        )
+        batch.future.set_running_or_notify_cancel()
+        if not prompts:
+            batch.future.set_result([])
+            return batch.future
+
+        with self._lock:
+            # Start a new progress session when nothing else is in flight
+            if not self._chunks:
+                self._reset_progress_stats()
+            self.batch_stats["total_prompts"] += len(prompts)
+
+            # Queue all chunks; ranks pull them as they become free
+            chunks = self._make_chunks(prompts, len(healthy_workers))
+            for indices in chunks:
+                self._queue_chunk(batch, indices)
+
+            if self._collector is None or not self._collector.is_alive():
+                self._collector_stop.clear()
+                self._collector = threading.Thread(
+                    target=self._collect_results,
+                    name="polysome-dp-collector",
+                    daemon=True,
+                )
+                self._collector.start()
 
-        for i, dp_rank in enumerate(healthy_workers):
-            end_idx = start_idx + prompts_per_worker
-            if i < remainder:  # Give remainder to first few workers
-                end_idx += 1
+        logger.info(
+            f"Queued {len(prompts)} prompts as {len(chunks)} chunks for {len(healthy_workers)} workers"
+        )
+        return batch.future
 
-            if start_idx < len(prompts):
-                worker_prompts = prompts[start_idx:end_idx]
-                if worker_prompts:  # Only assign if there are prompts
-                    batch_id = f"batch_{dp_rank}_{int(time.time() * 1000)}"
-                    self.input_queues[dp_rank].put(
-                        (batch_id, worker_prompts, sampling_params_dict)
-                    )
-                    batch_assignments[batch_id] = (
-                        dp_rank,
-                        start_idx,
-                        end_idx,
-                        worker_prompts,
-                    )
+    def distribute_batch(
+        self,
+        prompts: List[Any],
+        sampling_params_dict: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Distribute a batch across workers and collect results with failure recovery.
 
-                    # Update progress tracking
-                    self.batch_stats["total_batches"] += 1
-                    self._update_progress_stats(
-                        batch_id, dp_rank, len(worker_prompts), "started"
-                    )
+        Args:
+            prompts: Prompts of the batch.
+            sampling_params_dict: Keyword arguments for SamplingParams.
+            timeout: Seconds to wait for the results, BATCH_TIMEOUT if None.
 
-                    logger.debug(
-                        f"Assigned {len(worker_prompts)} prompts to rank {dp_rank} (batch {batch_id})"
-                    )
+        Raises:
+            TimeoutError: If the batch did not complete in time. Its chunks
+                are dropped and late results are ignored.
+        """
+        timeout = self.BATCH_TIMEOUT if timeout is None else timeout
+        future = self.submit_batch(prompts, sampling_params_dict)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                for batch_id, (batch, _) in list(self._chunks.items()):
+                    if batch.future is future:
+                        del self._chunks[batch_id]
+                        self._chunk_owners.pop(batch_id, None)
+                if not future.done():
+                    future.set_exception(TimeoutError("Data parallel batch timed out"))
+            raise TimeoutError(
+                f"Data parallel batch of {len(prompts)} prompts timed out after {timeout}s"
+            ) from None
+
+    def _collect_results(self):
+        """Background loop routing worker messages to their batches."""
+        last_health_check = time.time()
+
+        while not self._collector_stop.is_set():
+            try:
+                message = self.output_queue.get(timeout=self.COLLECT_POLL_INTERVAL)
+            except Empty:
+                message = None
+            except (EOFError, OSError):
+                break  # Queue torn down during shutdown
 
-            start_idx = end_idx
+            if message is not None:
+                with self._lock:
+                    self._handle_worker_message(*message)
 
-        logger.info(
-            f"Distributed {len(prompts)} prompts across {len(batch_assignments)} batches to {len(healthy_workers)} workers"
-        )
+            if time.time() - last_health_check >= self.HEALTH_CHECK_INTERVAL:
+                last_health_check = time.time()
+                self._recover_failed_workers()
 
-        # Collect results with failure recovery
-        results = [None] * len(prompts)
-        completed_batches = 0
-        failed_batches = {}
+    def _handle_worker_message(
+        self, batch_id: str, dp_rank: int, batch_results: Optional[List[str]]
+    ):
+        """Record a chunk pickup or result. Caller holds the lock."""
+        entry = self._chunks.get(batch_id)
+        if entry is None:
+            return  # Stale message from a requeued chunk
+        batch, indices = entry
+
+        if batch_results is None:
+            # Worker picked up this chunk
+            self._chunk_owners[batch_id] = dp_rank
+            self._update_progress_stats(batch_id, dp_rank, len(indices), "started")
+            return
 
-        while completed_batches < len(batch_assignments):
-            try:
-                batch_id, batch_results = self.output_queue.get(
-                    timeout=30
-                )  # Shorter timeout for faster failure detection
+        del self._chunks[batch_id]
+        self._chunk_owners.pop(batch_id, None)
+        batch.outstanding.discard(batch_id)
 
-                if batch_id in batch_assignments:
-                    dp_rank, start_idx, end_idx, worker_prompts = batch_assignments[
-                        batch_id
-                    ]
+        # Place results in their original positions
+        for index, result in zip(indices, batch_results):
+            batch.results[index] = result
 
-                    # Place results in correct positions
-                    for i, result in enumerate(batch_results):
-                        results[start_idx + i] = result
+        self._update_progress_stats(batch_id, dp_rank, len(indices), "completed")
+        logger.debug(
+            f"Received results for chunk {batch_id} from rank {dp_rank} ({len(indices)} prompts)"
+        )
 
-                    completed_batches += 1
+        if not batch.outstanding:
+            elapsed_time = time.time() - batch.start_time
+            logger.info(
+                f"BATCH PROCESSING COMPLETE: {len(batch.prompts)} prompts in {elapsed_time:.2f}s"
+            )
+            if self.batch_stats["failed_batches"] > 0:
+                logger.warning(f"Failed batches: {self.batch_stats['failed_batches']}")
+            batch.future.set_result(batch.results)
 
-                    # Update progress tracking
-                    self._update_progress_stats(
-                        batch_id, dp_rank, len(worker_prompts), "completed"
-                    )
+    def _recover_failed_workers(self):
+        """Requeue chunks held by dead workers, or fail all batches if none are left."""
+        with self._lock:
+            if not self._chunks:
+                return
 
-                    logger.debug(
-                        f"Received results for batch {batch_id} from rank {dp_rank} "
-                        f"({len(worker_prompts)} prompts)"
-                    )
+            # Check for worker errors and log detailed health status
+            if self._check_worker_errors():
+                self._log_worker_health_status()
 
-            except Exception as e:
-                logger.warning(f"Timeout or error collecting results: {e}")
-
-                # Check for worker errors and log detailed health status
-                if self._check_worker_errors():
-                    self._log_worker_health_status()
-
-                # Check worker health and redistribute failed batches
-                healthy_workers = self._get_healthy_workers()
-                if not healthy_workers:
-                    raise RuntimeError("All workers have failed")
-
-                # Find failed batches and redistribute
-                for batch_id, (dp_rank, start_idx, end_idx, worker_prompts) in list(
-                    batch_assignments.items()
-                ):
-                    if dp_rank not in healthy_workers:
-                        logger.warning(
-                            f"Redistributing failed batch {batch_id} from dead worker {dp_rank}"
-                        )
+            healthy_workers = self._get_healthy_workers()
+            if not healthy_workers:
+                logger.error("All workers have failed, aborting in-flight batches")
+                error = RuntimeError("All workers have failed")
+                for batch in {batch for batch, _ in self._chunks.values()}:
+                    batch.future.set_exception(error)
+                self._chunks.clear()
+                self._chunk_owners.clear()
+                return
+
+            for batch_id, owner in list(self._chunk_owners.items()):
+                if owner in healthy_workers:
+                    continue
+                batch, indices = self._chunks.pop(batch_id)
+                del self._chunk_owners[batch_id]
+                batch.outstanding.discard(batch_id)
+                self._update_progress_stats(batch_id, owner, len(indices), "failed")
+                new_batch_id = self._queue_chunk(batch, indices)
+                logger.warning(
+                    f"Requeued chunk {batch_id} from dead worker {owner} as {new_batch_id}"
+                )
 
-                        # Track failed batch
-                        self._update_progress_stats(
-                            batch_id, dp_rank, len(worker_prompts), "failed"
-                        )
+            dead_workers = set(range(len(self.processes))) - set(healthy_workers)
+            if dead_workers - self._dead_workers:
+                self._dead_workers = dead_workers
+                self._requeue_unannounced_chunks()
 
-                        # Redistribute to a healthy worker
-                        if healthy_workers:
-                            new_rank = healthy_workers[0]  # Simple round-robin
-                            new_batch_id = (
-                                f"batch_{new_rank}_{int(time.time() * 1000)}_retry"
-                            )
-                            self.input_queues[new_rank].put(
-                                (new_batch_id, worker_prompts, sampling_params_dict)
-                            )
-                            batch_assignments[new_batch_id] = (
-                                new_rank,
-                                start_idx,
-                                end_idx,
-                                worker_prompts,
-                            )
-                            del batch_assignments[batch_id]
-
-                            # Track redistributed batch
-                            self._update_progress_stats(
-                                new_batch_id, new_rank, len(worker_prompts), "started"
-                            )
-
-                            logger.info(
-                                f"Redistributed batch to healthy worker {new_rank} as {new_batch_id}"
-                            )
-                        else:
-                            raise RuntimeError(
-                                "No healthy workers available for redistribution"
-                            )
-
-        # Final progress summary and worker health status
-        elapsed_time = (
-            time.time() - self.batch_stats["start_time"]
-            if self.batch_stats["start_time"]
-            else 0
-        )
-        logger.info(
-            f"BATCH PROCESSING COMPLETE: {self.batch_stats['completed_batches']} batches, "
-            f"{self.batch_stats['completed_prompts']} prompts in {elapsed_time:.2f}s"
-        )
-        if self.batch_stats["failed_batches"] > 0:
-            logger.warning(f"Failed batches: {self.batch_stats['failed_batches']}")
+    def _requeue_unannounced_chunks(self):
+        """
+        Requeue chunks a dead worker took before announcing them. Caller holds the lock.
 
-        # Final worker health status
-        self._log_worker_health_status()
+        A worker that dies between taking a chunk off the work queue and
+        sending its pickup message leaves a chunk without an owner. The work
+        queue is drained to tell such chunks from the unowned ones still
+        waiting in it. A chunk a healthy worker takes meanwhile may be requeued
+        too; the results of its first copy are then ignored.
+        """
+        waiting = []
+        while True:
+            try:
+                waiting.append(self.work_queue.get(timeout=0.1))
+            except Empty:
+                break
+        waiting_ids = {item[0] for item in waiting if item is not None}
 
-        return results
+        for batch_id in list(self._chunks):
+            if batch_id in self._chunk_owners or batch_id in waiting_ids:
+                continue
+            batch, indices = self._chunks.pop(batch_id)
+            batch.outstanding.discard(batch_id)
+            new_batch_id = self._queue_chunk(batch, indices)
+            logger.warning(
+                f"Requeued chunk {batch_id}, lost by a worker that died, as {new_batch_id}"
+            )
+        for item in waiting:
+            self.work_queue.put(item)
 
     def _validate_gpu_availability(self):
         """Validate that sufficient GPUs are available for data parallel processing."""
@@ -664,9 +893,20 @@ class DataParallelCoordinator:
         """Shutdown all worker processes with proper VRAM cleanup."""
         logger.info("Shutting down data parallel workers")
 
-        # Send shutdown signals
-        for input_queue in self.input_queues:
-            input_queue.put(None)
+        # Stop the collector and fail anything still in flight
+        self._collector_stop.set()
+        if self._collector is not None:
+            self._collector.join(timeout=2 * self.COLLECT_POLL_INTERVAL)
+            self._collector = None
+        with self._lock:
+            for batch in {batch for batch, _ in self._chunks.values()}:
+                batch.future.set_exception(RuntimeError("Coordinator shut down"))
+            self._chunks.clear()
+            self._chunk_owners.clear()
+
+        # Send one shutdown signal per worker on the shared queue
+        for _ in self.processes:
+            self.work_queue.put(None)
 
         # Wait for processes to finish with extended timeouts for VRAM cleanup
         for i, process in enumerate(self.processes):
@@ -687,7 +927,6 @@ class DataParallelCoordinator:
                 logger.error(f"Error shutting down worker {i}: {e}")
 
         self.processes.clear()
-        self.input_queues.clear()
         self._is_initialized = False
         
         # Force CUDA memory cleanup after all workers terminated
@@ -728,6 +967,7 @@ class VLLMDataParallelEngine(Engine):
                 - gpus_per_dp_rank: Number of GPUs per rank (default: 1)
                 - dp_master_ip: Master IP for coordination (default: "127.0.0.1")
                 - dp_master_port: Master port for coordination (default: auto-assigned)
+                - dp_chunk_size: Prompts per work-queue chunk (default: auto)
                 - enable_data_parallel: Enable/disable data parallelism (default: True)
                 - disable_progress_bars: Disable vLLM progress bars (default: True)
                 - And other vLLM LLM parameters
@@ -744,6 +984,7 @@ class VLLMDataParallelEngine(Engine):
         self.gpus_per_dp_rank = kwargs.pop("gpus_per_dp_rank", 1)
         self.dp_master_ip = kwargs.pop("dp_master_ip", "127.0.0.1")
         self.dp_master_port = kwargs.pop("dp_master_port", None)
+        self.dp_chunk_size = kwargs.pop("dp_chunk_size", None)
         self.enable_data_parallel = kwargs.pop("enable_data_parallel", True)
         self.disable_progress_bars = kwargs.pop("disable_progress_bars", True)
 
@@ -777,6 +1018,7 @@ class VLLMDataParallelEngine(Engine):
                 gpus_per_dp_rank=self.gpus_per_dp_rank,
                 dp_master_ip=self.dp_master_ip,
                 dp_master_port=self.dp_master_port,
+                chunk_size=self.dp_chunk_size,
             )
 
             try:
@@ -856,31 +1098,10 @@ class VLLMDataParallelEngine(Engine):
                 )
                 return self._fallback_to_single_worker(messages_batch, **kwargs)
 
-            # Apply chat template to all messages in the batch
-            prompts = []
-            for messages in messages_batch:
-                # Use basic concatenation since we don't have tokenizer loaded in this process
-                prompt_string = (
-                    "\n".join([f"{m['role']}: {m['content']}" for m in messages])
-                    + "\nassistant:"
-                )
-                prompts.append(prompt_string)
-
-            # Prepare sampling parameters
-            sampling_kwargs = {
-                "temperature": 1.0,
-                "top_p": 1.0,
-                "top_k": -1,
-                "max_tokens": 16,
-                **kwargs,
-            }
+            sampling_kwargs = self._build_sampling_params_dict(kwargs)
 
-            # Handle max_new_tokens -> max_tokens conversion
-            if "max_new_tokens" in sampling_kwargs:
-                sampling_kwargs["max_tokens"] = sampling_kwargs.pop("max_new_tokens")
-
-            # Distribute batch and collect results
-            results = self.coordinator.distribute_batch(prompts, sampling_kwargs)
+            # Distribute raw message lists; workers apply the chat template
+            results = self.coordinator.distribute_batch(messages_batch, sampling_kwargs)
 
             logger.info(
                 f"Data parallel batch generation completed successfully for {len(results)} items"
@@ -901,6 +1122,52 @@ class VLLMDataParallelEngine(Engine):
                 messages_batch
             )
 
+    def submit_text_batch(
+        self,
+        messages_batch: List[List[Dict[str, str]]],
+        **kwargs: Any,
+    ) -> Future:
+        """
+        Queue a batch on the data parallel workers without waiting for it.
+
+        Falls back to synchronous generation when data parallelism is disabled
+        or no healthy workers are left.
+
+        Args:
+            messages_batch: A list of message lists for batch processing.
+            **kwargs: Generation parameters for SamplingParams.
+
+        Returns:
+            A future resolving to the list of generated text strings.
+        """
+        if (
+            not self.enable_data_parallel
+            or not self.coordinator
+            or not self.coordinator._get_healthy_workers()
+        ):
+            return super().submit_text_batch(messages_batch, **kwargs)
+
+        # Workers apply the chat template, so raw message lists are sent
+        return self.coordinator.submit_batch(
+            messages_batch, self._build_sampling_params_dict(kwargs)
+        )
+
+    @staticmethod
+    def _build_sampling_params_dict(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the picklable SamplingParams arguments sent to the workers."""
+        sampling_kwargs = {
+            "temperature": 1.0,
+            "top_p": 1.0,
+            "top_k": -1,
+            "max_tokens": 16,
+            **kwargs,
+        }
+
+        # Handle max_new_tokens -> max_tokens conversion
+        if "max_new_tokens" in sampling_kwargs:
+            sampling_kwargs["max_tokens"] = sampling_kwargs.pop("max_new_tokens")
+        return sampling_kwargs
+
     def _fallback_to_single_worker(
         self, messages_batch: List[List[Dict[str, str]]], **kwargs: Any
     ) -> List[str]:
@@ -1,9 +1,10 @@
 from polysome.nodes.jsonl_processing_node import JSONLProcessingNode
 from polysome.nodes.node import ValidationResult, node_step_error_handler
 from polysome.utils.data_loader import DataFileLoader
-from polysome.utils.jsonl_writer import IncrementalJsonlWriter
+from polysome.utils.key_index import TABLE_DIR, KeyedRowReader
+from polysome.utils.stream_join import StreamingJoin
 from pathlib import Path
-from typing import Dict, Any, List, Set, Tuple, Optional
+from typing import Dict, Any, Iterator, List, Tuple, Optional
 import logging
 from collections import defaultdict
 
@@ -18,6 +19,11 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
     to handle conflicts between dependency outputs.
     """
 
+    # Needs the complete input before producing output
+    STREAMING_CAPABLE = False
+    # Hash join partitions are spilled here, under output_dir
+    JOIN_SPILL_DIR = Path(".cache") / "join"
+
     def __init__(
         self,
         node_id: str,
@@ -41,9 +47,10 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
         self.column_mapping = params.get("column_mapping", {})
         self.handle_conflicts = params.get("handle_conflicts", "error")
         self.retain_original_attributes = params.get("retain_original_attributes", False)
+        # Memory for the rows held at once when the inputs are not key-sorted
+        self.join_memory_mb = params.get("join_memory_mb", 1024)
         
         # Will be populated during processing
-        self.dependency_data_loaders: Dict[str, DataFileLoader] = {}
         self.dependency_output_info: Dict[str, Dict[str, Any]] = {}
         
         logger.info(f"CombineIntermediateOutputsNode '{self.node_id}' initialized")
@@ -63,6 +70,7 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
             "column_mapping": dict,
             "handle_conflicts": str,
             "retain_original_attributes": bool,
+            "join_memory_mb": (int, float),
             "additional_output_formats": list,
             "output_format_options": dict,
         }
@@ -72,6 +80,7 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
         return {
             "join_strategy": {"choices": ["inner", "left", "outer"]},
             "handle_conflicts": {"choices": ["error", "prefix_source", "suffix_source"]},
+            "join_memory_mb": {"min": 1},
             "additional_output_formats": {
                 "choices": ["excel", "json", "parquet"],  # Valid format options
             },
@@ -249,8 +258,8 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
             if self.status != "running":
                 return self._prepare_output_info(self.status, len(self.errors))
 
-            # Step 2: Load data from all dependencies
-            dependency_data = self._load_dependency_data()
+            # Step 2: Locate the output files of all dependencies
+            dependency_paths = self._load_dependency_data()
             
             if self.status != "running":
                 return self._prepare_output_info(self.status, len(self.errors))
@@ -261,14 +270,14 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
             if self.status != "running":
                 return self._prepare_output_info(self.status, len(self.errors))
 
-            # Step 4: Perform join based on strategy
-            combined_data = self._perform_join(dependency_data, resolved_mapping)
+            # Step 4: Set up the join based on strategy
+            combined_rows = self._perform_join(dependency_paths, resolved_mapping)
             
             if self.status != "running":
                 return self._prepare_output_info(self.status, len(self.errors))
 
-            # Step 5: Write combined output
-            self._write_combined_output(combined_data)
+            # Step 5: Stream combined rows to the output
+            self._write_combined_output(combined_rows)
             
             # Set final status
             if self.status == "running":
@@ -352,93 +361,51 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
         logger.info(f"Node '{self.node_id}': Using primary key: {self.primary_key}")
 
     @node_step_error_handler(failure_status="failed_load_dependency_data")
-    def _load_dependency_data(self) -> Dict[str, Dict[str, Any]]:
+    def _load_dependency_data(self) -> Dict[str, Path]:
         """
-        Load data from all dependency output files.
-        
+        Locate the output files of all dependencies.
+
+        The files are only read while joining, one row or partition at a
+        time, so they are never loaded as a whole.
+
         Returns:
-            Dict mapping dependency_id to loaded data dict
+            Dict mapping dependency_id to its output file
         """
-        dependency_data = {}
+        dependency_paths = {}
         total_dependencies = len(self.dependency_output_info)
-        
-        logger.info(f"Node '{self.node_id}': Starting to load data from {total_dependencies} dependencies")
-        
+
         for idx, (dep_id, dep_info) in enumerate(self.dependency_output_info.items(), 1):
             output_path = Path(dep_info["output_path"])
-            primary_key = dep_info["primary_key"]
-            
-            logger.info(f"Node '{self.node_id}': [{idx}/{total_dependencies}] Loading data from '{dep_id}' at {output_path}")
-            
+
             if not output_path.exists():
                 raise FileNotFoundError(f"Dependency '{dep_id}' output file not found: {output_path}")
 
-            # Create data loader for this dependency
-            data_loader = DataFileLoader(
-                input_data_path=output_path,
-                primary_key=primary_key,
-            )
-            
-            # Load the data
-            loaded_data = data_loader.load_input_data()
-            dependency_data[dep_id] = loaded_data
-            
+            dependency_paths[dep_id] = output_path
             logger.info(
-                f"Node '{self.node_id}': [{idx}/{total_dependencies}] Loaded {len(loaded_data)} rows from dependency '{dep_id}'"
+                f"Node '{self.node_id}': [{idx}/{total_dependencies}] Dependency '{dep_id}' "
+                f"output at {output_path} ({output_path.stat().st_size / 1e6:.1f} MB)"
             )
 
-        # Log overall statistics
-        total_rows = sum(len(data) for data in dependency_data.values())
-        logger.info(
-            f"Node '{self.node_id}': Completed loading data: {total_rows} rows from {len(dependency_data)} dependencies"
-        )
-        
-        return dependency_data
+        return dependency_paths
 
-    @node_step_error_handler(failure_status="failed_load_original_input")
-    def _load_original_input_data(self) -> Dict[str, Dict[str, Any]]:
+    def _original_data_source(self) -> Optional[str]:
         """
-        Load the original input data that was provided to all dependencies.
-        
+        Return the dependency whose rows provide the original attributes.
+
         This is used when retain_original_attributes=True to preserve all
         original data attributes in the combined output.
-        
-        Returns:
-            Dict mapping primary key values to original input data
         """
         if not self.retain_original_attributes:
-            return {}
-            
-        logger.info(f"Node '{self.node_id}': Loading original input data for attribute retention")
-        
-        # Find the original input source by looking for the dependency with input_data_path
-        original_source_info = None
+            return None
+
+        # Look for dependencies that have an input_data_path (indicating they load original data)
         for dep_id, dep_info in self.dependency_output_info.items():
-            # Look for dependencies that have an input_data_path (indicating they load original data)
             if "input_data_path" in dep_info or dep_info.get("original_data_source"):
-                original_source_info = dep_info
-                break
-                
-        if not original_source_info:
-            # If we can't find original source, use the first dependency as fallback
-            logger.warning(f"Node '{self.node_id}': Could not identify original data source, using first dependency")
-            dep_id, original_source_info = next(iter(self.dependency_output_info.items()))
-            
-        # Load the original data from the identified source
-        original_data_path = Path(original_source_info["output_path"])
-        primary_key = original_source_info["primary_key"]
-        
-        logger.info(f"Node '{self.node_id}': Loading original data from {original_data_path}")
-        
-        data_loader = DataFileLoader(
-            input_data_path=original_data_path,
-            primary_key=primary_key,
-        )
-        
-        original_data = data_loader.load_input_data()
-        logger.info(f"Node '{self.node_id}': Loaded {len(original_data)} original records")
-        
-        return original_data
+                return dep_id
+
+        # If we can't find original source, use the first dependency as fallback
+        logger.warning(f"Node '{self.node_id}': Could not identify original data source, using first dependency")
+        return next(iter(self.dependency_output_info))
 
     @node_step_error_handler(failure_status="failed_resolve_column_mapping")
     def _resolve_column_mapping(self) -> Dict[str, str]:
@@ -518,22 +485,20 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
 
     def _detect_additional_column_conflicts(
         self, 
-        dependency_data: Dict[str, Dict[str, Any]], 
+        first_rows: Dict[str, Optional[Dict[str, Any]]], 
         resolved_mapping: Dict[str, str]
     ) -> None:
         """
         Detect conflicts between mapped columns and existing columns in the data.
         
         Args:
-            dependency_data: Loaded data from all dependencies
+            first_rows: First row of each dependency (None if it has no rows)
             resolved_mapping: Resolved column mapping
         """
         # Get all column names from all dependencies
         all_existing_columns = set()
-        for dep_id, data in dependency_data.items():
-            if data:  # Check if data is not empty
-                # Get column names from first row
-                first_row = next(iter(data.values()))
+        for dep_id, first_row in first_rows.items():
+            if first_row:  # Check if data is not empty
                 all_existing_columns.update(first_row.keys())
         
         # Check if any mapped column names conflict with existing columns
@@ -553,284 +518,253 @@ class CombineIntermediateOutputsNode(JSONLProcessingNode):
     @node_step_error_handler(failure_status="failed_perform_join")
     def _perform_join(
         self, 
-        dependency_data: Dict[str, Dict[str, Any]], 
+        dependency_paths: Dict[str, Path], 
         resolved_mapping: Dict[str, str]
-    ) -> Dict[str, Dict[str, Any]]:
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Perform join operation based on configured strategy.
+        Set up the join operation for the configured strategy.
+
+        Key-sorted dependency outputs are merged in a single pass; otherwise
+        they are joined by hash partitions spilled under output_dir, sized to
+        join_memory_mb. Either way only a bounded part of the data is held in
+        memory, however many dependencies there are.
         
         Args:
-            dependency_data: Loaded data from all dependencies
+            dependency_paths: Output file of each dependency
             resolved_mapping: Resolved column mapping
             
         Returns:
-            Combined data ready for output
+            Iterator over combined rows, consumed by _write_combined_output
         """
-        # Check for additional column conflicts between mapped names and existing data
-        self._detect_additional_column_conflicts(dependency_data, resolved_mapping)
-        
-        if self.join_strategy == "inner":
-            return self._perform_inner_join(dependency_data, resolved_mapping)
-        elif self.join_strategy == "left":
-            return self._perform_left_join(dependency_data, resolved_mapping)
-        elif self.join_strategy == "outer":
-            return self._perform_outer_join(dependency_data, resolved_mapping)
-        else:
+        if self.join_strategy not in ("inner", "left", "outer"):
             raise ValueError(f"Unknown join strategy: {self.join_strategy}")
 
-    def _perform_inner_join(
-        self, 
-        dependency_data: Dict[str, Dict[str, Any]], 
-        resolved_mapping: Dict[str, str]
-    ) -> Dict[str, Dict[str, Any]]:
+        # Check for additional column conflicts between mapped names and existing data
+        first_rows = {
+            dep_id: next(
+                (row for _, row in DataFileLoader(path, self.primary_key).iter_records()),
+                None,
+            )
+            for dep_id, path in dependency_paths.items()
+        }
+        self._detect_additional_column_conflicts(first_rows, resolved_mapping)
+
+        original_source = self._original_data_source()
+        if original_source is not None:
+            logger.info(
+                f"Node '{self.node_id}': Retaining original attributes from dependency '{original_source}'"
+            )
+
+        join = StreamingJoin(
+            dependency_paths,
+            self.primary_key,
+            how=self.join_strategy,
+            memory_budget_bytes=int(self.join_memory_mb * 1024 * 1024),
+            spill_dir=self.output_dir / self.JOIN_SPILL_DIR,
+            columns=self._dependency_columns(original_source),
+        )
+        logger.info(
+            f"Node '{self.node_id}': Performing {self.join_strategy} join"
+            + (
+                f" using '{next(iter(dependency_paths))}' as left table"
+                if self.join_strategy == "left"
+                else ""
+            )
+        )
+        return self._iter_combined_rows(join, resolved_mapping, original_source)
+
+    def _dependency_columns(self, original_source: Optional[str]) -> Dict[str, Optional[List[str]]]:
         """
-        Perform inner join - only include rows where primary key exists in ALL dependencies.
-        Logs detailed information about data loss.
+        Fields to read from each dependency output besides the primary key.
+
+        A dependency with an output_attribute only contributes that field, so
+        the attributes copied into its rows are skipped while reading. The
+        source of retained original attributes, and dependencies without an
+        output_attribute, are read whole.
         """
-        logger.info(f"Node '{self.node_id}': Performing inner join")
-        
-        # Track original counts for logging
-        original_counts = {dep_id: len(data) for dep_id, data in dependency_data.items()}
-        
-        # Find intersection of primary keys across all dependencies
-        all_key_sets = [set(data.keys()) for data in dependency_data.values()]
-        common_keys = set.intersection(*all_key_sets) if all_key_sets else set()
-        
-        # Log data loss for each dependency
-        for dep_id, data in dependency_data.items():
-            original_count = len(data)
-            remaining_count = len(common_keys)
-            lost_count = original_count - remaining_count
-            
-            if lost_count > 0:
-                logger.warning(
-                    f"Node '{self.node_id}': Inner join lost {lost_count} rows from dependency '{dep_id}' "
-                    f"({remaining_count}/{original_count} rows retained)"
-                )
+        columns = {}
+        for dep_id, dep_info in self.dependency_output_info.items():
+            output_attribute = dep_info.get("output_attribute")
+            if output_attribute and dep_id != original_source:
+                columns[dep_id] = [output_attribute]
             else:
-                logger.info(
-                    f"Node '{self.node_id}': Inner join retained all {remaining_count} rows from dependency '{dep_id}'"
-                )
-        
-        # Overall statistics
-        total_original = sum(original_counts.values())
-        total_result_rows = len(common_keys)
-        
+                columns[dep_id] = None
+        return columns
+
+    def _iter_combined_rows(
+        self,
+        join: StreamingJoin,
+        resolved_mapping: Dict[str, str],
+        original_source: Optional[str],
+    ) -> Iterator[Dict[str, Any]]:
+        """Build combined rows from the join and log join statistics at the end."""
+        # A lean source of original attributes only carries its own output
+        attribute_source = (
+            self.dependency_output_info[original_source].get("attribute_source")
+            if original_source is not None
+            else None
+        )
+        attribute_reader = (
+            KeyedRowReader(
+                attribute_source, self.primary_key, cache_dir=self.output_dir / TABLE_DIR
+            )
+            if attribute_source
+            else None
+        )
+
+        matched_counts = {dep_id: 0 for dep_id in join.sources}
+        total_rows = 0
+        try:
+            for key, dep_rows in join:
+                for dep_id, dep_row in dep_rows.items():
+                    if dep_row is not None:
+                        matched_counts[dep_id] += 1
+                if attribute_reader is not None and dep_rows[original_source] is not None:
+                    source_row = attribute_reader.get(key) or {}
+                    source_row.update(dep_rows[original_source])
+                    dep_rows[original_source] = source_row
+                total_rows += 1
+                yield self._combine_row(key, dep_rows, resolved_mapping, original_source)
+        finally:
+            if attribute_reader is not None:
+                attribute_reader.close()
+
+        self._log_join_statistics(join, matched_counts, total_rows)
+
+    def _log_join_statistics(
+        self, join: StreamingJoin, matched_counts: Dict[str, int], total_rows: int
+    ) -> None:
+        """Log rows lost (inner join) or null values filled (left/outer join) per dependency."""
+        for dep_id, row_count in join.row_counts.items():
+            if self.join_strategy == "inner":
+                lost_count = row_count - matched_counts[dep_id]
+                if lost_count > 0:
+                    logger.warning(
+                        f"Node '{self.node_id}': Inner join lost {lost_count} rows from dependency '{dep_id}' "
+                        f"({matched_counts[dep_id]}/{row_count} rows retained)"
+                    )
+            else:
+                null_count = total_rows - matched_counts[dep_id]
+                if null_count > 0:
+                    logger.info(
+                        f"Node '{self.node_id}': {self.join_strategy.capitalize()} join filled {null_count} null values "
+                        f"for dependency '{dep_id}' ({matched_counts[dep_id]}/{total_rows} rows have data)"
+                    )
+
         logger.info(
-            f"Node '{self.node_id}': Inner join result: {total_result_rows} rows from {len(dependency_data)} dependencies. "
-            f"Total input rows: {total_original}, final rows: {total_result_rows}"
+            f"Node '{self.node_id}': {self.join_strategy.capitalize()} join result: {total_rows} rows from "
+            f"{len(join.row_counts)} dependencies ({join.strategy} join). "
+            f"Total input rows: {sum(join.row_counts.values())}"
         )
-        
-        if total_result_rows == 0:
+        if total_rows == 0 and self.join_strategy == "inner":
             logger.warning(f"Node '{self.node_id}': Inner join resulted in 0 rows - no common primary keys found")
-        
-        return self._combine_data_for_keys(dependency_data, common_keys, resolved_mapping)
 
-    def _combine_data_for_keys(
-        self, 
-        dependency_data: Dict[str, Dict[str, Any]], 
-        keys_to_include: Set[str],
-        resolved_mapping: Dict[str, str]
-    ) -> Dict[str, Dict[str, Any]]:
+    def _combine_row(
+        self,
+        key: str,
+        dep_rows: Dict[str, Optional[Dict[str, Any]]],
+        resolved_mapping: Dict[str, str],
+        original_source: Optional[str],
+    ) -> Dict[str, Any]:
         """
-        Combine data for specified keys using the resolved column mapping.
+        Combine the rows of one key using the resolved column mapping.
         
         Args:
-            dependency_data: Loaded data from all dependencies
-            keys_to_include: Set of primary key values to include
+            key: Primary key value
+            dep_rows: Each dependency's row for the key, or None if it has none
             resolved_mapping: Mapping from dependency_id to output column name
+            original_source: Dependency providing original attributes, if retained
             
         Returns:
-            Combined data with mapped column names
+            Combined row with mapped column names
         """
-        combined_data = {}
-        total_keys = len(keys_to_include)
-        
-        logger.info(f"Node '{self.node_id}': Starting to combine data for {total_keys} keys")
-        
-        # Load original input data if attribute retention is enabled
-        original_data = {}
-        if self.retain_original_attributes:
-            original_data = self._load_original_input_data()
-            logger.info(f"Node '{self.node_id}': Loaded {len(original_data)} original records for attribute retention")
-        
-        processed_count = 0
-        log_interval = max(1, total_keys // 10)  # Log every 10% or at least every row
+        # Start with original data if available, otherwise just primary key
+        original_row = dep_rows.get(original_source) if original_source else None
+        if original_row is not None:
+            combined_row = original_row.copy()  # Copy all original attributes
+            # Ensure primary key is correct (in case it was modified in processing)
+            combined_row[self.primary_key] = key
+        else:
+            combined_row = {self.primary_key: key}
         
-        for key in keys_to_include:
-            processed_count += 1
-            
-            # Log progress periodically
-            if processed_count % log_interval == 0 or processed_count == total_keys:
-                logger.info(f"Node '{self.node_id}': Combined {processed_count}/{total_keys} rows ({processed_count/total_keys*100:.1f}%)")
-            
-            # Start with original data if available, otherwise just primary key
-            if self.retain_original_attributes and key in original_data:
-                combined_row = original_data[key].copy()  # Copy all original attributes
-                # Ensure primary key is correct (in case it was modified in processing)
-                combined_row[self.primary_key] = key
-            else:
-                combined_row = {self.primary_key: key}
+        # Add mapped outputs from each dependency
+        for dep_id, dep_row in dep_rows.items():
+            output_column = resolved_mapping[dep_id]
             
-            # Add mapped outputs from each dependency
-            for dep_id, data in dependency_data.items():
-                output_column = resolved_mapping[dep_id]
-                
-                if key in data:
-                    dep_row = data[key]
-                    
-                    # Get the dependency's output attribute value
-                    dep_output_attribute = self.dependency_output_info[dep_id].get("output_attribute")
-                    if dep_output_attribute and dep_output_attribute in dep_row:
-                        # Handle potential column conflicts
-                        if output_column in combined_row and self.handle_conflicts == "error":
-                            raise ValueError(
-                                f"Column conflict: '{output_column}' exists in both original data and dependency '{dep_id}'. "
-                                f"Use column_mapping or set handle_conflicts to resolve."
-                            )
-                        elif output_column in combined_row:
-                            # Apply conflict resolution strategy
-                            if self.handle_conflicts == "prefix_source":
-                                output_column = f"{dep_id}_{output_column}"
-                            elif self.handle_conflicts == "suffix_source":
-                                output_column = f"{output_column}_{dep_id}"
-                                
-                        combined_row[output_column] = dep_row[dep_output_attribute]
-                    else:
-                        # If no specific output attribute, include the whole row data
-                        # (excluding primary key to avoid duplication)
-                        for col, val in dep_row.items():
-                            if col != self.primary_key:
-                                prefixed_col = f"{dep_id}_{col}"
-                                if prefixed_col in combined_row and self.handle_conflicts == "error":
-                                    raise ValueError(
-                                        f"Column conflict: '{prefixed_col}' already exists. "
-                                        f"Use explicit column_mapping or change handle_conflicts setting."
-                                    )
-                                combined_row[prefixed_col] = val
-                else:
-                    # Key not found in this dependency - fill with null for left/outer joins
+            if dep_row is not None:
+                # Get the dependency's output attribute value
+                dep_output_attribute = self.dependency_output_info[dep_id].get("output_attribute")
+                if dep_output_attribute and dep_output_attribute in dep_row:
+                    # Handle potential column conflicts
                     if output_column in combined_row and self.handle_conflicts == "error":
                         raise ValueError(
-                            f"Column conflict: '{output_column}' exists in original data. "
-                            f"Use explicit column_mapping to avoid conflicts."
+                            f"Column conflict: '{output_column}' exists in both original data and dependency '{dep_id}'. "
+                            f"Use column_mapping or set handle_conflicts to resolve."
                         )
                     elif output_column in combined_row:
-                        # Apply conflict resolution for null values too
+                        # Apply conflict resolution strategy
                         if self.handle_conflicts == "prefix_source":
                             output_column = f"{dep_id}_{output_column}"
                         elif self.handle_conflicts == "suffix_source":
                             output_column = f"{output_column}_{dep_id}"
                             
-                    combined_row[output_column] = None
-                
-            combined_data[key] = combined_row
-        
-        logger.info(f"Node '{self.node_id}': Completed data combination for all {total_keys} keys")
-        return combined_data
-
-    def _perform_left_join(
-        self, 
-        dependency_data: Dict[str, Dict[str, Any]], 
-        resolved_mapping: Dict[str, str]
-    ) -> Dict[str, Dict[str, Any]]:
-        """
-        Perform left join - include all rows from first dependency, fill missing with nulls.
-        """
-        logger.info(f"Node '{self.node_id}': Performing left join")
-        
-        # Use the first dependency as the "left" table
-        dep_ids = list(dependency_data.keys())
-        left_dep_id = dep_ids[0]
-        left_data = dependency_data[left_dep_id]
-        
-        logger.info(f"Node '{self.node_id}': Using '{left_dep_id}' as left table ({len(left_data)} rows)")
-        
-        # Track statistics for logging
-        left_keys = set(left_data.keys())
-        null_counts = {dep_id: 0 for dep_id in dep_ids[1:]}  # Skip left dependency
-        
-        # For each other dependency, count how many keys are missing
-        for dep_id in dep_ids[1:]:
-            dep_keys = set(dependency_data[dep_id].keys())
-            missing_keys = left_keys - dep_keys
-            null_counts[dep_id] = len(missing_keys)
-            
-            if null_counts[dep_id] > 0:
-                logger.info(
-                    f"Node '{self.node_id}': Left join will fill {null_counts[dep_id]} null values "
-                    f"for dependency '{dep_id}' ({len(dep_keys)}/{len(left_keys)} rows have data)"
-                )
-        
-        total_nulls = sum(null_counts.values())
-        logger.info(
-            f"Node '{self.node_id}': Left join result: {len(left_keys)} rows, {total_nulls} null values filled"
-        )
-        
-        return self._combine_data_for_keys(dependency_data, left_keys, resolved_mapping)
-
-    def _perform_outer_join(
-        self, 
-        dependency_data: Dict[str, Dict[str, Any]], 
-        resolved_mapping: Dict[str, str]
-    ) -> Dict[str, Dict[str, Any]]:
-        """
-        Perform outer join - include all rows from any dependency, fill missing with nulls.
-        """
-        logger.info(f"Node '{self.node_id}': Performing outer join")
-        
-        # Find union of all primary keys
-        all_key_sets = [set(data.keys()) for data in dependency_data.values()]
-        all_keys = set.union(*all_key_sets) if all_key_sets else set()
-        
-        # Track statistics for logging
-        total_unique_keys = len(all_keys)
-        null_counts = {}
-        
-        for dep_id, data in dependency_data.items():
-            dep_keys = set(data.keys())
-            missing_keys = all_keys - dep_keys
-            null_counts[dep_id] = len(missing_keys)
+                    combined_row[output_column] = dep_row[dep_output_attribute]
+                else:
+                    # If no specific output attribute, include the whole row data
+                    # (excluding primary key to avoid duplication)
+                    for col, val in dep_row.items():
+                        if col != self.primary_key:
+                            prefixed_col = f"{dep_id}_{col}"
+                            if prefixed_col in combined_row and self.handle_conflicts == "error":
+                                raise ValueError(
+                                    f"Column conflict: '{prefixed_col}' already exists. "
+                                    f"Use explicit column_mapping or change handle_conflicts setting."
+                                )
+                            combined_row[prefixed_col] = val
+            else:
+                # Key not found in this dependency - fill with null for left/outer joins
+                if output_column in combined_row and self.handle_conflicts == "error":
+                    raise ValueError(
+                        f"Column conflict: '{output_column}' exists in original data. "
+                        f"Use explicit column_mapping to avoid conflicts."
+                    )
+                elif output_column in combined_row:
+                    # Apply conflict resolution for null values too
+                    if self.handle_conflicts == "prefix_source":
+                        output_column = f"{dep_id}_{output_column}"
+                    elif self.handle_conflicts == "suffix_source":
+                        output_column = f"{output_column}_{dep_id}"
+                        
+                combined_row[output_column] = None
             
-            logger.info(
-                f"Node '{self.node_id}': Dependency '{dep_id}' has data for {len(dep_keys)}/{total_unique_keys} rows "
-                f"({null_counts[dep_id]} null values will be filled)"
-            )
-        
-        total_nulls = sum(null_counts.values())
-        total_data_points = total_unique_keys * len(dependency_data)
-        
-        logger.info(
-            f"Node '{self.node_id}': Outer join result: {total_unique_keys} rows from {len(dependency_data)} dependencies. "
-            f"Total data points: {total_data_points}, null values: {total_nulls}"
-        )
-        
-        return self._combine_data_for_keys(dependency_data, all_keys, resolved_mapping)
+        return combined_row
 
     @node_step_error_handler(failure_status="failed_write_combined_output")
-    def _write_combined_output(self, combined_data: Dict[str, Dict[str, Any]]) -> None:
+    def _write_combined_output(self, combined_rows: Iterator[Dict[str, Any]]) -> None:
         """
-        Write the combined data to the output JSONL file.
+        Write combined rows to the output JSONL file as they are produced.
         
         Args:
-            combined_data: Combined data ready for output
+            combined_rows: Combined rows ready for output
         """
-        if not combined_data:
-            logger.warning(f"Node '{self.node_id}': No combined data to write")
-            return
-        
         # Ensure output directory exists
         self.output_full_path.parent.mkdir(parents=True, exist_ok=True)
         
         logger.info(
-            f"Node '{self.node_id}': Writing {len(combined_data)} combined rows to {self.output_full_path}"
+            f"Node '{self.node_id}': Writing combined rows to {self.output_full_path}"
         )
         
-        with IncrementalJsonlWriter(self.output_full_path) as writer:
-            for key, row_data in combined_data.items():
+        rows_written = 0
+        with self._open_output_writer() as writer:
+            for row_data in combined_rows:
                 writer.write_row(row_data)
+                rows_written += 1
         
-        logger.info(f"Node '{self.node_id}': Successfully wrote combined output")
+        if not rows_written:
+            logger.warning(f"Node '{self.node_id}': No combined data to write")
+            return
+
+        logger.info(f"Node '{self.node_id}': Successfully wrote {rows_written} combined rows")
         
         # Generate additional output formats if requested
         self._generate_additional_output_formats()
@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any, Optional, Set, List, Callable, Tuple
-import json
+from typing import Dict, Any, Optional, Set, List, Callable, Tuple, Iterable, Iterator, Container
 import logging
+import threading
 from tqdm import tqdm
 from dataclasses import dataclass
+from polysome.utils.arrow_ipc import ARROW_SUFFIX, IncrementalArrowWriter, read_arrow_keys
 from polysome.utils.jsonl_writer import IncrementalJsonlWriter
 from polysome.utils.data_loader import DataFileLoader
+from polysome.utils.jsonl_tail import follow_jsonl
+from polysome.utils.key_index import TABLE_DIR, KeyedRowReader
 from polysome.nodes.node import (
     BaseNode,
     node_step_error_handler,
@@ -30,6 +33,14 @@ class JSONLProcessingNode(BaseNode, ABC):
     Subclasses only need to implement process_item() method.
     """
 
+    # Whether this node can feed or consume a streaming edge. Nodes that
+    # override run() and need all input at once must set this to False.
+    STREAMING_CAPABLE = True
+    # Storage formats for the output file handed to downstream nodes
+    INTERMEDIATE_FORMATS = ("jsonl", "arrow")
+    # Default rows per record batch for Arrow outputs
+    ARROW_FLUSH_ROWS = 1024
+
     def __init__(
         self,
         node_id: str,
@@ -47,6 +58,11 @@ class JSONLProcessingNode(BaseNode, ABC):
         # Processing-specific parameters
         self.resume = params.get("resume", False)
         self.output_data_attribute = params.get("output_data_attribute", "output")
+        # Write only the primary key and output attribute; downstream nodes
+        # look the other attributes up by key in attribute_source
+        self.lean_output = params.get("lean_output", False)
+        # Full rows for the keys of a lean input, set from the dependency
+        self.attribute_source: Optional[Path] = None
         
         # Engine sharing parameters
         self.use_shared_engines = params.get("use_shared_engines", True)
@@ -55,6 +71,39 @@ class JSONLProcessingNode(BaseNode, ABC):
         self.engine_options = params.get("engine_options", {})
         self.engine_timeout = params.get("engine_timeout", 300.0)  # 5 minutes default timeout
 
+        # Output storage format; "arrow" writes one record batch per commit
+        self.intermediate_format = params.get("intermediate_format", "jsonl")
+        if self.intermediate_format not in self.INTERMEDIATE_FORMATS:
+            raise ValueError(
+                f"Node '{self.node_id}': Invalid intermediate_format '{self.intermediate_format}', "
+                f"expected one of {self.INTERMEDIATE_FORMATS}"
+            )
+        if self.intermediate_format == "arrow":
+            self.output_data_file_name = f"{self.node_id}{ARROW_SUFFIX}"
+            self.output_full_path = self.output_data_path / self.output_data_file_name
+
+        # Output commit parameters (see IncrementalJsonlWriter)
+        self.output_flush_rows = params.get(
+            "output_flush_rows", self.ARROW_FLUSH_ROWS if self.intermediate_format == "arrow" else 1
+        )
+        self.output_flush_bytes = params.get("output_flush_bytes")
+        self.output_flush_interval = params.get("output_flush_interval")
+        self.output_fsync = params.get("output_fsync", "none")
+
+        # Streaming edge parameters
+        self.stream_input = params.get("stream_input", False)
+        self.stream_poll_interval = params.get("stream_poll_interval", 0.2)
+        self.stream_source: Optional["JSONLProcessingNode"] = None
+        self.stream_source_id: Optional[str] = None
+        # Items handed to processing by the current input stream
+        self._streamed_items = 0
+        # Set when the input stream ended without the upstream node succeeding
+        self._stream_source_error: Optional[str] = None
+
+        # Signalled to streaming consumers of this node's output
+        self.output_started = threading.Event()
+        self.output_finished = threading.Event()
+
         # Will be initialized during run
         self.data_loader: Optional[DataFileLoader] = None
         self.shared_engine = None  # For shared engine instances
@@ -166,6 +215,150 @@ class JSONLProcessingNode(BaseNode, ABC):
         except Exception as e:
             logger.error(f"Node '{self.node_id}': Failed to release shared engine: {e}")
 
+    def attach_stream_source(self, source_id: str, source: "JSONLProcessingNode") -> None:
+        """
+        Consume the output of a running upstream node as it is written.
+
+        Args:
+            source_id: Node ID of the upstream node.
+            source: The upstream node instance, which must be running.
+        """
+        self.stream_source_id = source_id
+        self.stream_source = source
+        logger.info(
+            f"Node '{self.node_id}': Streaming input from running node '{source_id}'"
+        )
+
+    def _wait_for_stream_source(self) -> Dict[str, Any]:
+        """Block until the upstream node has opened its output file."""
+        assert self.stream_source is not None and self.stream_source_id is not None
+        logger.info(
+            f"Node '{self.node_id}': Waiting for '{self.stream_source_id}' to start writing output"
+        )
+        self.stream_source.output_started.wait()
+        return {
+            self.stream_source_id: self.stream_source._prepare_output_info(
+                "streaming", 0
+            )
+        }
+
+    @node_step_error_handler(failure_status="failed_open_input_stream")
+    def _open_input_stream(self) -> tuple[Iterator[Tuple[str, Dict[str, Any]]], None]:
+        """
+        Open a record stream over the upstream node's growing output file.
+
+        Returns:
+            Tuple of (iterator of (key, row_data), None). The item count is
+            unknown until the upstream node has finished.
+        """
+        assert self.stream_source is not None
+        processed_ids = self._load_processed_ids() if self.resume else set()
+        finished = self.stream_source.output_finished
+        self._stream_source_error = None
+
+        def records() -> Iterator[Tuple[str, Dict[str, Any]]]:
+            if not self.input_data_path.exists():
+                # Upstream finished without writing any output
+                logger.warning(
+                    f"Node '{self.node_id}': Streamed input {self.input_data_path} was never created"
+                )
+                self._check_stream_source_status()
+                return
+            seen: Set[str] = set()
+            for i, record in enumerate(
+                follow_jsonl(self.input_data_path, finished, self.stream_poll_interval), 1
+            ):
+                if not isinstance(record, dict) or self.primary_key not in record:
+                    logger.warning(
+                        f"Node '{self.node_id}': Skipping streamed record {i} without primary key '{self.primary_key}'"
+                    )
+                    continue
+                key = str(record[self.primary_key])
+                if key in seen:
+                    logger.warning(
+                        f"Node '{self.node_id}': Duplicate primary key '{key}' in stream, keeping first occurrence"
+                    )
+                    continue
+                seen.add(key)
+                yield key, record
+            self._check_stream_source_status()
+
+        return self._with_source_attributes(self._filter_records(records(), processed_ids)), None
+
+    def _check_stream_source_status(self) -> None:
+        """Record an error if the upstream node ended without succeeding."""
+        status = self.stream_source.status
+        if not status.startswith("completed"):
+            self._stream_source_error = (
+                f"Input stream from '{self.stream_source_id}' is incomplete: "
+                f"the node ended with status '{status}'"
+            )
+            logger.error(f"Node '{self.node_id}': {self._stream_source_error}")
+
+    def _filter_records(
+        self,
+        records: Iterator[Tuple[str, Dict[str, Any]]],
+        processed_ids: Container[str],
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Skip already processed keys and count the items handed out."""
+        self._streamed_items = 0
+        skipped = 0
+        try:
+            for key, row_data in records:
+                if key in processed_ids:
+                    skipped += 1
+                    continue
+                self._streamed_items += 1
+                yield key, row_data
+        finally:
+            if isinstance(processed_ids, KeyedRowReader):
+                processed_ids.close()
+
+        if skipped > 0:
+            logger.info(
+                f"Node '{self.node_id}': Resume - skipped {skipped} already processed items"
+            )
+
+    def _with_source_attributes(
+        self, records: Iterator[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Fill in the attributes a lean dependency left out of its rows.
+
+        Each row is merged over the attribute_source row with the same key,
+        read by offset when the item is reached. Fields of the row itself win.
+        """
+        if self.attribute_source is None:
+            yield from records
+            return
+
+        with KeyedRowReader(
+            self.attribute_source, self.primary_key, cache_dir=self.output_dir / TABLE_DIR
+        ) as reader:
+            for key, row_data in records:
+                source_row = reader.get(key)
+                if source_row is None:
+                    logger.warning(
+                        f"Node '{self.node_id}': Key '{key}' not found in attribute source "
+                        f"{self.attribute_source}"
+                    )
+                    yield key, row_data
+                    continue
+                source_row.update(row_data)
+                yield key, source_row
+
+    def _load_all_input(self) -> Dict[str, Dict[str, Any]]:
+        """Load the whole input, with the attributes of a lean dependency filled in."""
+        assert self.data_loader is not None, "Data loader must be initialized"
+        return dict(self._with_source_attributes(iter(self.data_loader.load_input_data().items())))
+
+    @staticmethod
+    def _iter_items(data_to_process: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate (key, row_data) pairs from loaded data or an input stream."""
+        if isinstance(data_to_process, dict):
+            return iter(data_to_process.items())
+        return iter(data_to_process)
+
     @node_step_error_handler(failure_status="failed_resolve_input")
     def _resolve_input(self, input_data: Dict[str, Any] | None = None):
         """Resolve input data path and primary key from dependencies or params."""
@@ -183,6 +376,14 @@ class JSONLProcessingNode(BaseNode, ABC):
                 raise ValueError(f"Dependency '{dep_id}' missing 'output_path'.")
             self.input_data_path = Path(resolved_path_str)
 
+            # A lean dependency only carries its own output per row
+            attribute_source = dep_output.get("attribute_source")
+            self.attribute_source = Path(attribute_source) if attribute_source else None
+            if self.attribute_source is not None:
+                logger.info(
+                    f"Node '{self.node_id}': Resolving attributes of lean input from {self.attribute_source}"
+                )
+
             # Inherit primary key if not set
             if not self.primary_key and dep_output.get("primary_key"):
                 self.primary_key = dep_output["primary_key"]
@@ -216,6 +417,17 @@ class JSONLProcessingNode(BaseNode, ABC):
                 f"Node '{self.node_id}': primary_key could not be resolved."
             )
 
+        if (
+            self.lean_output
+            and self.attribute_source is None
+            and self.input_data_path.suffix.lower() != ".jsonl"
+        ):
+            logger.warning(
+                f"Node '{self.node_id}': lean_output needs JSONL input to look attributes up by key. "
+                f"Writing full rows."
+            )
+            self.lean_output = False
+
     @node_step_error_handler(failure_status="failed_init_data_loader")
     def _initialize_data_loader(self):
         """Initialize the data loader."""
@@ -232,32 +444,31 @@ class JSONLProcessingNode(BaseNode, ABC):
             primary_key=self.primary_key,
         )
 
-    def _load_processed_ids(self) -> Set[str]:
-        """Load already processed item IDs for resume functionality."""
-        processed_ids = set()
+    def _load_processed_ids(self) -> Container[str]:
+        """
+        Load already processed item IDs for resume functionality.
+
+        JSONL outputs are looked up by key in place through a KeyedRowReader
+        instead of loading every key. It only sees rows committed before
+        this run, so rows written by the run itself are not looked for.
+        """
         if not self.output_full_path.exists():
-            return processed_ids
+            return set()
 
         logger.info(f"Node '{self.node_id}': Loading processed IDs for resume...")
         try:
-            with open(self.output_full_path, "r", encoding="utf-8") as f:
-                for line_num, line in enumerate(f, 1):
-                    # Progress logging for large files
-                    if line_num % 5000 == 0:
-                        logger.info(f"Node '{self.node_id}': Processing line {line_num} for resume...")
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                        if isinstance(data, dict) and self.primary_key in data:
-                            processed_ids.add(str(data[self.primary_key]))
-                    except json.JSONDecodeError:
-                        logger.warning(
-                            f"Node '{self.node_id}': Invalid JSON on line {line_num}, skipping"
-                        )
+            if self.intermediate_format == "arrow":
+                processed_ids = set(read_arrow_keys(self.output_full_path, self.primary_key))
+            else:
+                processed_ids = KeyedRowReader(
+                    self.output_full_path,
+                    self.primary_key,
+                    refresh_on_miss=False,
+                    cache_dir=self.output_dir / TABLE_DIR,
+                )
         except Exception as e:
             logger.warning(f"Node '{self.node_id}': Error loading processed IDs: {e}")
+            processed_ids = set()
 
         logger.info(
             f"Node '{self.node_id}': Found {len(processed_ids)} already processed items"
@@ -265,53 +476,35 @@ class JSONLProcessingNode(BaseNode, ABC):
         return processed_ids
 
     @node_step_error_handler(failure_status="failed_load_data")
-    def _load_and_filter_data(self) -> tuple[Optional[Dict[str, Any]], int]:
-        """Load data and filter out already processed items if resuming."""
-        if not self.data_loader:
-            raise RuntimeError(f"Node '{self.node_id}': Data loader not initialized.")
+    def _load_and_filter_data(
+        self,
+    ) -> tuple[Optional[Iterator[Tuple[str, Dict[str, Any]]]], None]:
+        """
+        Open a lazy record stream over the input and filter out processed items.
 
-        # Load all data
-        logger.info(f"Node '{self.node_id}': Loading data from {self.input_data_path}")
-        all_data = self.data_loader.load_input_data()
-        total_items = len(all_data)
+        Records are read from the input file while they are processed, so
+        memory use does not grow with the input size.
 
-        if not all_data:
-            logger.warning(
-                f"Node '{self.node_id}': No data loaded from {self.input_data_path}"
-            )
-            return None, 0
+        Returns:
+            Tuple of (iterator of (key, row_data), None). The item count is
+            only known once the iterator is exhausted.
+        """
+        if not self.data_loader:
+            raise RuntimeError(f"Node '{self.node_id}': Data loader not initialized.")
 
-        logger.info(f"Node '{self.node_id}': Loaded {total_items} items")
+        logger.info(f"Node '{self.node_id}': Streaming data from {self.input_data_path}")
+        records = self.data_loader.iter_records()
 
         # Apply resume filtering if enabled
         logger.debug(f"Node '{self.node_id}': Checking resume flag: {self.resume}")
         if self.resume:
             logger.info(f"Node '{self.node_id}': Resume enabled, loading processed IDs...")
             processed_ids = self._load_processed_ids()
-            logger.info(f"Node '{self.node_id}': Starting data filtering with {len(processed_ids)} processed IDs...")
-            data_to_process = {
-                k: v for k, v in all_data.items() if str(k) not in processed_ids
-            }
-            logger.info(f"Node '{self.node_id}': Data filtering completed")
-            skipped = total_items - len(data_to_process)
-            if skipped > 0:
-                logger.info(
-                    f"Node '{self.node_id}': Resume - skipping {skipped} already processed items"
-                )
         else:
             logger.info(f"Node '{self.node_id}': Resume disabled, using all data")
-            data_to_process = all_data
+            processed_ids = set()
 
-        logger.debug(f"Node '{self.node_id}': Calculating items to process...")
-        items_to_process = len(data_to_process)
-        if items_to_process == 0:
-            logger.info(f"Node '{self.node_id}': No items to process")
-            return None, 0
-
-        logger.info(
-            f"Node '{self.node_id}': {items_to_process} items selected for processing"
-        )
-        return data_to_process, items_to_process
+        return self._with_source_attributes(self._filter_records(records, processed_ids)), None
 
     @processing_exception_handler(error_list_attr="errors", key_arg_index=1)
     def _process_item_wrapper(
@@ -321,19 +514,30 @@ class JSONLProcessingNode(BaseNode, ABC):
         return self.process_item(key, row_data)
 
     @node_step_error_handler(failure_status="failed_processing_execution")
-    def _execute_processing(self, data_to_process: Dict[str, Any], items_count: int):
-        """Execute the main processing loop."""
+    def _execute_processing(
+        self,
+        data_to_process: Iterable[Tuple[str, Dict[str, Any]]],
+        items_count: Optional[int],
+    ):
+        """
+        Execute the main processing loop.
+
+        Args:
+            data_to_process: (key, row) pairs still to be processed.
+            items_count: Number of pairs, or None when streaming.
+        """
         try:
             # Ensure output directory exists
             self.output_full_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with IncrementalJsonlWriter(self.output_full_path) as writer:
+            with self._open_output_writer() as writer:
+                self.output_started.set()
                 logger.info(
-                    f"Node '{self.node_id}': Processing {items_count} items -> {self.output_full_path}"
+                    f"Node '{self.node_id}': Processing {items_count if items_count is not None else 'streamed'} items -> {self.output_full_path}"
                 )
 
                 for key, row_data in tqdm(
-                    data_to_process.items(),
+                    self._iter_items(data_to_process),
                     desc=f"Processing {self.node_id}",
                     total=items_count,
                 ):
@@ -341,18 +545,9 @@ class JSONLProcessingNode(BaseNode, ABC):
                     processed_result = self._process_item_wrapper(key, row_data)
 
                     if processed_result is not None:
-                        # Build output record
-                        output_record = {
-                            self.primary_key: str(key),
-                            self.output_data_attribute: processed_result,
-                        }
-
-                        # Include original data attributes
-                        for orig_key, orig_value in row_data.items():
-                            if orig_key not in output_record:
-                                output_record[orig_key] = orig_value
-
-                        writer.write_row(output_record)
+                        writer.write_row(
+                            self._build_output_record(key, row_data, processed_result)
+                        )
 
         except IOError as e:
             logger.error(f"Node '{self.node_id}': I/O error during processing: {e}")
@@ -363,15 +558,52 @@ class JSONLProcessingNode(BaseNode, ABC):
             )
             raise
 
+    def _open_output_writer(self, mode: str = "a") -> IncrementalJsonlWriter:
+        """Create the writer for this node's output with its commit settings."""
+        writer_class = (
+            IncrementalArrowWriter if self.intermediate_format == "arrow" else IncrementalJsonlWriter
+        )
+        return writer_class(
+            self.output_full_path,
+            mode=mode,
+            flush_every_rows=self.output_flush_rows,
+            flush_every_bytes=self.output_flush_bytes,
+            flush_interval=self.output_flush_interval,
+            fsync=self.output_fsync,
+            key_field=self.primary_key,
+        )
+
+    def _build_output_record(
+        self, key: str, row_data: Dict[str, Any], result: Any
+    ) -> Dict[str, Any]:
+        """Build the output row for an item: key, result and original attributes."""
+        output_record = {
+            self.primary_key: str(key),
+            self.output_data_attribute: result,
+        }
+        if self.lean_output:
+            return output_record
+
+        # Include original data attributes
+        for orig_key, orig_value in row_data.items():
+            if orig_key not in output_record:
+                output_record[orig_key] = orig_value
+
+        return output_record
+
     def _prepare_output_info(self, status: str, error_count: int) -> Dict[str, Any]:
         """Prepare the output info dictionary."""
-        return {
+        output_info = {
             "output_path": str(self.output_full_path),
             "output_attribute": self.output_data_attribute,
             "primary_key": self.primary_key,
             "status": status,
             "errors_count": error_count,
         }
+        if self.lean_output and self.input_data_path:
+            # Point past lean ancestors to the nearest file with full rows
+            output_info["attribute_source"] = str(self.attribute_source or self.input_data_path)
+        return output_info
 
     def _execute_pipeline(self, steps: List[tuple[str, Callable]]) -> Any:
         """
@@ -419,17 +651,29 @@ class JSONLProcessingNode(BaseNode, ABC):
         self.errors = []
         self.status = "running"
         items_processed = 0
+        self.output_started.clear()
+        self.output_finished.clear()
 
         try:
             # Define the processing pipeline
-            pipeline_result = self._execute_pipeline(
-                [
-                    ("resolve_input", lambda: self._resolve_input(input_data)),
-                    ("initialize_data_loader", self._initialize_data_loader),
-                    ("setup_processing", self.setup_processing),
-                    ("load_and_filter_data", self._load_and_filter_data),
-                ]
-            )
+            if self.stream_source is not None:
+                input_data = self._wait_for_stream_source()
+                pipeline_result = self._execute_pipeline(
+                    [
+                        ("resolve_input", lambda: self._resolve_input(input_data)),
+                        ("setup_processing", self.setup_processing),
+                        ("open_input_stream", self._open_input_stream),
+                    ]
+                )
+            else:
+                pipeline_result = self._execute_pipeline(
+                    [
+                        ("resolve_input", lambda: self._resolve_input(input_data)),
+                        ("initialize_data_loader", self._initialize_data_loader),
+                        ("setup_processing", self.setup_processing),
+                        ("load_and_filter_data", self._load_and_filter_data),
+                    ]
+                )
 
             # Handle data processing if pipeline succeeded
             if self.status == "running":
@@ -437,7 +681,22 @@ class JSONLProcessingNode(BaseNode, ABC):
                     pipeline_result if pipeline_result else (None, 0)
                 )
 
-                if data_to_process and items_count > 0:
+                if data_to_process is not None and items_count is None:
+                    # Lazy input: the item count is only known afterwards
+                    self._execute_processing(data_to_process, items_count)
+                    items_processed = self._streamed_items
+                    if self.status == "running":
+                        if self._stream_source_error:
+                            # Rows written so far are kept; resume picks up the rest
+                            self.errors.append(self._stream_source_error)
+                            self.status = "failed_input_stream"
+                        elif self.errors:
+                            self.status = "completed_with_errors"
+                        elif items_processed == 0:
+                            self.status = "completed_no_new_items"
+                        else:
+                            self.status = "completed_successfully"
+                elif data_to_process and items_count > 0:
                     items_processed = items_count
                     self._execute_processing(data_to_process, items_count)
 
@@ -451,6 +710,10 @@ class JSONLProcessingNode(BaseNode, ABC):
                     self.status = "completed_no_new_items"
 
         finally:
+            # Unblock streaming consumers even if no output was written
+            self.output_started.set()
+            self.output_finished.set()
+
             # Always run cleanup
             try:
                 self.cleanup_processing()
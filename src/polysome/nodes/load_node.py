@@ -1,9 +1,9 @@
-from typing import Optional, Dict, Any, List, Tuple, Set
+from typing import Optional, Dict, Any, List, Tuple, Container
 from tqdm import tqdm
 import logging
-import json
 from pathlib import Path
 from polysome.utils.jsonl_writer import IncrementalJsonlWriter
+from polysome.utils.key_index import TABLE_DIR, KeyedRowReader
 from polysome.utils.data_loader import DataFileLoader
 from polysome.nodes.node import (
     BaseNode,
@@ -306,7 +306,9 @@ class LoadNode(BaseNode):
         records_written = 0
         # Use append mode if resume is enabled, write mode otherwise
         write_mode = "a" if self.resume else "w"
-        with IncrementalJsonlWriter(self.output_data_path, mode=write_mode) as writer:
+        with IncrementalJsonlWriter(
+            self.output_data_path, mode=write_mode, key_field=self.primary_key
+        ) as writer:
             logger.info(
                 f"Node '{self.node_id}': Writing {len(data)} items to {self.output_data_path}"
             )
@@ -344,32 +346,22 @@ class LoadNode(BaseNode):
             }
             loaded_data[key] = filtered_data
 
-    def _load_processed_ids(self) -> Set[str]:
-        """Load already processed item IDs for resume functionality."""
-        processed_ids = set()
+    def _load_processed_ids(self) -> Container[str]:
+        """Load already processed item IDs for resume functionality, looked up in place."""
         if not self.output_data_path.exists():
-            return processed_ids
+            return set()
 
         logger.info(f"Node '{self.node_id}': Loading processed IDs for resume...")
         try:
-            with open(self.output_data_path, "r", encoding="utf-8") as f:
-                for line_num, line in enumerate(f, 1):
-                    # Progress logging for large files
-                    if line_num % 5000 == 0:
-                        logger.info(f"Node '{self.node_id}': Processing line {line_num} for resume...")
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                        if isinstance(data, dict) and self.primary_key in data:
-                            processed_ids.add(str(data[self.primary_key]))
-                    except json.JSONDecodeError:
-                        logger.warning(
-                            f"Node '{self.node_id}': Invalid JSON on line {line_num}, skipping"
-                        )
+            processed_ids = KeyedRowReader(
+                self.output_data_path,
+                self.primary_key,
+                refresh_on_miss=False,
+                cache_dir=self.output_dir / TABLE_DIR,
+            )
         except Exception as e:
             logger.warning(f"Node '{self.node_id}': Error loading processed IDs: {e}")
+            processed_ids = set()
 
         logger.info(
             f"Node '{self.node_id}': Found {len(processed_ids)} already processed items"
@@ -402,6 +394,8 @@ class LoadNode(BaseNode):
                 data_to_process = {
                     k: v for k, v in loaded_data.items() if str(k) not in processed_ids
                 }
+                if isinstance(processed_ids, KeyedRowReader):
+                    processed_ids.close()
                 logger.info(f"Node '{self.node_id}': Data filtering completed")
                 skipped = total_items - len(data_to_process)
                 if skipped > 0:
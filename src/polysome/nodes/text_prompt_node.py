@@ -1,24 +1,98 @@
 from pathlib import Path
-from typing import Dict, Any, Tuple, List
+from typing import Callable, Dict, Any, Iterable, Iterator, Optional, Tuple, List
 import logging
+import multiprocessing
 import signal
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from functools import wraps
+from itertools import islice
 from polysome.nodes.jsonl_processing_node import JSONLProcessingNode
 from polysome.nodes.node import ValidationResult, node_step_error_handler
 from polysome.prompt_formatter import PromptFormatter
 from polysome.engines.registry import get_engine
-from polysome.utils.post_processing import extract_and_parse_json
+from polysome.engines.response_cache import (
+    CachedEngine,
+    get_response_cache,
+    is_deterministic,
+)
+from polysome.utils.post_processing import extract_and_parse_json, parse_json_outputs
 from polysome.utils.jsonl_writer import IncrementalJsonlWriter
 from tqdm import tqdm
 
 logger = logging.getLogger(__name__)
 
 
+def _common_prefix_length(a: str, b: str) -> int:
+    """Length of the common prefix of two strings, by binary search on slices."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class _InputOrderWriter:
+    """
+    Writer front that holds back the rows of a reordered window and writes
+    them in input order once the whole window has been generated.
+    """
+
+    def __init__(self, writer: IncrementalJsonlWriter, primary_key: str):
+        self.writer = writer
+        self.primary_key = primary_key
+        self._rows: Dict[str, Dict[str, Any]] = {}
+
+    def write_row(self, row: Dict[str, Any]) -> None:
+        self._rows[row[self.primary_key]] = row
+
+    def flush_window(self, keys: List[str]) -> None:
+        """Write the buffered rows of ``keys`` in that order; failed items are skipped."""
+        for key in keys:
+            row = self._rows.pop(str(key), None)
+            if row is not None:
+                self.writer.write_row(row)
+
+
+# Engines that report failures in-band return text starting with this prefix
+_ENGINE_ERROR_PREFIX = "Error generating text"
+
+
+def _is_out_of_memory(message: str) -> bool:
+    """Whether an error message reports an accelerator out-of-memory error."""
+    return "out of memory" in message.lower()
+
+
+def _is_out_of_memory_output(output: Any) -> bool:
+    """
+    Whether a generated output is an engine's in-band out-of-memory error.
+
+    Only engine error text counts, so a completion that merely mentions
+    running out of memory is a normal result.
+    """
+    return (
+        isinstance(output, str)
+        and output.startswith(_ENGINE_ERROR_PREFIX)
+        and _is_out_of_memory(output)
+    )
+
+
 def timeout_wrapper(timeout_seconds: float, error_message: str = "Operation timed out"):
     """
     Decorator that adds timeout functionality to a function.
 
+    On the main thread the timeout relies on SIGALRM. SIGALRM can only be
+    installed from the main thread, so when called from a worker thread (e.g.
+    concurrent workflow execution) the function runs on a helper thread that
+    is waited on for at most ``timeout_seconds``. A call that times out there
+    cannot be interrupted and keeps running in the background.
+
     Args:
         timeout_seconds: Maximum time to wait for function completion
         error_message: Message to include in TimeoutError
@@ -27,6 +101,23 @@ def timeout_wrapper(timeout_seconds: float, error_message: str = "Operation time
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            if threading.current_thread() is not threading.main_thread():
+                future = Future()
+
+                def run():
+                    try:
+                        future.set_result(func(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+
+                threading.Thread(
+                    target=run, name=f"timeout-{func.__name__}", daemon=True
+                ).start()
+                try:
+                    return future.result(timeout=timeout_seconds)
+                except FutureTimeoutError:
+                    raise TimeoutError(error_message) from None
+
             class TimeoutException(Exception):
                 pass
 
@@ -60,6 +151,11 @@ class TextPromptNode(JSONLProcessingNode):
     DEFAULT_SYSTEM_PROMPT_FILE = "system_prompt.txt"
     DEFAULT_USER_PROMPT_FILE = "user_prompt.txt"
     DEFAULT_FEW_SHOT_LINES_FILE = "few_shot.jsonl"
+    RESPONSE_CACHE_FILE = Path(".cache") / "responses.sqlite"
+    # Items whose token counts are estimated together when packing by tokens
+    TOKEN_PACKING_WINDOW = 256
+    # Batches queued for JSON parsing per parse worker before writing waits
+    PARSE_BATCHES_PER_WORKER = 2
 
     def __init__(
         self,
@@ -88,10 +184,48 @@ class TextPromptNode(JSONLProcessingNode):
         self.generation_options = params.get("generation_options", {})
         self.template_context_map = params.get("template_context_map", {})
         self.parse_json = params.get("parse_json", False)
+        # Worker processes parsing batch outputs while the next batch generates
+        self.parse_json_workers = params.get("parse_json_workers", 0)
         self.batch_size = params.get("batch_size", 1)
         self.batch_timeout = params.get(
             "batch_timeout", 600.0
         )  # 10 minutes default batch timeout
+        # Continuous feed: number of requests kept in flight (0 = fixed batches)
+        self.max_in_flight = params.get("max_in_flight", 0)
+        # Batches submitted ahead of the one being written (1 = synchronous)
+        self.max_batches_in_flight = params.get("max_batches_in_flight", 1)
+        # Merge batches with sibling nodes that share the same engine
+        self.shared_batching = params.get("shared_batching", False)
+        self.shared_batch_max_prompts = params.get("shared_batch_max_prompts")
+        # On-disk cache of deterministic completions under the workflow output_dir
+        self.response_cache = params.get("response_cache", False)
+        self.response_cache_max_mb = params.get("response_cache_max_mb", 1024)
+        # Reorder requests so prompts sharing a prefix are sent together
+        self.prefix_ordering = params.get("prefix_ordering", False)
+        self.prefix_ordering_window = params.get("prefix_ordering_window", 1024)
+        if self.prefix_ordering and self.engine_name in ("vllm", "vllm_dp"):
+            self.engine_options = {"enable_prefix_caching": True, **self.engine_options}
+        # Batch prompts of similar token length together to reduce padding
+        self.length_bucketing = params.get("length_bucketing", False)
+        self.length_bucketing_window = params.get("length_bucketing_window", 1024)
+        if self.length_bucketing and self.prefix_ordering:
+            logger.warning(
+                f"Node '{self.node_id}': length_bucketing is ignored with prefix_ordering, "
+                f"which already decides the batch order."
+            )
+            self.length_bucketing = False
+        # Pack batches up to a token budget instead of a fixed item count
+        self.max_batch_tokens = params.get("max_batch_tokens")
+        self._token_budget = self.max_batch_tokens or float("inf")
+        self._max_new_tokens = (
+            self.generation_options.get("max_tokens")
+            or self.generation_options.get("max_new_tokens")
+            or 0
+        )
+        # Estimated prompt tokens of items waiting to be written, by key
+        self._prompt_tokens: Dict[str, int] = {}
+        # Batch size, lowered after out-of-memory errors
+        self._batch_size_limit = self.batch_size
 
         # Prompt configuration
         self.system_prompt_file = params.get(
@@ -113,6 +247,17 @@ class TextPromptNode(JSONLProcessingNode):
         # Will be initialized in setup_processing
         self.prompt_formatter = None
         self.model = None
+        self.request_scheduler = None
+        self.cached_engine = None
+        self.json_parse_pool = None
+        # Held for each timed batch call, which may outlive its timeout
+        self._batch_call_lock = threading.Lock()
+        # Batches waiting on the parse pool, written in submission order
+        self._pending_parses = deque()
+        # Prompt characters shared with the previous prompt, and in total
+        self._previous_prompt = None
+        self._prefix_shared_chars = 0
+        self._prompt_chars = 0
 
         logger.info(
             f"TextPromptNode '{self.node_id}' initialized with model '{self.model_name}'"
@@ -131,7 +276,19 @@ class TextPromptNode(JSONLProcessingNode):
             "generation_options": dict,
             "template_context_map": dict,
             "parse_json": bool,
+            "parse_json_workers": int,
             "batch_size": int,
+            "max_in_flight": int,
+            "max_batches_in_flight": int,
+            "shared_batching": bool,
+            "shared_batch_max_prompts": int,
+            "response_cache": bool,
+            "response_cache_max_mb": (int, float),
+            "prefix_ordering": bool,
+            "prefix_ordering_window": int,
+            "length_bucketing": bool,
+            "length_bucketing_window": int,
+            "max_batch_tokens": int,
             "system_prompt_file": str,
             "user_prompt_file": str,
             "few_shot_lines_file": str,
@@ -147,6 +304,13 @@ class TextPromptNode(JSONLProcessingNode):
             "inference_engine": {
                 "choices": ["huggingface", "llama_cpp", "vllm", "vllm_dp"]
             },
+            "parse_json_workers": {"min": 0},
+            "max_in_flight": {"min": 0},
+            "max_batches_in_flight": {"min": 1},
+            "response_cache_max_mb": {"min": 1},
+            "prefix_ordering_window": {"min": 1},
+            "length_bucketing_window": {"min": 1},
+            "max_batch_tokens": {"min": 1},
         }
 
     def _validate_custom_logic(self, result: ValidationResult) -> None:
@@ -269,6 +433,13 @@ class TextPromptNode(JSONLProcessingNode):
         if not self.model_name:
             raise ValueError(f"Node '{self.node_id}': model_name is required")
 
+        self._previous_prompt = None
+        self._prefix_shared_chars = 0
+        self._prompt_chars = 0
+        self._token_budget = self.max_batch_tokens or float("inf")
+        self._batch_size_limit = self.batch_size
+        self._prompt_tokens = {}
+
         try:
             # Initialize prompt formatter (matching your existing PromptFormatter usage)
             prompt_dir = self.prompts_dir / self.name
@@ -306,6 +477,19 @@ class TextPromptNode(JSONLProcessingNode):
                         f"Failed to create engine for model '{self.model_name}': {e}"
                     ) from e
 
+            if self.shared_batching:
+                self._setup_request_scheduler()
+
+            if self.response_cache:
+                self._setup_response_cache()
+
+            if self.parse_json and self.parse_json_workers > 0:
+                # Spawned, since forking a process with CUDA state or engine threads is unsafe
+                self.json_parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_json_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
             logger.info(
                 f"Node '{self.node_id}': LLM setup complete - {self.model_name}"
             )
@@ -316,8 +500,69 @@ class TextPromptNode(JSONLProcessingNode):
             self.cleanup_processing()
             raise
 
+    def _setup_request_scheduler(self) -> None:
+        """Attach to the engine pool's request scheduler for the shared engine."""
+        if self.shared_engine is None:
+            logger.warning(
+                f"Node '{self.node_id}': shared_batching requires a shared engine. "
+                f"Falling back to per-node batches."
+            )
+            return
+
+        from polysome.engines.engine_pool import get_engine_pool
+
+        self.request_scheduler = get_engine_pool().get_request_scheduler(
+            engine_name=self.engine_name,
+            model_name=self.model_name,
+            engine_options=self.engine_options,
+            node_id=self.node_id,
+            max_batch_prompts=self.shared_batch_max_prompts,
+        )
+
+    def _setup_response_cache(self) -> None:
+        """Wrap the engine so deterministic requests are served from the cache."""
+        if not is_deterministic(self.generation_options):
+            logger.warning(
+                f"Node '{self.node_id}': response_cache only applies to deterministic "
+                f"generation (temperature 0 or a fixed seed). Cache disabled."
+            )
+            return
+
+        cache = get_response_cache(
+            self.output_dir / self.RESPONSE_CACHE_FILE,
+            int(self.response_cache_max_mb * 1024 * 1024),
+        )
+        self.cached_engine = CachedEngine(
+            self.model, cache, self.engine_name, self.engine_options
+        )
+        self.model = self.cached_engine
+        logger.info(f"Node '{self.node_id}': Using response cache {cache.path}")
+
     def cleanup_processing(self) -> None:
         """Clean up resources after processing."""
+        if self.cached_engine is not None:
+            lookups = self.cached_engine.hits + self.cached_engine.misses
+            logger.info(
+                f"Node '{self.node_id}': Response cache served {self.cached_engine.hits} "
+                f"of {lookups} requests ({self.cached_engine.misses} misses)"
+            )
+            self.cached_engine = None
+
+        if self._prompt_chars:
+            logger.info(
+                f"Node '{self.node_id}': Prompt prefix reuse {self.prefix_reuse_rate:.1%} "
+                f"(share of prompt text repeating the previous prompt's prefix)"
+            )
+        self._previous_prompt = None
+
+        # The scheduler is owned by the engine pool and stopped with the engine
+        self.request_scheduler = None
+
+        if self.json_parse_pool is not None:
+            self.json_parse_pool.shutdown(wait=False, cancel_futures=True)
+            self.json_parse_pool = None
+        self._pending_parses.clear()
+
         # If using shared engines, the base class will handle release
         # If using non-shared engines, we need to unload manually
         if self.model is not None and not self.use_shared_engines:
@@ -339,32 +584,35 @@ class TextPromptNode(JSONLProcessingNode):
         # Clear prompt formatter as well
         self.prompt_formatter = None
 
+    def _build_template_context(self, key: str, row_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map row attributes to prompt template variables."""
+        if not self.template_context_map:
+            # No map: pass all row_data attributes directly
+            return row_data.copy()
+
+        template_context = {}
+        for template_var, data_key in self.template_context_map.items():
+            if data_key in row_data:
+                template_context[template_var] = row_data[data_key]
+            else:
+                logger.warning(
+                    f"Node '{self.node_id}', item '{key}': Data key '{data_key}' for template variable "
+                    f"'{template_var}' not found in row_data. Variable will be missing or empty in template."
+                )
+                template_context[template_var] = ""
+        return template_context
+
     def process_item(self, key: str, row_data: Dict[str, Any]) -> Any:
         """Process item using LLM."""
         logger.debug(f"Node '{self.node_id}': Processing item with key: {key}")
 
-        # Prepare template context (matching your existing logic)
-        if self.template_context_map:
-            template_context = {}
-            for template_var, data_key in self.template_context_map.items():
-                if data_key in row_data:
-                    template_context[template_var] = row_data[data_key]
-                else:
-                    logger.warning(
-                        f"Node '{self.node_id}', item '{key}': Data key '{data_key}' for template variable "
-                        f"'{template_var}' not found in row_data. Variable will be missing or empty in template."
-                    )
-                    template_context[template_var] = ""
-        else:
-            # No map: pass all row_data attributes directly
-            template_context = row_data.copy()
-
         assert self.prompt_formatter is not None and self.model is not None, (
             f"Node '{self.node_id}': Prompt formatter and model must be initialized before processing items."
         )
 
         # Generate prompt and get LLM response
-        messages = self.prompt_formatter.create_messages(template_context)
+        messages = self._render_messages(key, row_data)
+        self._track_prefix_reuse(messages)
         output = self.model.generate_text(messages, **self.generation_options)
 
         # Parse JSON if requested
@@ -376,11 +624,312 @@ class TextPromptNode(JSONLProcessingNode):
 
         return output
 
-    def _execute_processing(self, data_to_process: Dict[str, Any], items_count: int):
+    def _render_messages(
+        self,
+        key: str,
+        row_data: Dict[str, Any],
+        few_shot_messages: Optional[List[Dict[str, str]]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Render the chat messages for one item.
+
+        With the response cache on, few-shot examples are selected with the
+        item key as seed, so a rerun sends the same messages and hits the cache.
+        """
+        template_context = self._build_template_context(key, row_data)
+        if few_shot_messages is None and self.cached_engine is not None and self.num_few_shots > 0:
+            few_shot_messages = self.prompt_formatter.render_few_shot_messages(
+                self.prompt_formatter.select_few_shot_examples(seed=key)
+            )
+        if few_shot_messages is None:
+            return self.prompt_formatter.create_messages(template_context)
+        return self.prompt_formatter.create_messages(
+            template_context, few_shot_messages=few_shot_messages
+        )
+
+    def _iter_prompts(
+        self, items: Iterator[Tuple[str, Dict[str, Any]]], group_size: int
+    ) -> Iterator[Tuple[str, Dict[str, Any], List[Dict[str, str]]]]:
+        """
+        Render prompts for the items, yielding (key, row_data, messages).
+
+        With prefix_ordering, items are read in windows of
+        ``prefix_ordering_window`` and sorted by their rendered messages, so
+        prompts sharing a prefix are sent together and the engine's prefix
+        cache can reuse it. Few-shot examples are then pinned per group of
+        ``group_size`` prompts (one batch) instead of sampled per item.
+        Items whose prompt cannot be rendered are recorded as errors and skipped.
+        """
+        if not self.prefix_ordering:
+            for key, row_data in items:
+                try:
+                    messages = self._render_messages(key, row_data)
+                except Exception as e:
+                    logger.error(f"Node '{self.node_id}': Error preparing prompt for item {key}: {e}")
+                    self.errors.append(f"Item {key}: {e}")
+                    continue
+                self._track_prefix_reuse(messages)
+                yield key, row_data, messages
+            return
+
+        # Whole groups per window, so groups do not straddle windows
+        window = max(1, self.prefix_ordering_window // group_size) * group_size
+        while True:
+            window_items = list(islice(items, window))
+            if not window_items:
+                return
+            # Few-shots are left out here and spliced in per group
+            rendered = self._render_window(window_items)
+
+            rendered.sort(key=lambda item: [m["content"] for m in item[2]])
+            for start in range(0, len(rendered), group_size):
+                group = rendered[start : start + group_size]
+                # With the response cache, every group gets the same examples,
+                # so groups shifted by a resume or other batch sizes still hit
+                seed = self.node_id if self.cached_engine is not None else None
+                few_shots = self.prompt_formatter.render_few_shot_messages(
+                    self.prompt_formatter.select_few_shot_examples(seed=seed)
+                )
+                for key, row_data, messages in group:
+                    messages = messages[:1] + few_shots + messages[1:]
+                    self._track_prefix_reuse(messages)
+                    yield key, row_data, messages
+
+    def _render_window(
+        self, items: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Tuple[str, Dict[str, Any], List[Dict[str, str]]]]:
+        """
+        Render a window of items without few-shot examples in one formatter call.
+
+        If that fails, items are rendered one by one so only the failing
+        items are recorded as errors.
+        """
+        try:
+            contexts = [self._build_template_context(key, row_data) for key, row_data in items]
+            batch = self.prompt_formatter.create_messages_batch(contexts, few_shot_messages=[])
+            return [(key, row_data, messages) for (key, row_data), messages in zip(items, batch)]
+        except Exception:
+            pass
+
+        rendered = []
+        for key, row_data in items:
+            try:
+                messages = self._render_messages(key, row_data, few_shot_messages=[])
+            except Exception as e:
+                logger.error(f"Node '{self.node_id}': Error preparing prompt for item {key}: {e}")
+                self.errors.append(f"Item {key}: {e}")
+                continue
+            rendered.append((key, row_data, messages))
+        return rendered
+
+    def _iter_batches(
+        self, prompts: Iterator[Tuple[str, Dict[str, Any], List[Dict[str, str]]]]
+    ) -> Iterator[Tuple[List[Tuple[str, Dict[str, Any], List[Dict[str, str]]]], Optional[List[str]]]]:
+        """
+        Group prompts into batches.
+
+        Yields (batch_items, window_keys). By default batches hold
+        ``batch_size`` prompts in input order. With length_bucketing or
+        max_batch_tokens, prompts are read in windows and their token counts
+        estimated in one engine call per window. length_bucketing sorts each
+        window by token count so batches are padded to similar lengths.
+        max_batch_tokens packs batches up to the token budget instead of a
+        fixed count. When a window was reordered, its last batch carries the
+        window's keys in input order, to restore that order when writing;
+        otherwise window_keys is None.
+        """
+        if not self.length_bucketing and self.max_batch_tokens is None:
+            for batch_items in iter(lambda: list(islice(prompts, self._batch_size_limit)), []):
+                yield batch_items, None
+            return
+
+        window_size = (
+            self.length_bucketing_window if self.length_bucketing else self.TOKEN_PACKING_WINDOW
+        )
+        window = max(1, window_size // self.batch_size) * self.batch_size
+        while True:
+            window_items = list(islice(prompts, window))
+            if not window_items:
+                return
+            # The shared engine's tokenizer must not run beside its batches
+            counter = self.request_scheduler if self.request_scheduler is not None else self.model
+            lengths = counter.count_prompt_tokens(
+                [messages for _, _, messages in window_items]
+            )
+            for (key, _, _), length in zip(window_items, lengths):
+                self._prompt_tokens[key] = length
+
+            window_keys = None
+            if self.length_bucketing:
+                window_keys = [key for key, _, _ in window_items]
+                window_items = sorted(window_items, key=lambda item: self._prompt_tokens[item[0]])
+
+            # One batch of lookahead to know which batch ends the window
+            batches = self._pack_batches(window_items)
+            previous = next(batches)
+            for batch_items in batches:
+                yield previous, None
+                previous = batch_items
+            yield previous, window_keys
+
+    def _pack_batches(
+        self, items: List[Tuple[str, Dict[str, Any], List[Dict[str, str]]]]
+    ) -> Iterator[List[Tuple[str, Dict[str, Any], List[Dict[str, str]]]]]:
+        """
+        Split items into consecutive batches within the batch limits.
+
+        Packed lazily so a budget lowered after an out-of-memory error
+        applies to the rest of the window.
+        """
+        batch, longest, total = [], 0, 0
+        for item in items:
+            tokens = self._prompt_tokens[item[0]] + self._max_new_tokens
+            if batch and (
+                len(batch) >= self._max_batch_items()
+                or self._batch_cost(len(batch) + 1, max(longest, tokens), total + tokens)
+                > self._token_budget
+            ):
+                yield batch
+                batch, longest, total = [], 0, 0
+            batch.append(item)
+            longest = max(longest, tokens)
+            total += tokens
+        if batch:
+            yield batch
+
+    def _max_batch_items(self) -> float:
+        if self.max_batch_tokens is not None and self.batch_size <= 1:
+            return float("inf")  # Only the token budget limits
+        return self._batch_size_limit
+
+    def _batch_cost(self, count: int, longest: int, total: int) -> int:
+        """Tokens a batch occupies; padding engines pay for the longest item."""
+        if self.model.PADS_BATCHES:
+            return count * longest
+        return total
+
+    def _generate_with_oom_retry(
+        self,
+        batch_keys: List[str],
+        batch_messages: List[List[Dict[str, str]]],
+        get_outputs: Callable[[], List[Any]],
+    ) -> List[Any]:
+        """
+        Fetch a batch's outputs, splitting the batch on out-of-memory errors.
+
+        An out-of-memory error (raised, or returned as error text by engines
+        that report failures in-band) lowers the batch limit for the batches
+        that follow and retries both halves of the batch, down to single items.
+        """
+        try:
+            outputs = get_outputs()
+        except Exception as e:
+            if len(batch_messages) == 1 or not _is_out_of_memory(str(e)):
+                raise
+        else:
+            if len(batch_messages) == 1 or not any(
+                _is_out_of_memory_output(output) for output in outputs
+            ):
+                return outputs
+
+        self._shrink_batch_limit(batch_keys)
+        half = len(batch_messages) // 2
+        outputs = []
+        for keys, messages in (
+            (batch_keys[:half], batch_messages[:half]),
+            (batch_keys[half:], batch_messages[half:]),
+        ):
+            outputs.extend(
+                self._generate_with_oom_retry(
+                    keys, messages, lambda messages=messages: self._generate_batch(messages)
+                )
+            )
+        return outputs
+
+    def _shrink_batch_limit(self, batch_keys: List[str]) -> None:
+        """Halve the batch limit below the size of a batch that ran out of memory."""
+        if self.max_batch_tokens is not None and all(k in self._prompt_tokens for k in batch_keys):
+            tokens = [self._prompt_tokens[k] + self._max_new_tokens for k in batch_keys]
+            cost = self._batch_cost(len(tokens), max(tokens), sum(tokens))
+            self._token_budget = max(1, min(self._token_budget, cost // 2))
+            limit = f"max_batch_tokens {self._token_budget}"
+        else:
+            self._batch_size_limit = max(1, min(self._batch_size_limit, len(batch_keys) // 2))
+            limit = f"batch_size {self._batch_size_limit}"
+        logger.warning(
+            f"Node '{self.node_id}': Out of memory on a batch of {len(batch_keys)} items. "
+            f"Retrying in halves and lowering {limit}."
+        )
+
+    def _track_prefix_reuse(self, messages: List[Dict[str, str]]) -> None:
+        """Count how much of a prompt repeats the prefix of the one sent before it."""
+        shared = 0
+        previous = self._previous_prompt or []
+        for i, message in enumerate(messages):
+            if i >= len(previous) or previous[i]["role"] != message["role"]:
+                break
+            if previous[i]["content"] != message["content"]:
+                shared += _common_prefix_length(previous[i]["content"], message["content"])
+                break
+            shared += len(message["content"])
+        self._prefix_shared_chars += shared
+        self._prompt_chars += sum(len(m["content"]) for m in messages)
+        self._previous_prompt = messages
+
+    @property
+    def uses_request_scheduler(self) -> bool:
+        """
+        Whether every engine call goes through the shared engine's request
+        scheduler, which serializes them with sibling nodes.
+
+        Predicted from the params until the node is set up. Afterwards it
+        reports whether a scheduler was actually attached, which it is not
+        when no shared engine could be acquired.
+        """
+        scheduled = bool(
+            self.shared_batching
+            and self.use_shared_engines
+            and self.max_in_flight == 0
+            and (self.batch_size > 1 or self.max_batch_tokens is not None)
+        )
+        if self.model is not None:
+            return scheduled and self.request_scheduler is not None
+        return scheduled
+
+    @property
+    def prefix_reuse_rate(self) -> float:
+        """
+        Share of prompt characters that repeat the previous prompt's prefix.
+
+        An engine-independent estimate of the prefix-cache hit rate for the
+        prompts this node sent, in the order it sent them.
+        """
+        if not self._prompt_chars:
+            return 0.0
+        return self._prefix_shared_chars / self._prompt_chars
+
+    def _prepare_output_info(self, status: str, error_count: int) -> Dict[str, Any]:
+        """Prepare the output info dictionary, including prompt prefix reuse."""
+        output_info = super()._prepare_output_info(status, error_count)
+        if self._prompt_chars:
+            output_info["prefix_reuse_rate"] = round(self.prefix_reuse_rate, 4)
+        return output_info
+
+    def _execute_processing(
+        self,
+        data_to_process: Iterable[Tuple[str, Dict[str, Any]]],
+        items_count: Optional[int],
+    ):
         """Execute the main processing loop with optional batching."""
-        if self.batch_size <= 1 or not self.model.supports_native_batching():
+        if self.max_in_flight > 0:
+            self._execute_continuous_processing(data_to_process, items_count)
+        elif (self.batch_size <= 1 and self.max_batch_tokens is None) or (
+            self.request_scheduler is None and not self.model.supports_native_batching()
+        ):
             # Use default single-item processing
-            if self.batch_size > 1 and not self.model.supports_native_batching():
+            if not self.model.supports_native_batching() and (
+                self.batch_size > 1 or self.max_batch_tokens is not None
+            ):
                 logger.info(
                     f"Node '{self.node_id}': Engine '{self.engine_name}' does not support native batching. "
                     f"Using single-item processing."
@@ -390,9 +939,254 @@ class TextPromptNode(JSONLProcessingNode):
             # Use batch processing
             self._execute_batch_processing(data_to_process, items_count)
 
+    @node_step_error_handler(failure_status="failed_continuous_processing_execution")
+    def _execute_continuous_processing(
+        self,
+        data_to_process: Iterable[Tuple[str, Dict[str, Any]]],
+        items_count: Optional[int],
+    ):
+        """
+        Execute processing with a continuously refilled set of in-flight requests.
+
+        Results are written in completion order as soon as each one is ready.
+        """
+        self.output_full_path.parent.mkdir(parents=True, exist_ok=True)
+        file_mode = "a" if self.resume else "w"
+        in_flight_rows: Dict[str, Dict[str, Any]] = {}
+
+        def requests():
+            # Render prompts lazily, only when a slot frees up
+            for key, row_data, messages in self._iter_prompts(
+                self._iter_items(data_to_process), self.max_in_flight
+            ):
+                in_flight_rows[key] = row_data
+                yield key, messages
+
+        with self._open_output_writer(mode=file_mode) as writer:
+            self.output_started.set()
+            logger.info(
+                f"Node '{self.node_id}': Processing {items_count if items_count is not None else 'streamed'} items with up to "
+                f"{self.max_in_flight} requests in flight -> {self.output_full_path}"
+            )
+
+            for key, output, error in tqdm(
+                self.model.generate_text_stream(
+                    requests(), self.max_in_flight, **self.generation_options
+                ),
+                desc=f"Processing {self.node_id} (continuous)",
+                total=items_count,
+            ):
+                row_data = in_flight_rows.pop(key)
+                if error is not None:
+                    logger.error(f"Node '{self.node_id}': Error processing item {key}: {error}")
+                    self.errors.append(f"Item {key}: {error}")
+                    continue
+
+                try:
+                    if self.parse_json:
+                        parsed_output = extract_and_parse_json(output)
+                        if parsed_output is not None:
+                            output = parsed_output
+                    writer.write_row(self._build_output_record(key, row_data, output))
+                except Exception as e:
+                    logger.error(f"Node '{self.node_id}': Error writing item {key}: {e}")
+                    self.errors.append(f"Item {key}: {e}")
+
+    def _generate_batch(self, batch_messages: List[List[Dict[str, str]]]) -> List[Any]:
+        """Generate one batch synchronously, bounded by batch_timeout."""
+        logger.debug(
+            f"Node '{self.node_id}': Starting batch processing with timeout {self.batch_timeout}s"
+        )
+        if self.request_scheduler is not None:
+            # Merged with sibling nodes; the scheduler enforces the timeout
+            def generate(messages_batch):
+                return self.request_scheduler.generate_text_batch(
+                    messages_batch,
+                    node_id=self.node_id,
+                    timeout=self.batch_timeout,
+                    **self.generation_options,
+                )
+
+            if self.cached_engine is not None:
+                return self.cached_engine.generate_batch_cached(
+                    batch_messages, generate, self.generation_options
+                )
+            return generate(batch_messages)
+
+        # Create a timeout wrapper for the batch processing
+        @timeout_wrapper(
+            self.batch_timeout,
+            f"Batch processing timed out after {self.batch_timeout} seconds",
+        )
+        def process_batch_with_timeout():
+            # A batch that timed out off the main thread may still be running
+            with self._batch_call_lock:
+                return self.model.generate_text_batch(
+                    batch_messages, **self.generation_options
+                )
+
+        return process_batch_with_timeout()
+
+    def _submit_batch(self, batch_messages: List[List[Dict[str, str]]]) -> Future:
+        """Submit one batch without waiting for its results."""
+        try:
+            if self.request_scheduler is not None:
+                def submit(messages_batch):
+                    return self.request_scheduler.submit(
+                        messages_batch, node_id=self.node_id, **self.generation_options
+                    )
+
+                if self.cached_engine is not None:
+                    return self.cached_engine.submit_batch_cached(
+                        batch_messages, submit, self.generation_options
+                    )
+                return submit(batch_messages)
+            return self.model.submit_text_batch(batch_messages, **self.generation_options)
+        except Exception as e:
+            # Surface submission errors when the batch is written, like generation errors
+            future = Future()
+            future.set_exception(e)
+            return future
+
+    def _write_pending_batch(self, writer: IncrementalJsonlWriter, pending: Tuple) -> None:
+        """Wait for a submitted batch and write its results."""
+        batch_start, batch_keys, batch_row_data, batch_messages, future, window_keys = pending
+
+        def wait_for_outputs():
+            try:
+                return future.result(timeout=self.batch_timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise TimeoutError(
+                    f"Batch processing timed out after {self.batch_timeout} seconds"
+                )
+
+        self._write_batch_results(
+            writer,
+            batch_start,
+            batch_keys,
+            batch_row_data,
+            lambda: self._generate_with_oom_retry(batch_keys, batch_messages, wait_for_outputs),
+            window_keys,
+        )
+
+    def _write_batch_results(
+        self,
+        writer: IncrementalJsonlWriter,
+        batch_start: int,
+        batch_keys: List[str],
+        batch_row_data: List[Dict[str, Any]],
+        get_outputs: Callable[[], List[Any]],
+        window_keys: Optional[List[str]] = None,
+    ) -> None:
+        """Fetch a batch's outputs and write them, recording per-item errors."""
+        batch_outputs = []
+        try:
+            batch_outputs = get_outputs()
+        except TimeoutError as e:
+            logger.error(
+                f"Node '{self.node_id}': Batch processing timed out starting at {batch_start}: {e}"
+            )
+            # Add timeout errors for all items in the failed batch
+            for key in batch_keys:
+                self.errors.append(f"Item {key}: Batch processing timed out: {e}")
+        except Exception as e:
+            logger.error(
+                f"Node '{self.node_id}': Error processing batch starting at {batch_start}: {e}"
+            )
+            # Add errors for all items in the failed batch
+            for key in batch_keys:
+                self.errors.append(f"Item {key}: Batch processing failed: {e}")
+        finally:
+            for key in batch_keys:
+                self._prompt_tokens.pop(key, None)
+
+        if self.json_parse_pool is None:
+            self._write_outputs(writer, batch_keys, batch_row_data, batch_outputs, window_keys)
+            return
+
+        # Parse off the generation path; rows are written once parsing is done
+        future = None
+        if batch_outputs:
+            try:
+                future = self.json_parse_pool.submit(parse_json_outputs, batch_outputs)
+            except Exception as e:
+                # E.g. BrokenProcessPool after a worker died: parse inline from now on
+                logger.warning(
+                    f"Node '{self.node_id}': JSON parse pool unavailable ({e}), parsing inline"
+                )
+                self.json_parse_pool.shutdown(wait=False, cancel_futures=True)
+                self.json_parse_pool = None
+                while self._pending_parses:
+                    self._write_parsed_batch(writer, self._pending_parses.popleft())
+                self._write_outputs(
+                    writer, batch_keys, batch_row_data, batch_outputs, window_keys
+                )
+                return
+        self._pending_parses.append(
+            (batch_keys, batch_row_data, batch_outputs, future, window_keys)
+        )
+        max_pending = self.parse_json_workers * self.PARSE_BATCHES_PER_WORKER
+        while self._pending_parses and (
+            len(self._pending_parses) > max_pending
+            or self._pending_parses[0][3] is None
+            or self._pending_parses[0][3].done()
+        ):
+            self._write_parsed_batch(writer, self._pending_parses.popleft())
+
+    def _write_parsed_batch(self, writer: IncrementalJsonlWriter, pending: Tuple) -> None:
+        """Wait for a batch's parse job and write its rows."""
+        batch_keys, batch_row_data, batch_outputs, future, window_keys = pending
+        if future is not None:
+            try:
+                batch_outputs = future.result()
+            except Exception as e:
+                # A broken pool must not lose the batch: parse it here instead
+                logger.warning(
+                    f"Node '{self.node_id}': JSON parse worker failed ({e}), parsing inline"
+                )
+                self._write_outputs(
+                    writer, batch_keys, batch_row_data, batch_outputs, window_keys
+                )
+                return
+        self._write_outputs(
+            writer, batch_keys, batch_row_data, batch_outputs, window_keys, parsed=True
+        )
+
+    def _write_outputs(
+        self,
+        writer: IncrementalJsonlWriter,
+        batch_keys: List[str],
+        batch_row_data: List[Dict[str, Any]],
+        batch_outputs: List[Any],
+        window_keys: Optional[List[str]],
+        parsed: bool = False,
+    ) -> None:
+        """Write a batch's output rows, parsing JSON unless already parsed."""
+        for key, row_data, output in zip(batch_keys, batch_row_data, batch_outputs):
+            try:
+                # Parse JSON if requested
+                if self.parse_json and not parsed:
+                    parsed_output = extract_and_parse_json(output)
+                    if parsed_output is not None:
+                        output = parsed_output
+
+                writer.write_row(self._build_output_record(key, row_data, output))
+
+            except Exception as e:
+                logger.error(
+                    f"Node '{self.node_id}': Error processing batch item {key}: {e}"
+                )
+                self.errors.append(f"Item {key}: {e}")
+
+        if window_keys is not None:
+            writer.flush_window(window_keys)
+
     @node_step_error_handler(failure_status="failed_batch_processing_execution")
     def _execute_batch_processing(
-        self, data_to_process: Dict[str, Any], items_count: int
+        self,
+        data_to_process: Iterable[Tuple[str, Dict[str, Any]]],
+        items_count: Optional[int],
     ):
         """Execute processing using batching."""
 
@@ -408,123 +1202,70 @@ class TextPromptNode(JSONLProcessingNode):
             logger.info(f"Node '{self.node_id}': Opening output file in mode '{file_mode}' (resume={self.resume})")
 
             try:
-                with IncrementalJsonlWriter(self.output_full_path, mode=file_mode) as writer:
+                with self._open_output_writer(mode=file_mode) as output_writer:
+                    self.output_started.set()
                     logger.info(f"Node '{self.node_id}': JSONL writer context entered successfully")
+                    writer = (
+                        _InputOrderWriter(output_writer, self.primary_key)
+                        if self.length_bucketing
+                        else output_writer
+                    )
                     logger.info(
-                        f"Node '{self.node_id}': Processing {items_count} items in batches of {self.batch_size} -> {self.output_full_path}"
+                        f"Node '{self.node_id}': Processing {items_count if items_count is not None else 'streamed'} items in batches of "
+                        f"{self.batch_size if self.max_batch_tokens is None else f'up to {self.max_batch_tokens} tokens'} -> {self.output_full_path}"
                     )
 
-                    # Convert data to list for batching
-                    items = list(data_to_process.items())
+                    # Slice items lazily so streamed input is batched as it arrives
+                    prompts = self._iter_prompts(
+                        self._iter_items(data_to_process), self.batch_size
+                    )
+                    total_batches = (
+                        (items_count + self.batch_size - 1) // self.batch_size
+                        if items_count is not None and self.max_batch_tokens is None
+                        else None
+                    )
 
                     # Process in batches
-                    for batch_start in tqdm(
-                        range(0, len(items), self.batch_size),
+                    batch_start = 0
+                    pending_batches = deque()
+                    for batch_items, window_keys in tqdm(
+                        self._iter_batches(prompts),
                         desc=f"Processing {self.node_id} (batched)",
-                        total=(len(items) + self.batch_size - 1) // self.batch_size,
+                        total=total_batches,
                     ):
-                        batch_end = min(batch_start + self.batch_size, len(items))
-                        batch_items = items[batch_start:batch_end]
-
                         # Prepare batch data
-                        batch_keys = []
-                        batch_messages = []
-                        batch_row_data = []
-
-                        for key, row_data in batch_items:
-                            # Prepare template context for this item
-                            if self.template_context_map:
-                                template_context = {}
-                                for (
-                                    template_var,
-                                    data_key,
-                                ) in self.template_context_map.items():
-                                    if data_key in row_data:
-                                        template_context[template_var] = row_data[data_key]
-                                    else:
-                                        logger.warning(
-                                            f"Node '{self.node_id}', item '{key}': Data key '{data_key}' for template variable "
-                                            f"'{template_var}' not found in row_data. Variable will be missing or empty in template."
-                                        )
-                                        template_context[template_var] = ""
-                            else:
-                                # No map: pass all row_data attributes directly
-                                template_context = row_data.copy()
-
-                            # Generate messages for this item
-                            messages = self.prompt_formatter.create_messages(
-                                template_context
+                        batch_keys = [key for key, _, _ in batch_items]
+                        batch_row_data = [row_data for _, row_data, _ in batch_items]
+                        batch_messages = [messages for _, _, messages in batch_items]
+
+                        if self.max_batches_in_flight > 1:
+                            # Keep the engine fed while earlier batches are written
+                            pending_batches.append(
+                                (batch_start, batch_keys, batch_row_data, batch_messages,
+                                 self._submit_batch(batch_messages), window_keys)
                             )
-
-                            batch_keys.append(key)
-                            batch_messages.append(messages)
-                            batch_row_data.append(row_data)
-
-                        # Process the entire batch with timeout
-                        try:
-                            # Create a timeout wrapper for the batch processing
-                            @timeout_wrapper(
-                                self.batch_timeout,
-                                f"Batch processing timed out after {self.batch_timeout} seconds",
+                            while len(pending_batches) >= self.max_batches_in_flight:
+                                self._write_pending_batch(writer, pending_batches.popleft())
+                        else:
+                            self._write_batch_results(
+                                writer,
+                                batch_start,
+                                batch_keys,
+                                batch_row_data,
+                                lambda: self._generate_with_oom_retry(
+                                    batch_keys,
+                                    batch_messages,
+                                    lambda: self._generate_batch(batch_messages),
+                                ),
+                                window_keys,
                             )
-                            def process_batch_with_timeout():
-                                return self.model.generate_text_batch(
-                                    batch_messages, **self.generation_options
-                                )
 
-                            logger.debug(
-                                f"Node '{self.node_id}': Starting batch processing with timeout {self.batch_timeout}s"
-                            )
-                            batch_outputs = process_batch_with_timeout()
-
-                            # Process batch results
-                            for i, (key, row_data, output) in enumerate(
-                                zip(batch_keys, batch_row_data, batch_outputs)
-                            ):
-                                try:
-                                    # Parse JSON if requested
-                                    if self.parse_json:
-                                        parsed_output = extract_and_parse_json(output)
-                                        if parsed_output is not None:
-                                            output = parsed_output
-
-                                    # Build output record
-                                    output_record = {
-                                        self.primary_key: str(key),
-                                        self.output_data_attribute: output,
-                                    }
-
-                                    # Include original data attributes
-                                    for orig_key, orig_value in row_data.items():
-                                        if orig_key not in output_record:
-                                            output_record[orig_key] = orig_value
-
-                                    writer.write_row(output_record)
-
-                                except Exception as e:
-                                    logger.error(
-                                        f"Node '{self.node_id}': Error processing batch item {key}: {e}"
-                                    )
-                                    self.errors.append(f"Item {key}: {e}")
-
-                        except TimeoutError as e:
-                            logger.error(
-                                f"Node '{self.node_id}': Batch processing timed out starting at {batch_start}: {e}"
-                            )
-                            # Add timeout errors for all items in the failed batch
-                            for key in batch_keys:
-                                self.errors.append(
-                                    f"Item {key}: Batch processing timed out: {e}"
-                                )
-                        except Exception as e:
-                            logger.error(
-                                f"Node '{self.node_id}': Error processing batch starting at {batch_start}: {e}"
-                            )
-                            # Add errors for all items in the failed batch
-                            for key in batch_keys:
-                                self.errors.append(
-                                    f"Item {key}: Batch processing failed: {e}"
-                                )
+                        batch_start += len(batch_items)
+
+                    while pending_batches:
+                        self._write_pending_batch(writer, pending_batches.popleft())
+                    while self._pending_parses:
+                        self._write_parsed_batch(writer, self._pending_parses.popleft())
             
             except (IOError, OSError, PermissionError) as e:
                 logger.error(f"Node '{self.node_id}': File access error opening JSONL writer: {e}")
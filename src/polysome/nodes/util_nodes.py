@@ -5,7 +5,6 @@ from typing import Dict, Any, List, Set, Tuple
 import re
 from collections import defaultdict
 import logging
-from polysome.utils.jsonl_writer import IncrementalJsonlWriter
 
 logger = logging.getLogger(__name__)
 
@@ -284,6 +283,9 @@ class RowConcatenationNode(JSONLProcessingNode):
     removing individual rows and creating single combined rows.
     """
 
+    # Needs the complete input before producing output
+    STREAMING_CAPABLE = False
+
     def __init__(
         self,
         node_id: str,
@@ -433,8 +435,7 @@ class RowConcatenationNode(JSONLProcessingNode):
             logger.info(
                 f"Node '{self.node_id}': Loading data from {self.input_data_path}"
             )
-            assert self.data_loader is not None, "Data loader must be initialized"
-            all_data = self.data_loader.load_input_data()
+            all_data = self._load_all_input()
 
             if not all_data:
                 logger.warning(f"Node '{self.node_id}': No data to process")
@@ -450,7 +451,7 @@ class RowConcatenationNode(JSONLProcessingNode):
             # Process each group and write results
             self.output_full_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with IncrementalJsonlWriter(self.output_full_path) as writer:
+            with self._open_output_writer() as writer:
                 for group_key, group_rows in grouped_data.items():
                     try:
                         concatenated_row = self._concatenate_group_content(
@@ -610,6 +611,9 @@ class DeduplicationNode(JSONLProcessingNode):
     keeping only one instance based on the configured strategy.
     """
 
+    # Needs the complete input before producing output
+    STREAMING_CAPABLE = False
+
     def __init__(
         self,
         node_id: str,
@@ -712,8 +716,7 @@ class DeduplicationNode(JSONLProcessingNode):
             logger.info(
                 f"Node '{self.node_id}': Loading data from {self.input_data_path}"
             )
-            assert self.data_loader is not None, "Data loader must be initialized"
-            all_data = self.data_loader.load_input_data()
+            all_data = self._load_all_input()
 
             if not all_data:
                 logger.warning(f"Node '{self.node_id}': No data to process")
@@ -736,7 +739,7 @@ class DeduplicationNode(JSONLProcessingNode):
             # Write deduplicated data
             self.output_full_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with IncrementalJsonlWriter(self.output_full_path) as writer:
+            with self._open_output_writer() as writer:
                 for row_key, row_data in all_data.items():
                     if row_key in rows_to_keep:
                         writer.write_row(row_data)
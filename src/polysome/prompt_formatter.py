@@ -4,7 +4,7 @@ import random
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, meta, select_autoescape
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +60,20 @@ class PromptFormatter:
             )
             self.system_prompt_str = ""
 
+        # Compile the system prompt once. Without template variables it
+        # renders the same for every item, so it is rendered once as well.
+        self.system_template = None
+        self.static_system_prompt = None
+        try:
+            self.system_template = self.jinja_env.from_string(self.system_prompt_str)
+            if not meta.find_undeclared_variables(self.jinja_env.parse(self.system_prompt_str)):
+                self.static_system_prompt = self.system_template.render()
+        except Exception as e:
+            logger.error(
+                f"Error compiling system prompt: {e}. Using raw system prompt string."
+            )
+            self.static_system_prompt = self.system_prompt_str
+
         # Load user prompt as a Jinja2 Template object
         try:
             self.user_template = self.jinja_env.get_template(
@@ -79,6 +93,8 @@ class PromptFormatter:
             if self.few_shot_examples_path and self.num_few_shots > 0
             else []
         )
+        # Rendered user/assistant messages per few-shot example, by id()
+        self._few_shot_message_cache: Dict[int, List[Dict[str, str]]] = {}
 
     def _load_text_file(self, file_path: Path) -> str:
         """Loads content from a text file."""
@@ -151,62 +167,107 @@ class PromptFormatter:
             )
             return []  # Return empty list on error
 
-    def create_messages(self, template_context: Dict[str, Any]) -> List[Dict[str, str]]:
+    def select_few_shot_examples(self, seed: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Formats the prompt messages list using Jinja2 templates, including few-shot examples.
-        `template_context` is the dictionary of variables from the main data row.
+        Randomly select ``num_few_shots`` of the loaded few-shot examples.
+
+        Args:
+            seed: If given, the selection is derived from it, so the same seed
+                picks the same examples in every run.
+        """
+        if self.num_few_shots <= 0 or not self.few_shot_examples:
+            return []
+        k = min(self.num_few_shots, len(self.few_shot_examples))
+        if seed is not None:
+            return random.Random(seed).sample(self.few_shot_examples, k)
+        return random.sample(self.few_shot_examples, k)
+
+    def render_few_shot_messages(
+        self, examples: List[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        """
+        Render few-shot examples as alternating user/assistant messages.
+
+        Renderings are cached per example, as they do not depend on the item.
         """
         messages = []
+        logger.debug(f"Including {len(examples)} few-shot examples.")
 
-        # 1. System Prompt
-        # Render system prompt string as a template using the main template_context
+        for example in examples:
+            cached = self._few_shot_message_cache.get(id(example))
+            if cached is not None:
+                messages.extend(cached)
+                continue
+
+            # The context for rendering the user_template for a few-shot example
+            # comes from the 'context' field of the example itself.
+            few_shot_render_context = example.get(self.few_shot_context_key)
+            assistant_response = example.get(self.few_shot_assistant_key, "")
+
+            if (
+                few_shot_render_context is None
+            ):  # Should have been caught by loader, but double check
+                logger.warning(
+                    f"Skipping few-shot example due to missing context field: {example.get(self.few_shot_id_key, 'Unknown ID')}"
+                )
+                continue
+
+            try:
+                # Render the main user_template using the few-shot example's specific context
+                rendered_fs_user_prompt = self.user_template.render(
+                    few_shot_render_context
+                )
+                rendered = [
+                    {"role": "user", "content": rendered_fs_user_prompt},
+                    {"role": "assistant", "content": assistant_response},
+                ]
+                if any(example is e for e in self.few_shot_examples):
+                    self._few_shot_message_cache[id(example)] = rendered
+                messages.extend(rendered)
+            except Exception as e:
+                logger.error(
+                    f"Error rendering few-shot example user prompt (ID: {example.get(self.few_shot_id_key, 'Unknown ID')}): {e}"
+                )
+                # Optionally skip this example or add a placeholder
+
+        return messages
+
+    def _render_system_prompt(self, template_context: Dict[str, Any]) -> str:
+        if self.static_system_prompt is not None:
+            return self.static_system_prompt
         try:
-            rendered_system_prompt = self.jinja_env.from_string(
-                self.system_prompt_str
-            ).render(template_context)
-            messages.append({"role": "system", "content": rendered_system_prompt})
+            return self.system_template.render(template_context)
         except Exception as e:
             logger.error(
                 f"Error rendering system prompt: {e}. Using raw system prompt string."
             )
-            messages.append({"role": "system", "content": self.system_prompt_str})
+            return self.system_prompt_str
+
+    def create_messages(
+        self,
+        template_context: Dict[str, Any],
+        few_shot_messages: Optional[List[Dict[str, str]]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Formats the prompt messages list using Jinja2 templates, including few-shot examples.
+        `template_context` is the dictionary of variables from the main data row.
+
+        Few-shot examples are sampled per call unless ``few_shot_messages``
+        (from ``render_few_shot_messages``) is given, which lets callers pin
+        the same examples for a group of prompts.
+        """
+        messages = []
+
+        # 1. System Prompt
+        # Render system prompt string as a template using the main template_context
+        messages.append({"role": "system", "content": self._render_system_prompt(template_context)})
 
         # 2. Few-Shot Examples
-        if self.num_few_shots > 0 and self.few_shot_examples:
-            k = min(self.num_few_shots, len(self.few_shot_examples))
-            selected_examples = random.sample(self.few_shot_examples, k)
-            logger.debug(f"Including {k} few-shot examples.")
-
-            for example in selected_examples:
-                # The context for rendering the user_template for a few-shot example
-                # comes from the 'context' field of the example itself.
-                few_shot_render_context = example.get(self.few_shot_context_key)
-                assistant_response = example.get(self.few_shot_assistant_key, "")
-
-                if (
-                    few_shot_render_context is None
-                ):  # Should have been caught by loader, but double check
-                    logger.warning(
-                        f"Skipping few-shot example due to missing context field: {example.get(self.few_shot_id_key, 'Unknown ID')}"
-                    )
-                    continue
-
-                try:
-                    # Render the main user_template using the few-shot example's specific context
-                    rendered_fs_user_prompt = self.user_template.render(
-                        few_shot_render_context
-                    )
-                    messages.append(
-                        {"role": "user", "content": rendered_fs_user_prompt}
-                    )
-                    messages.append(
-                        {"role": "assistant", "content": assistant_response}
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error rendering few-shot example user prompt (ID: {example.get(self.few_shot_id_key, 'Unknown ID')}): {e}"
-                    )
-                    # Optionally skip this example or add a placeholder
+        if few_shot_messages is None:
+            few_shot_messages = self.render_few_shot_messages(
+                self.select_few_shot_examples()
+            )
+        messages.extend(few_shot_messages)
 
         # 3. Main User Prompt
         try:
@@ -219,3 +280,45 @@ class PromptFormatter:
             raise e
 
         return messages
+
+    def create_messages_batch(
+        self,
+        template_contexts: List[Dict[str, Any]],
+        few_shot_messages: Optional[List[Dict[str, str]]] = None,
+    ) -> List[List[Dict[str, str]]]:
+        """
+        Formats the messages for many template contexts in one call.
+
+        Equivalent to calling ``create_messages`` per context, but binds the
+        compiled templates once and shares the system message between items
+        when the system prompt has no template variables.
+
+        Raises:
+            Exception: If the user prompt fails to render for any context.
+        """
+        render_user = self.user_template.render
+        static_system = (
+            {"role": "system", "content": self.static_system_prompt}
+            if self.static_system_prompt is not None
+            else None
+        )
+
+        batch = []
+        for template_context in template_contexts:
+            system_message = static_system or {
+                "role": "system",
+                "content": self._render_system_prompt(template_context),
+            }
+            shots = (
+                few_shot_messages
+                if few_shot_messages is not None
+                else self.render_few_shot_messages(self.select_few_shot_examples())
+            )
+            batch.append(
+                [
+                    system_message,
+                    *shots,
+                    {"role": "user", "content": render_user(template_context)},
+                ]
+            )
+        return batch
@@ -0,0 +1,391 @@
+"""
+Arrow IPC storage for intermediate node outputs.
+
+An alternative to JSONL for the files nodes hand to each other. Rows are
+stored column-wise as Arrow record batches in the IPC streaming format, one
+batch per commit, so a file can be appended to and read back memory-mapped:
+the column buffers are used where they lie in the file, and columns that are
+not requested are never touched.
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from polysome.utils.json_parsing_pipeline import fast_json_loads
+from polysome.utils.jsonl_writer import IncrementalJsonlWriter
+
+try:
+    import pyarrow as pa
+
+    PYARROW_AVAILABLE = True
+except ImportError as e:
+    PYARROW_AVAILABLE = False
+    logging.debug(f"pyarrow not available: {e}")
+
+logger = logging.getLogger(__name__)
+
+ARROW_SUFFIX = ".arrow"
+# Schema metadata listing the columns stored as JSON text
+_JSON_COLUMNS_KEY = b"polysome.json_columns"
+# JSON text column holding, per row, the values that do not fit the schema
+_EXTRA_COLUMN = "__polysome_extra__"
+# Python types stored as native Arrow columns, by Arrow type name
+_NATIVE_TYPES = {str: "string", int: "int64", float: "float64", bool: "bool_"}
+
+
+def require_pyarrow() -> None:
+    """Raise a helpful ImportError if pyarrow is not installed."""
+    if not PYARROW_AVAILABLE:
+        raise ImportError(
+            "The Arrow intermediate format requires 'pyarrow'. "
+            "Install with: pip install 'polysome[arrow]'"
+        )
+
+
+class IncrementalArrowWriter(IncrementalJsonlWriter):
+    """
+    Writes rows to an Arrow IPC stream file, one record batch per commit.
+
+    Rows are always group-committed, with the same triggers, ``.committed``
+    marker and fsync levels as IncrementalJsonlWriter; every commit becomes
+    one record batch (row group). Reopening the file for appending truncates
+    anything past the last committed batch, so resume works per batch.
+
+    The file is a single IPC stream with one schema, taken from the first
+    batch: columns whose non-null values all share one of str, int, float or
+    bool are stored as native Arrow columns, other columns (nested values,
+    mixed types, only nulls) as JSON text that is decoded again on read.
+    Values of later rows that do not fit their column's type, and fields the
+    schema does not have, are kept per row in an extra JSON text column, so
+    rows do not need a fixed set of fields or types. A field missing from a
+    row reads back as null.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        mode: str = "a",
+        flush_every_rows: int = 1,
+        flush_every_bytes: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        fsync: str = "none",
+        key_field: Optional[str] = None,
+    ):
+        """
+        Args:
+            output_path: Path of the Arrow file.
+            mode: "a" to append, "w" to overwrite.
+            flush_every_rows: Rows per record batch.
+            flush_every_bytes: Commit once about this many bytes are buffered,
+                estimated from the size of the previous batch.
+            flush_interval: Commit when this many seconds have passed since
+                the last commit (checked on each write).
+            fsync: Durability level, as for IncrementalJsonlWriter.
+            key_field: Primary key field. Arrow outputs keep no ``.keys``
+                sidecar; resume reads the key column instead.
+        """
+        require_pyarrow()
+        super().__init__(
+            output_path,
+            mode=mode,
+            flush_every_rows=flush_every_rows,
+            flush_every_bytes=flush_every_bytes,
+            flush_interval=flush_interval,
+            fsync=fsync,
+        )
+        self.key_field = key_field
+        # Every commit is a record batch, tracked by the commit marker
+        self.buffered = True
+        self._rows: List[Dict[str, Any]] = []
+        self._schema: Optional["pa.Schema"] = None
+        # Python type of each native column, None for JSON text columns
+        self._column_types: Dict[str, Optional[type]] = {}
+        self._bytes_per_row = 0
+
+    def __enter__(self):
+        super().__enter__()
+        if self._offset > 0:
+            # Appending: later batches must match the schema already written
+            self._set_schema(_read_schema(self.output_path))
+        return self
+
+    def _set_schema(self, schema: "pa.Schema") -> None:
+        """Use ``schema`` for all batches of the file."""
+        self._schema = schema
+        json_columns = _json_columns(schema)
+        python_types = {getattr(pa, name)(): py_type for py_type, name in _NATIVE_TYPES.items()}
+        self._column_types = {
+            field.name: None if field.name in json_columns else python_types.get(field.type)
+            for field in schema
+            if field.name != _EXTRA_COLUMN
+        }
+
+    def _complete_prefix_size(self, size: int) -> int:
+        """Size of the file up to the end of its last complete message."""
+        return _complete_size(self.output_path, size)
+
+    def write_row(self, data_dict: Dict[str, Any]):
+        """Buffer a row for the next record batch."""
+        if not self._file_handle:
+            logger.error("Attempted to write Arrow row, but file is not open.")
+            raise IOError("Arrow file is not open or writer not initialized.")
+        self._rows.append(data_dict)
+        self._buffer_bytes += self._bytes_per_row
+        if self._commit_due():
+            self.commit()
+
+    def _commit_due(self) -> bool:
+        if len(self._rows) >= self.flush_every_rows:
+            return True
+        return super()._commit_due()
+
+    def commit(self) -> None:
+        """Write buffered rows as one record batch, then advance the marker."""
+        if not self._file_handle:
+            raise IOError("Arrow file is not open or writer not initialized.")
+        self._last_commit = time.monotonic()
+        if not self._rows:
+            return
+
+        if self._schema is None:
+            # The stream header, written once with the first batch
+            self._set_schema(_infer_schema(self._rows))
+            schema_message = self._schema.serialize()
+            self._file_handle.write(schema_message)
+            self._offset += schema_message.size
+        try:
+            batch = _rows_to_batch(self._rows, self._schema, self._column_types, self._encoder)
+        except Exception as e:
+            logger.error(
+                f"Failed to convert {len(self._rows)} rows to an Arrow batch for {self.output_path}: {e}",
+                exc_info=True,
+            )
+            raise
+        message = batch.serialize()
+        self._file_handle.write(message)
+        self._file_handle.flush()
+        if self.fsync == "commit":
+            os.fsync(self._file_handle.fileno())
+        logger.debug(f"Committed a batch of {len(self._rows)} rows to {self.output_path}")
+
+        self._offset += message.size
+        self._bytes_per_row = message.size // len(self._rows)
+        self._rows.clear()
+        self._buffer_bytes = 0
+
+        self.committed_offset = self._offset
+        self._write_marker()
+
+
+def _infer_schema(rows: List[Dict[str, Any]]) -> "pa.Schema":
+    """Schema of a file: native types for uniformly typed scalar columns, JSON text otherwise."""
+    fields = []
+    json_columns = []
+    for name in dict.fromkeys(name for row in rows for name in row):
+        types = {type(row.get(name)) for row in rows if row.get(name) is not None}
+        type_name = _NATIVE_TYPES.get(types.pop()) if len(types) == 1 else None
+        if type_name is None:
+            json_columns.append(name)
+            type_name = "string"
+        fields.append(pa.field(name, getattr(pa, type_name)()))
+    fields.append(pa.field(_EXTRA_COLUMN, pa.string()))
+    return pa.schema(fields, metadata={_JSON_COLUMNS_KEY: json.dumps(json_columns).encode("utf-8")})
+
+
+def _rows_to_batch(
+    rows: List[Dict[str, Any]],
+    schema: "pa.Schema",
+    column_types: Dict[str, Optional[type]],
+    encoder: json.JSONEncoder,
+) -> "pa.RecordBatch":
+    """Build a record batch of the file schema, moving values that do not fit into the extra column."""
+    extras: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+
+    def set_extra(i: int, name: str, value: Any) -> None:
+        if extras[i] is None:
+            extras[i] = {}
+        extras[i][name] = value
+
+    arrays = []
+    for name, py_type in column_types.items():
+        values = [row.get(name) for row in rows]
+        if py_type is None:
+            arrays.append(
+                pa.array([None if v is None else encoder.encode(v) for v in values], type=pa.string())
+            )
+            continue
+        for i, value in enumerate(values):
+            if value is not None and type(value) is not py_type:
+                set_extra(i, name, value)
+                values[i] = None
+        try:
+            arrays.append(pa.array(values, type=schema.field(name).type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            # E.g. integers beyond 64 bits
+            for i, value in enumerate(values):
+                if value is not None:
+                    set_extra(i, name, value)
+            arrays.append(pa.nulls(len(rows), type=schema.field(name).type))
+
+    for i, row in enumerate(rows):
+        for name, value in row.items():
+            if name not in column_types:
+                set_extra(i, name, value)
+    arrays.append(
+        pa.array([None if e is None else encoder.encode(e) for e in extras], type=pa.string())
+    )
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _json_columns(schema: "pa.Schema") -> frozenset:
+    """Names of the columns of a schema stored as JSON text."""
+    metadata = schema.metadata or {}
+    return frozenset(json.loads(metadata.get(_JSON_COLUMNS_KEY, b"[]")))
+
+
+def _read_schema(path: Path) -> "pa.Schema":
+    """Read the schema message at the start of an Arrow IPC stream file."""
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.read_schema(pa.ipc.read_message(source))
+
+
+def _committed_size(path: Path) -> int:
+    """Readable size of a file: up to its commit marker, if it has one."""
+    size = path.stat().st_size
+    marker_path = path.with_name(path.name + IncrementalJsonlWriter.MARKER_SUFFIX)
+    try:
+        committed = int(marker_path.read_text().strip())
+    except (OSError, ValueError):
+        return size
+    return min(size, committed)
+
+
+def _iter_messages(source: "pa.NativeFile", size: int) -> Iterator["pa.ipc.Message"]:
+    """Yield the complete IPC messages in the first ``size`` bytes of source."""
+    while source.tell() < size:
+        start = source.tell()
+        try:
+            message = pa.ipc.read_message(source)
+        except (pa.ArrowInvalid, OSError):
+            logger.warning(f"Ignoring incomplete Arrow message at byte {start}")
+            return
+        if source.tell() > size:
+            return
+        yield message
+
+
+def _complete_size(path: Path, size: int) -> int:
+    """End offset of the last complete record batch in the first size bytes."""
+    complete = 0
+    with pa.memory_map(str(path), "r") as source:
+        for message in _iter_messages(source, size):
+            if message.type == "record batch":
+                complete = source.tell()
+    return complete
+
+
+def iter_arrow_batches(
+    path: Path, columns: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, List[Any]]]:
+    """
+    Read the committed record batches of an Arrow IPC file, memory-mapped.
+
+    Only the requested columns are converted to Python objects; the buffers
+    of the others are never read from the mapping. JSON text columns are
+    decoded, and values kept in the extra column are merged back in.
+
+    Args:
+        path: The Arrow file.
+        columns: Fields to read. None reads all fields. Requested fields no
+            row of a batch has are left out of it.
+
+    Returns:
+        Iterator of {field: list of values} per record batch.
+    """
+    require_pyarrow()
+    path = Path(path)
+    wanted = None if columns is None else list(dict.fromkeys(columns))
+    wanted_set = None if wanted is None else set(wanted)
+    size = _committed_size(path)
+    schema = None
+    json_columns: frozenset = frozenset()
+
+    with pa.memory_map(str(path), "r") as source:
+        for message in _iter_messages(source, size):
+            if message.type == "schema":
+                schema = pa.ipc.read_schema(message)
+                json_columns = _json_columns(schema)
+                continue
+            if message.type != "record batch" or schema is None:
+                continue
+
+            batch = pa.ipc.read_record_batch(message, schema)
+            present = [n for n in batch.schema.names if n != _EXTRA_COLUMN]
+            names = present if wanted is None else [n for n in wanted if n in present]
+            values = {}
+            for name in names:
+                column = batch.column(name).to_pylist()
+                if name in json_columns:
+                    column = [None if v is None else fast_json_loads(v) for v in column]
+                values[name] = column
+
+            if _EXTRA_COLUMN in batch.schema.names:
+                extra = batch.column(_EXTRA_COLUMN)
+                if extra.null_count < len(extra):
+                    for i, text in enumerate(extra.to_pylist()):
+                        if text is None:
+                            continue
+                        for name, value in fast_json_loads(text).items():
+                            if wanted_set is not None and name not in wanted_set:
+                                continue
+                            if name not in values:
+                                values[name] = [None] * batch.num_rows
+                            values[name][i] = value
+            yield values
+
+
+def iter_arrow_rows(
+    path: Path, columns: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the committed rows of an Arrow IPC file as dictionaries.
+
+    Args:
+        path: The Arrow file.
+        columns: Fields to read. None reads all fields.
+
+    Returns:
+        Iterator of rows, in file order.
+    """
+    for values in iter_arrow_batches(path, columns):
+        names = list(values)
+        for row in zip(*values.values()):
+            yield dict(zip(names, row))
+
+
+def read_arrow_keys(path: Path, key_field: str) -> List[str]:
+    """
+    Return the primary keys of the committed rows of an Arrow IPC file.
+
+    Only the key column is read, so this is the Arrow counterpart of the
+    ``.keys`` sidecar index kept for JSONL outputs.
+
+    Args:
+        path: The Arrow file.
+        key_field: Name of the primary key field.
+
+    Returns:
+        Keys as strings, in file order. Empty if the file does not exist.
+    """
+    if not Path(path).exists():
+        return []
+    return [
+        str(key)
+        for values in iter_arrow_batches(path, [key_field])
+        for key in values.get(key_field, [])
+        if key is not None
+    ]
@@ -1,23 +1,41 @@
 from pathlib import Path
-from typing import Dict, Callable, Any, List
+from typing import Dict, Callable, Any, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 import pandas as pd
 import json
 import logging
 
+from polysome.utils.arrow_ipc import iter_arrow_rows, require_pyarrow
+from polysome.utils.json_parsing_pipeline import fast_json_loads
+
 logger = logging.getLogger(__name__)
 
 
 class DataFileLoader:
-    def __init__(self, input_data_path: Path, primary_key: str):
+    # Rows per pandas chunk when streaming CSV files
+    CSV_CHUNK_SIZE = 10_000
+    # Characters read at a time when streaming JSON arrays
+    JSON_READ_SIZE = 1 << 20
+    def __init__(
+        self,
+        input_data_path: Path,
+        primary_key: str,
+        columns: Optional[Iterable[str]] = None,
+    ):
         """
         Initializes the DataFileLoader.
 
         Args:
-            input_data_path: Path to the input data file (.csv, .xls, .xlsx, .jsonl).
+            input_data_path: Path to the input data file (.csv, .xls, .xlsx,
+                .json, .jsonl, .arrow, .parquet).
             primary_key: The name of the column/key to use as the primary identifier.
+            columns: Fields to keep in each record, besides the primary key.
+                CSV, Excel, Arrow and Parquet columns outside this set are
+                never parsed; JSON records drop them right after decoding.
+                None keeps all fields.
         """
         self.input_data_path = input_data_path
         self.primary_key = primary_key
+        self.columns = None if columns is None else frozenset(columns) | {primary_key}
 
         # Updated Callable signature: no longer takes List[str]
         self._loaders: Dict[str, Callable[[Path, str], Dict[str, Dict[str, Any]]]] = {
@@ -26,8 +44,21 @@ class DataFileLoader:
             ".xlsx": self._load_input_data_excel,
             ".json": self._load_input_data_json,
             ".jsonl": self._load_input_data_jsonl,
+            ".arrow": self._load_input_data_columnar,
+            ".parquet": self._load_input_data_columnar,
             # Add more loaders here in the future
         }
+        self._iterators: Dict[
+            str, Callable[[Path, str], Iterator[Tuple[str, Dict[str, Any]]]]
+        ] = {
+            ".csv": self._iter_input_data_csv,
+            ".xls": self._iter_input_data_excel,
+            ".xlsx": self._iter_input_data_excel,
+            ".json": self._iter_input_data_json,
+            ".jsonl": self._iter_input_data_jsonl,
+            ".arrow": self._iter_input_data_arrow,
+            ".parquet": self._iter_input_data_parquet,
+        }
 
     def load_input_data(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -45,12 +76,76 @@ class DataFileLoader:
         else:
             raise ValueError(f"Unsupported file format: {suffix}")
 
+    def iter_records(
+        self, skip_duplicates: bool = True
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Lazily yield records from the input file, using the primary key.
+
+        Unlike load_input_data, the file is never materialized as a whole:
+        CSV files are read in chunks of CSV_CHUNK_SIZE rows, JSON arrays are
+        parsed element by element, JSONL files line by line and Arrow and
+        Parquet files one record batch at a time. Only the set
+        of keys seen so far is kept, to skip duplicates. The first occurrence
+        of a duplicate key wins, since later rows cannot replace rows that
+        were already handed out.
+
+        Args:
+            skip_duplicates: Drop rows whose key was already yielded. Callers
+                that resolve duplicates themselves pass False, so no key set
+                is kept at all.
+
+        Returns:
+            Iterator of (primary key as string, row data) pairs.
+
+        Raises:
+            ValueError: If the file format is not supported.
+            FileNotFoundError: If the input file does not exist.
+        """
+        suffix = self.input_data_path.suffix.lower()
+        if suffix not in self._iterators:
+            raise ValueError(f"Unsupported file format: {suffix}")
+        if not self.input_data_path.exists():
+            logger.error(f"Input file not found: {self.input_data_path}")
+            raise FileNotFoundError(f"Input file not found: {self.input_data_path}")
+
+        records = self._iterators[suffix](self.input_data_path, self.primary_key)
+        if not skip_duplicates:
+            return records
+        return self._skip_duplicate_keys(records)
+
+    def _project(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep only the requested columns of a decoded JSON record."""
+        if self.columns is None:
+            return record
+        return {field: value for field, value in record.items() if field in self.columns}
+
+    def _usecols(self) -> Optional[Callable[[str], bool]]:
+        """The pandas usecols filter for the requested columns."""
+        if self.columns is None:
+            return None
+        return self.columns.__contains__
+
+    def _skip_duplicate_keys(
+        self, records: Iterator[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Drop records whose key was already yielded, keeping the first."""
+        seen_keys: Set[str] = set()
+        for key, row_data in records:
+            if key in seen_keys:
+                logger.warning(
+                    f"Duplicate primary key '{key}' found in '{self.input_data_path}'. Keeping first occurrence."
+                )
+                continue
+            seen_keys.add(key)
+            yield key, row_data
+
     def _load_input_data_csv(
         self, input_data_path: Path, primary_key_name: str
     ) -> Dict[str, Dict[str, Any]]:
         """Load input data from a CSV file."""
         try:
-            data = pd.read_csv(input_data_path)
+            data = pd.read_csv(input_data_path, usecols=self._usecols())
             # Check only for primary key column
             if primary_key_name not in data.columns:
                 raise ValueError(
@@ -83,7 +178,7 @@ class DataFileLoader:
     ) -> Dict[str, Dict[str, Any]]:
         """Load input data from an Excel file."""
         try:
-            data = pd.read_excel(input_data_path)
+            data = pd.read_excel(input_data_path, usecols=self._usecols())
             # Check only for primary key column
             if primary_key_name not in data.columns:
                 raise ValueError(
@@ -130,24 +225,16 @@ class DataFileLoader:
             loaded_data: Dictionary to add the processed record to
             context: Context string for logging ("element" for JSON arrays, "line" for JSONL)
         """
-        if not isinstance(record, dict):
-            logger.warning(
-                f"Skipping non-dict {context} {index} in {input_data_path}: {str(record)[:100]}..."
-            )
+        key = self._json_record_key(
+            record, index, primary_key_name, input_data_path, context
+        )
+        if key is None:
             return
 
-        if primary_key_name not in record:
-            logger.warning(
-                f"Skipping {context} {index} in {input_data_path}: missing primary key '{primary_key_name}'. {context.capitalize()}: {str(record)[:100]}..."
-            )
-            return
-
-        key = str(record[primary_key_name])  # Ensure key is string
-
         # The value will be the entire JSON object (record)
         # Alternatively, could remove the primary key:
         # value_record = {k: v for k, v in record.items() if k != primary_key_name}
-        value_record = record
+        value_record = self._project(record)
 
         if key in loaded_data:
             logger.warning(
@@ -155,6 +242,29 @@ class DataFileLoader:
             )
         loaded_data[key] = value_record
 
+    @staticmethod
+    def _json_record_key(
+        record: Any,
+        index: int,
+        primary_key_name: str,
+        input_data_path: Path,
+        context: str = "element",
+    ) -> Optional[str]:
+        """Return the record's primary key as string, or None (with a warning) if invalid."""
+        if not isinstance(record, dict):
+            logger.warning(
+                f"Skipping non-dict {context} {index} in {input_data_path}: {str(record)[:100]}..."
+            )
+            return None
+
+        if primary_key_name not in record:
+            logger.warning(
+                f"Skipping {context} {index} in {input_data_path}: missing primary key '{primary_key_name}'. {context.capitalize()}: {str(record)[:100]}..."
+            )
+            return None
+
+        return str(record[primary_key_name])  # Ensure key is string
+
     def _load_input_data_json(
         self, input_data_path: Path, primary_key_name: str
     ) -> Dict[str, Dict[str, Any]]:
@@ -204,7 +314,7 @@ class DataFileLoader:
                     if not line:
                         continue  # Skip empty lines
                     try:
-                        record = json.loads(line)
+                        record = fast_json_loads(line)
                         self._process_json_record(
                             record,
                             i,
@@ -236,3 +346,230 @@ class DataFileLoader:
             raise Exception(f"Error loading JSONL data: {e}")
 
         return loaded_data
+
+    def _iter_input_data_csv(
+        self, input_data_path: Path, primary_key_name: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream records from a CSV file in chunks of CSV_CHUNK_SIZE rows."""
+        try:
+            with pd.read_csv(
+                input_data_path, chunksize=self.CSV_CHUNK_SIZE, usecols=self._usecols()
+            ) as reader:
+                for chunk in reader:
+                    if primary_key_name not in chunk.columns:
+                        raise ValueError(
+                            f"Missing primary key column in CSV: {primary_key_name}"
+                        )
+                    attribute_columns = [
+                        col for col in chunk.columns if col != primary_key_name
+                    ]
+                    primary_key_series = chunk[primary_key_name].astype(str)
+                    for index, key in primary_key_series.items():
+                        yield key, {attr: chunk.at[index, attr] for attr in attribute_columns}
+        except pd.errors.EmptyDataError:
+            logger.warning(f"Input CSV file is empty: {input_data_path}")
+        except Exception as e:
+            logger.exception(f"Error streaming CSV data from {input_data_path}")
+            raise Exception(f"Error loading CSV data: {e}")
+
+    def _iter_input_data_excel(
+        self, input_data_path: Path, primary_key_name: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield records from an Excel file.
+
+        Excel workbooks cannot be read incrementally, so the sheet is loaded
+        as one DataFrame, but no per-key dictionary is built on top of it.
+        """
+        try:
+            data = pd.read_excel(input_data_path, usecols=self._usecols())
+            if primary_key_name not in data.columns:
+                raise ValueError(
+                    f"Missing primary key column in Excel: {primary_key_name}"
+                )
+        except Exception as e:
+            logger.exception(f"Error loading Excel data from {input_data_path}")
+            raise Exception(f"Error loading Excel data: {e}")
+
+        attribute_columns = list(data.columns)
+        primary_key_series = data[primary_key_name].astype(str)
+        for index, key in primary_key_series.items():
+            yield key, {attr: data.at[index, attr] for attr in attribute_columns}
+
+    def _iter_json_array(self, f: TextIO) -> Iterator[Any]:
+        """
+        Incrementally parse the elements of a top-level JSON array.
+
+        Reads JSON_READ_SIZE characters at a time and decodes one element at
+        a time with raw_decode, so only the current element is held in memory.
+        """
+        decoder = json.JSONDecoder()
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, pos, eof
+            chunk = f.read(self.JSON_READ_SIZE)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace() -> bool:
+            """Advance to the next non-whitespace character; False at EOF."""
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer):
+                    return True
+                if not fill():
+                    return False
+
+        if not skip_whitespace() or buffer[pos] != "[":
+            raise ValueError("Expected JSON file to contain an array")
+        pos += 1
+
+        expect_element = True
+        while True:
+            if not skip_whitespace():
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            char = buffer[pos]
+            if char == "]":
+                return
+            if char == ",":
+                if expect_element:
+                    raise json.JSONDecodeError("Unexpected ','", buffer, pos)
+                pos += 1
+                expect_element = True
+                continue
+            if not expect_element:
+                raise json.JSONDecodeError("Expected ',' or ']'", buffer, pos)
+
+            while True:
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                    # A value ending exactly at the buffer end may be truncated
+                    # (e.g. a number), so only accept it with more data behind
+                    if end < len(buffer) or eof:
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+            pos = end
+            expect_element = False
+            yield element
+
+    def _iter_input_data_json(
+        self, input_data_path: Path, primary_key_name: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream records from a JSON file containing an array of JSON objects."""
+        try:
+            with open(input_data_path, "r", encoding="utf-8") as f:
+                for i, record in enumerate(self._iter_json_array(f)):
+                    key = self._json_record_key(
+                        record, i, primary_key_name, input_data_path, "element"
+                    )
+                    if key is not None:
+                        yield key, self._project(record)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in file {input_data_path}: {e}")
+            raise Exception(f"Invalid JSON format: {e}")
+        except ValueError as e:
+            raise ValueError(f"{e}: {input_data_path}")
+        except IOError as e:
+            logger.exception(f"IOError loading JSON data from {input_data_path}: {e}")
+            raise Exception(f"IOError loading JSON data: {e}")
+
+    def _iter_input_data_jsonl(
+        self, input_data_path: Path, primary_key_name: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream records from a JSONL file line by line."""
+        try:
+            with open(input_data_path, "r", encoding="utf-8") as f:
+                for i, line in enumerate(f, 1):  # Start from 1 for line numbers
+                    line = line.strip()
+                    if not line:
+                        continue  # Skip empty lines
+                    try:
+                        record = fast_json_loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(
+                            f"Skipping invalid JSON line {i} in {input_data_path}: {line[:100]}..."
+                        )
+                        continue
+                    key = self._json_record_key(
+                        record, i, primary_key_name, input_data_path, "line"
+                    )
+                    if key is not None:
+                        yield key, self._project(record)
+        except IOError as e:
+            logger.exception(f"IOError loading JSONL data from {input_data_path}: {e}")
+            raise Exception(f"IOError loading JSONL data: {e}")
+
+    def _load_input_data_columnar(
+        self, input_data_path: Path, primary_key_name: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Load data from an Arrow IPC or Parquet file; the last duplicate wins."""
+        if not input_data_path.exists():
+            logger.error(f"Input file not found: {input_data_path}")
+            raise FileNotFoundError(f"Input file not found: {input_data_path}")
+        loaded_data = {}
+        for key, record in self._iterators[input_data_path.suffix.lower()](
+            input_data_path, primary_key_name
+        ):
+            if key in loaded_data:
+                logger.warning(
+                    f"Duplicate primary key '{key}' found in {input_data_path}. Overwriting previous value."
+                )
+            loaded_data[key] = record
+        return loaded_data
+
+    def _iter_columnar_records(
+        self, rows: Iterator[Dict[str, Any]], primary_key_name: str, input_data_path: Path
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Key the rows of a columnar file, skipping rows without a key."""
+        for i, record in enumerate(rows):
+            if record.get(primary_key_name) is None:
+                logger.warning(
+                    f"Skipping row {i} in {input_data_path}: missing primary key '{primary_key_name}'."
+                )
+                continue
+            yield str(record[primary_key_name]), record
+
+    def _iter_input_data_arrow(
+        self, input_data_path: Path, primary_key_name: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream records from an Arrow IPC file, memory-mapped, batch by batch."""
+        try:
+            rows = iter_arrow_rows(input_data_path, self.columns)
+            yield from self._iter_columnar_records(rows, primary_key_name, input_data_path)
+        except IOError as e:
+            logger.exception(f"IOError loading Arrow data from {input_data_path}: {e}")
+            raise Exception(f"IOError loading Arrow data: {e}")
+
+    def _iter_input_data_parquet(
+        self, input_data_path: Path, primary_key_name: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream records from a Parquet file, memory-mapped, batch by batch."""
+        require_pyarrow()
+        import pyarrow.parquet as pq
+
+        try:
+            parquet_file = pq.ParquetFile(input_data_path, memory_map=True)
+            columns = None
+            if self.columns is not None:
+                columns = [name for name in parquet_file.schema_arrow.names if name in self.columns]
+
+            def rows() -> Iterator[Dict[str, Any]]:
+                for batch in parquet_file.iter_batches(columns=columns):
+                    yield from batch.to_pylist()
+
+            yield from self._iter_columnar_records(rows(), primary_key_name, input_data_path)
+        except IOError as e:
+            logger.exception(f"IOError loading Parquet data from {input_data_path}: {e}")
+            raise Exception(f"IOError loading Parquet data: {e}")
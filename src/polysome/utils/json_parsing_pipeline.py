@@ -14,6 +14,58 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Markdown fences tried by JSONParser, in order. Compiled once at import
+# because they run on every model output.
+_JSON_BLOCK_RE = re.compile(r"```json\s*\n?(.*?)\n?```", re.DOTALL | re.IGNORECASE)
+_GENERIC_BLOCK_RE = re.compile(r"```\s*\n?(.*?)\n?```", re.DOTALL)
+_MULTI_BACKTICK_RE = re.compile(r"`{3,}json\s*\n?(.*?)\n?`{3,}", re.DOTALL | re.IGNORECASE)
+_INCOMPLETE_JSON_RE = re.compile(r"```json\s*\n?(.*?)$", re.DOTALL | re.IGNORECASE)
+_INCOMPLETE_GENERIC_RE = re.compile(r"```\s*\n?(.*?)$", re.DOTALL)
+
+# Python literals rewritten to their JSON equivalents
+_PYTHON_LITERAL_RES = [
+    (re.compile(r"\bTrue\b"), "true"),
+    (re.compile(r"\bFalse\b"), "false"),
+    (re.compile(r"\bNone\b"), "null"),
+]
+
+
+def fast_json_loads(text: str) -> Any:
+    """
+    Decode a JSON document with orjson when installed, else the json module.
+
+    Documents orjson rejects but the json module accepts (NaN, Infinity,
+    integers beyond 64 bits) are retried with the json module, so the result
+    always matches json.loads.
+
+    Args:
+        text: JSON string to decode
+
+    Returns:
+        The decoded value
+
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+def _replace_python_literals(text: str) -> str:
+    """Replace Python True/False/None with JSON true/false/null."""
+    for pattern, replacement in _PYTHON_LITERAL_RES:
+        text = pattern.sub(replacement, text)
+    return text
+
 
 @dataclass
 class ParseResult:
@@ -627,10 +679,7 @@ class PythonDictFallback(FallbackStrategy):
         except (ValueError, SyntaxError):
             # Try manual conversion fallback
             try:
-                result = text
-                result = re.sub(r"\bTrue\b", "true", result)
-                result = re.sub(r"\bFalse\b", "false", result)
-                result = re.sub(r"\bNone\b", "null", result)
+                result = _replace_python_literals(text)
                 result = result.replace("'", '"')
 
                 parsed_data = json.loads(result)
@@ -956,12 +1005,8 @@ class PropertyQuoteFallback(FallbackStrategy):
         This is a simpler approach for cases that don't match our
         standard conversational pattern.
         """
-        import re
-
         # Replace Python boolean/null values first
-        result = re.sub(r"\bTrue\b", "true", text)
-        result = re.sub(r"\bFalse\b", "false", result)
-        result = re.sub(r"\bNone\b", "null", result)
+        result = _replace_python_literals(text)
 
         # Simple single-to-double quote replacement
         # This works for simpler cases but may not handle complex embedded quotes
@@ -1068,15 +1113,17 @@ class JSONParser:
         """Remove markdown code blocks and extract JSON content."""
         text = text.strip()
 
+        # Every pattern below needs a fence, so most outputs stop here
+        if "```" not in text:
+            return text
+
         # Pattern 1: Complete ```json ... ``` blocks
-        json_block_pattern = r"```json\s*\n?(.*?)\n?```"
-        match = re.search(json_block_pattern, text, re.DOTALL | re.IGNORECASE)
+        match = _JSON_BLOCK_RE.search(text)
         if match:
             return match.group(1).strip()
 
         # Pattern 2: Complete ``` ... ``` blocks (without language specifier)
-        generic_block_pattern = r"```\s*\n?(.*?)\n?```"
-        match = re.search(generic_block_pattern, text, re.DOTALL)
+        match = _GENERIC_BLOCK_RE.search(text)
         if match:
             content = match.group(1).strip()
             # Only return if it looks like JSON (starts with { or [)
@@ -1084,14 +1131,12 @@ class JSONParser:
                 return content
 
         # Pattern 3: Complete multiple consecutive backticks
-        multi_backtick_pattern = r"`{3,}json\s*\n?(.*?)\n?`{3,}"
-        match = re.search(multi_backtick_pattern, text, re.DOTALL | re.IGNORECASE)
+        match = _MULTI_BACKTICK_RE.search(text)
         if match:
             return match.group(1).strip()
 
         # Pattern 4: Incomplete ```json blocks (for truncated content)
-        incomplete_json_pattern = r"```json\s*\n?(.*?)$"
-        match = re.search(incomplete_json_pattern, text, re.DOTALL | re.IGNORECASE)
+        match = _INCOMPLETE_JSON_RE.search(text)
         if match:
             content = match.group(1).strip()
             # Only return if it looks like JSON (starts with { or [)
@@ -1099,8 +1144,7 @@ class JSONParser:
                 return content
 
         # Pattern 5: Incomplete ``` blocks (for truncated content)
-        incomplete_generic_pattern = r"```\s*\n?(.*?)$"
-        match = re.search(incomplete_generic_pattern, text, re.DOTALL)
+        match = _INCOMPLETE_GENERIC_RE.search(text)
         if match:
             content = match.group(1).strip()
             # Only return if it looks like JSON (starts with { or [)
@@ -1149,6 +1193,22 @@ def create_default_json_parser() -> JSONParser:
     return JSONParser()
 
 
+_default_parser: Optional[JSONParser] = None
+
+
+def get_default_json_parser() -> JSONParser:
+    """
+    Return a shared JSONParser with default fallback strategies.
+
+    The parser holds no per-call state, so one instance is reused for every
+    output. Use create_default_json_parser() for a parser you want to modify.
+    """
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = create_default_json_parser()
+    return _default_parser
+
+
 def parse_json_string(input_data: str) -> ParseResult:
     """
     Convenience function to parse JSON string with fallback chain.
@@ -1159,8 +1219,7 @@ def parse_json_string(input_data: str) -> ParseResult:
     Returns:
         ParseResult with parsed data or error
     """
-    parser = create_default_json_parser()
-    return parser.parse(input_data)
+    return get_default_json_parser().parse(input_data)
 
 
 # Legacy pipeline support - keep for backward compatibility
@@ -0,0 +1,70 @@
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+def follow_jsonl(
+    path: Path,
+    finished: threading.Event,
+    poll_interval: float = 0.2,
+) -> Iterator[Any]:
+    """
+    Yield JSON records from a JSONL file that is still being written.
+
+    Complete lines are parsed as soon as they appear. When the end of the file
+    is reached the reader polls for more data until ``finished`` is set by the
+    writer, after which the remaining lines are drained and iteration stops.
+    A trailing line without newline is treated as in-progress and only parsed
+    once the writer has finished.
+
+    Args:
+        path: Path to the JSONL file being written.
+        finished: Event set by the writer once no more rows will be appended.
+        poll_interval: Seconds to sleep when no new data is available.
+
+    Yields:
+        Parsed JSON values, one per non-empty line.
+    """
+    path = Path(path)
+    pending = ""
+    line_num = 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            # Check before reading so rows flushed just before the writer
+            # finished are still picked up by this read
+            writer_done = finished.is_set()
+            chunk = f.readline()
+
+            if chunk:
+                pending += chunk
+                if not pending.endswith("\n"):
+                    continue
+                line, pending = pending.strip(), ""
+                line_num += 1
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f"Skipping invalid JSON line {line_num} in {path}: {line[:100]}..."
+                    )
+                continue
+
+            if writer_done:
+                break
+            time.sleep(poll_interval)
+
+    if pending.strip():
+        try:
+            yield json.loads(pending)
+        except json.JSONDecodeError:
+            logger.warning(
+                f"Skipping incomplete trailing line in {path}: {pending[:100]}..."
+            )
@@ -1,18 +1,87 @@
 import json
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from polysome.utils.key_index import KeyIndexWriter, index_path_for
 
 logger = logging.getLogger(__name__)
 
 
 class IncrementalJsonlWriter:
-    """Manages incremental writing of JSON objects (one per line) to a JSONL file."""
+    """
+    Manages incremental writing of JSON objects (one per line) to a JSONL file.
+
+    By default every row is flushed as soon as it is written. Rows can instead
+    be group-committed: they are buffered in memory and written with a single
+    write and flush once ``flush_every_rows`` rows or ``flush_every_bytes``
+    bytes are pending, or ``flush_interval`` seconds have passed since the last
+    commit. In that mode a ``<output>.committed`` marker records the byte
+    offset up to which the file holds complete, committed rows. The marker is
+    only advanced after a commit has been flushed (and synced, if requested),
+    and reopening the file for appending truncates anything past it, so a
+    crash never leaves a torn row in front of newly appended ones.
+    """
+
+    FSYNC_LEVELS = ("none", "commit", "close")
+    MARKER_SUFFIX = ".committed"
 
-    def __init__(self, output_path: Path, mode: str = "a"):
+    def __init__(
+        self,
+        output_path: Path,
+        mode: str = "a",
+        flush_every_rows: int = 1,
+        flush_every_bytes: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        fsync: str = "none",
+        key_field: Optional[str] = None,
+    ):
+        """
+        Args:
+            output_path: Path of the JSONL file.
+            mode: "a" to append, "w" to overwrite.
+            flush_every_rows: Commit after this many buffered rows.
+            flush_every_bytes: Commit once this many bytes are buffered.
+            flush_interval: Commit when this many seconds have passed since
+                the last commit (checked on each write).
+            fsync: Durability level: "none" leaves syncing to the OS,
+                "commit" fsyncs after every commit, "close" fsyncs once when
+                the writer is closed.
+            key_field: If set, maintain a ``<output>.keys`` sidecar index of
+                this field's values and row offsets for fast resume.
+        """
+        if fsync not in self.FSYNC_LEVELS:
+            raise ValueError(
+                f"Invalid fsync level '{fsync}', expected one of {self.FSYNC_LEVELS}"
+            )
         self.output_path = Path(output_path)
         self.mode = mode  # "a" for append, "w" for write (overwrite)
+        self.flush_every_rows = max(1, flush_every_rows)
+        self.flush_every_bytes = flush_every_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.marker_path = self.output_path.with_name(
+            self.output_path.name + self.MARKER_SUFFIX
+        )
+        # Group commits are used whenever anything but per-row flushing is set
+        self.buffered = (
+            self.flush_every_rows > 1
+            or flush_every_bytes is not None
+            or flush_interval is not None
+        )
+        self.key_field = key_field
+        self._key_index = KeyIndexWriter(self.output_path, key_field) if key_field else None
         self._file_handle = None
+        self._encoder = json.JSONEncoder(ensure_ascii=False)
+        # Encoded rows and their keys awaiting commit
+        self._buffer: List[bytes] = []
+        self._buffer_keys: List[Optional[str]] = []
+        self._buffer_bytes = 0
+        self._offset = 0
+        self._last_commit = time.monotonic()
+        self.committed_offset = 0
         logger.debug(f"Initialized IncrementalJsonlWriter for path: {self.output_path}, mode: {self.mode}")
 
     def __enter__(self):
@@ -22,11 +91,28 @@ class IncrementalJsonlWriter:
             # Ensure the output directory exists
             self.output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Open in specified mode with UTF-8 encoding
-            self._file_handle = open(self.output_path, self.mode, encoding="utf-8")
+            if self.mode == "a":
+                self._truncate_uncommitted_tail()
+
+            # Open in binary mode; rows are UTF-8 encoded here so byte offsets are known
+            self._file_handle = open(self.output_path, self.mode + "b")
+            self._offset = self._file_handle.tell()
+            if self._key_index:
+                self._key_index.open(self.mode)
+            elif self.mode == "w":
+                # Rewritten without an index; drop stale ones
+                index_path_for(self.output_path).unlink(missing_ok=True)
             mode_desc = "Appending to" if self.mode == "a" else "Writing to"
             logger.info(f"{mode_desc} JSONL file: {self.output_path}")
 
+            if self.buffered:
+                self.committed_offset = self._offset
+                self._write_marker()
+            else:
+                # Per-row flushing keeps no marker; drop a stale one
+                self.marker_path.unlink(missing_ok=True)
+            self._last_commit = time.monotonic()
+
         except IOError as e:
             logger.error(
                 f"Failed to open JSONL file {self.output_path} in mode '{self.mode}': {e}",
@@ -41,22 +127,84 @@ class IncrementalJsonlWriter:
             raise
         return self
 
+    def _truncate_uncommitted_tail(self) -> None:
+        """Cut off rows past the committed marker, or a torn trailing line."""
+        if not self.output_path.exists():
+            return
+        size = self.output_path.stat().st_size
+
+        committed = None
+        if self.marker_path.exists():
+            try:
+                committed = int(self.marker_path.read_text().strip())
+            except (OSError, ValueError):
+                logger.warning(f"Ignoring unreadable commit marker {self.marker_path}")
+            if committed is not None and committed > size:
+                logger.warning(
+                    f"Commit marker {self.marker_path} is past the end of the file, ignoring it"
+                )
+                committed = None
+
+        if committed is None:
+            # No usable marker: keep everything up to the last complete row
+            committed = self._complete_prefix_size(size)
+
+        if committed < size:
+            logger.warning(
+                f"Truncating {size - committed} uncommitted bytes from {self.output_path}"
+            )
+            with open(self.output_path, "r+b") as f:
+                f.truncate(committed)
+
+    def _complete_prefix_size(self, size: int) -> int:
+        """Size of the file up to the end of its last complete line."""
+        committed = size
+        with open(self.output_path, "rb") as f:
+            while committed > 0:
+                block_start = max(0, committed - 65536)
+                f.seek(block_start)
+                block = f.read(committed - block_start)
+                newline = block.rfind(b"\n")
+                if newline == len(block) - 1:
+                    break
+                if newline >= 0:
+                    committed = block_start + newline + 1
+                    break
+                committed = block_start
+        return committed
+
+    def _write_marker(self) -> None:
+        """Atomically record the committed byte offset."""
+        tmp_path = self.marker_path.with_name(self.marker_path.name + ".tmp")
+        tmp_path.write_text(str(self.committed_offset))
+        os.replace(tmp_path, self.marker_path)
+
     def write_row(self, data_dict: Dict[str, Any]):
         """Writes a single dictionary as a JSON line."""
         if self._file_handle:
             try:
-                # Convert dict to JSON string
-                json_string = json.dumps(
-                    data_dict, ensure_ascii=False
-                )  # ensure_ascii=False for broader char support
-                # Write the JSON string followed by a newline
-                self._file_handle.write(json_string + "\n")
-                # Flush to ensure data is written immediately (important for resume)
-                self._file_handle.flush()
-
-                # Log based on 'id' if present, otherwise short dict repr
-                log_key = data_dict.get("id", str(data_dict)[:50])
-                logger.debug(f"Wrote JSONL row with id/start: {log_key}")
+                # Convert dict to JSON string (ensure_ascii=False for broader char support)
+                row_bytes = (self._encoder.encode(data_dict) + "\n").encode("utf-8")
+                key = None
+                if self.key_field is not None and self.key_field in data_dict:
+                    key = str(data_dict[self.key_field])
+
+                if self.buffered:
+                    self._buffer.append(row_bytes)
+                    self._buffer_keys.append(key)
+                    self._buffer_bytes += len(row_bytes)
+                    if self._commit_due():
+                        self.commit()
+                else:
+                    self._file_handle.write(row_bytes)
+                    # Flush to ensure data is written immediately (important for resume)
+                    self._file_handle.flush()
+                    self._offset += len(row_bytes)
+                    if self._key_index and key is not None:
+                        self._key_index.add(self._offset, key)
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Wrote JSONL row with id: {data_dict.get('id')}")
 
             except TypeError as e:
                 logger.error(
@@ -80,11 +228,53 @@ class IncrementalJsonlWriter:
             logger.error("Attempted to write JSONL row, but file is not open.")
             raise IOError("JSONL file is not open or writer not initialized.")
 
+    def _commit_due(self) -> bool:
+        if len(self._buffer) >= self.flush_every_rows:
+            return True
+        if self.flush_every_bytes is not None and self._buffer_bytes >= self.flush_every_bytes:
+            return True
+        return (
+            self.flush_interval is not None
+            and time.monotonic() - self._last_commit >= self.flush_interval
+        )
+
+    def commit(self) -> None:
+        """Write buffered rows, flush, optionally fsync, then advance the marker."""
+        if not self._file_handle:
+            raise IOError("JSONL file is not open or writer not initialized.")
+        self._last_commit = time.monotonic()
+        if not self._buffer:
+            return
+
+        self._file_handle.write(b"".join(self._buffer))
+        self._file_handle.flush()
+        if self.fsync == "commit":
+            os.fsync(self._file_handle.fileno())
+        logger.debug(f"Committed {len(self._buffer)} rows to {self.output_path}")
+
+        for row_bytes, key in zip(self._buffer, self._buffer_keys):
+            self._offset += len(row_bytes)
+            if self._key_index and key is not None:
+                self._key_index.add(self._offset, key)
+        if self._key_index:
+            self._key_index.flush()
+        self._buffer.clear()
+        self._buffer_keys.clear()
+        self._buffer_bytes = 0
+
+        self.committed_offset = self._offset
+        self._write_marker()
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Close the file and log any exceptions from the 'with' block."""
         logger.debug(f"Exiting JSONL writer context for {self.output_path}")
         if self._file_handle:
             try:
+                if self.buffered:
+                    self.commit()
+                if self.fsync != "none":
+                    self._file_handle.flush()
+                    os.fsync(self._file_handle.fileno())
                 self._file_handle.close()
                 logger.debug(f"Closed JSONL file: {self.output_path}")
             except IOError as e:
@@ -93,6 +283,8 @@ class IncrementalJsonlWriter:
                 )
             finally:
                 self._file_handle = None  # Ensure state is reset
+                if self._key_index:
+                    self._key_index.close()
 
         if exc_type:
             logger.error(
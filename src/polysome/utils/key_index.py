@@ -0,0 +1,690 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from polysome.utils.json_parsing_pipeline import fast_json_loads
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".keys"
+_HEADER_PREFIX = b"#key_field\t"
+# Bytes read back from the end of the last indexed row to verify it
+_VERIFY_WINDOW = 1 << 20
+# Same as IncrementalJsonlWriter.MARKER_SUFFIX
+_MARKER_SUFFIX = ".committed"
+
+TABLE_SUFFIX = ".hash"
+# Where nodes keep KeyedRowReader hash tables, relative to their output_dir
+TABLE_DIR = Path(".cache") / "keys"
+_TABLE_MAGIC = b"PLYKEYS2"
+# Magic, key field hash, offset covered, hash of the key ending there,
+# hash of the file's first bytes, distinct keys and slot count
+_TABLE_HEADER = struct.Struct("<8sQQQQQQ")
+# Bytes at the start of the file whose hash identifies it
+_HEAD_WINDOW = 4096
+# Key hash, row start and row end; an end of 0 marks an empty slot
+_SLOT = struct.Struct("<QQQ")
+
+
+def index_path_for(output_path: Path) -> Path:
+    """Return the sidecar key index path for a JSONL output file."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + INDEX_SUFFIX)
+
+
+def _header(key_field: str) -> bytes:
+    return _HEADER_PREFIX + json.dumps(key_field).encode("utf-8") + b"\n"
+
+
+def _encode_entry(end_offset: int, key: str) -> bytes:
+    return f"{end_offset}\t{json.dumps(key, ensure_ascii=False)}\n".encode("utf-8")
+
+
+def _decode_key(token: bytes) -> str:
+    # Plain keys are stored as "key" and need no JSON decoding
+    if b"\\" not in token:
+        return token[1:-1].decode("utf-8")
+    return json.loads(token)
+
+
+@lru_cache(maxsize=None)
+def _key_prefix(key_field: str) -> bytes:
+    """Line prefix of a row whose first field is the string key ``key_field``."""
+    return b"{" + json.dumps(key_field).encode("utf-8") + b': "'
+
+
+def extract_key(line: bytes, key_field: str) -> Optional[str]:
+    """
+    Extract the primary key from one raw JSONL row.
+
+    Rows written by polysome nodes start with the primary key, so the key is
+    read straight from the line prefix when possible. Anything else falls back
+    to a full JSON parse.
+
+    Returns:
+        The key as string, or None if the row is invalid or has no key.
+    """
+    prefix = _key_prefix(key_field)
+    if line.startswith(prefix):
+        start = len(prefix) - 1
+        end = line.find(b'"', start + 1)
+        # A backslash before the closing quote means escapes; parse fully
+        if end > 0 and b"\\" not in line[start:end]:
+            return line[start + 1 : end].decode("utf-8")
+
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if isinstance(record, dict) and key_field in record:
+        return str(record[key_field])
+    return None
+
+
+def scan_keys(
+    f: BinaryIO, start_offset: int, key_field: str
+) -> Iterator[Tuple[int, Optional[str]]]:
+    """
+    Yield (end offset, key) for each complete line from ``start_offset`` on.
+
+    A trailing line without newline is a torn write and is not yielded.
+    """
+    f.seek(start_offset)
+    offset = start_offset
+    for line in f:
+        if not line.endswith(b"\n"):
+            logger.warning(
+                f"Ignoring truncated trailing line at offset {offset} in {getattr(f, 'name', 'output')}"
+            )
+            break
+        offset += len(line)
+        stripped = line.strip()
+        if stripped:
+            yield offset, extract_key(stripped, key_field)
+
+
+def _read_index(
+    index_path: Path, key_field: str, size: int
+) -> Tuple[List[Tuple[int, str]], bool]:
+    """
+    Read index entries that lie within ``size`` bytes of the output.
+
+    Returns:
+        (entries, clean) where clean is False if the index had to be cut
+        short (wrong key field, torn entry, or entries past the file end).
+    """
+    entries: List[Tuple[int, str]] = []
+    try:
+        with open(index_path, "rb") as f:
+            if f.readline() != _header(key_field):
+                return [], False
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return entries, False
+                offset_text, _, token = line.rstrip(b"\n").partition(b"\t")
+                end_offset = int(offset_text)
+                if end_offset > size:
+                    return entries, False
+                entries.append((end_offset, _decode_key(token)))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Discarding unreadable key index {index_path}: {e}")
+        return [], False
+    return entries, True
+
+
+def _iter_index(
+    index_path: Path, key_field: str, position: Optional[int] = None
+) -> Iterator[Tuple[int, str, int]]:
+    """
+    Stream the entries of a key index, without holding them in memory.
+
+    Args:
+        index_path: The ``.keys`` sidecar.
+        key_field: Name of the primary key field the index must be for.
+        position: Byte position to continue from, as yielded for an earlier
+            entry. None starts after the header.
+
+    Yields:
+        (end offset, key, position after the entry). Stops at a torn entry,
+        and yields nothing for a missing index or one for another key field.
+    """
+    try:
+        with open(index_path, "rb") as f:
+            if f.readline() != _header(key_field):
+                return
+            if position is not None:
+                f.seek(position)
+            offset = f.tell()
+            # readline rather than iteration, so tell() stays usable
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    return
+                offset += len(line)
+                offset_text, _, token = line.rstrip(b"\n").partition(b"\t")
+                yield int(offset_text), _decode_key(token), offset
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        logger.warning(f"Stopped reading unreadable key index {index_path}: {e}")
+
+
+def _last_entry_matches(output_path: Path, end_offset: int, key: str, key_field: str) -> bool:
+    """Check that the row ending at ``end_offset`` still carries ``key``."""
+    with open(output_path, "rb") as f:
+        start = max(0, end_offset - _VERIFY_WINDOW)
+        f.seek(start)
+        block = f.read(end_offset - start)
+    if not block.endswith(b"\n"):
+        return False
+    line_start = block.rfind(b"\n", 0, len(block) - 1) + 1
+    if line_start == 0 and start > 0:
+        return True  # Row longer than the window; trust the index
+    return extract_key(block[line_start:].strip(), key_field) == key
+
+
+def _write_index(index_path: Path, key_field: str, entries: List[Tuple[int, str]]) -> None:
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_header(key_field))
+        f.writelines(_encode_entry(end, key) for end, key in entries)
+    os.replace(tmp_path, index_path)
+
+
+def load_key_index(output_path: Path, key_field: str) -> Set[str]:
+    """
+    Return the primary keys of all complete rows in a JSONL output file.
+
+    Uses the ``<output>.keys`` sidecar written alongside the output, so only
+    rows appended after the last indexed row are scanned. A missing, stale or
+    damaged index is repaired by a scan that only extracts the key field.
+
+    Args:
+        output_path: The JSONL output file.
+        key_field: Name of the primary key field.
+
+    Returns:
+        Set of keys as strings. Empty if the output does not exist.
+    """
+    return {key for _, key in _load_entries(output_path, key_field)}
+
+
+def _load_entries(
+    output_path: Path, key_field: str, update_index: bool = True
+) -> List[Tuple[int, str]]:
+    """
+    Return (end offset, key) of every complete keyed row, in file order.
+
+    With update_index False the sidecar is only read, never repaired, which
+    is safe while another process is still writing the output.
+    """
+    output_path = Path(output_path)
+    index_path = index_path_for(output_path)
+    if not output_path.exists():
+        if update_index:
+            index_path.unlink(missing_ok=True)
+        return []
+
+    size = output_path.stat().st_size
+    entries, clean = (
+        _read_index(index_path, key_field, size) if index_path.exists() else ([], False)
+    )
+    if entries and not _last_entry_matches(output_path, *entries[-1], key_field):
+        # The output was rewritten without the index; start over
+        logger.warning(f"Key index {index_path} does not match {output_path}, rebuilding")
+        entries, clean = [], False
+    indexed_end = entries[-1][0] if entries else 0
+
+    new_entries = []
+    if indexed_end < size:
+        with open(output_path, "rb") as f:
+            new_entries = [
+                (end, key) for end, key in scan_keys(f, indexed_end, key_field) if key is not None
+            ]
+        if new_entries or not clean:
+            logger.info(
+                f"Indexed {len(new_entries)} rows of {output_path} missing from the key index"
+            )
+
+    entries.extend(new_entries)
+    if not update_index:
+        return entries
+    try:
+        if not clean:
+            _write_index(index_path, key_field, entries)
+        elif new_entries:
+            with open(index_path, "ab") as f:
+                f.writelines(_encode_entry(end, key) for end, key in new_entries)
+    except OSError as e:
+        logger.warning(f"Could not update key index {index_path}: {e}")
+
+    return entries
+
+
+def table_path_for(path: Path, cache_dir: Path) -> Path:
+    """
+    Return the hash table path that KeyedRowReader keeps for a JSONL file.
+
+    Tables live in ``cache_dir``, named after the file and a hash of its
+    resolved path, so files with the same name in different directories do
+    not share a table and the directory of the file itself is never written.
+    """
+    path = Path(path)
+    digest = blake2b(str(path.resolve()).encode("utf-8"), digest_size=8).hexdigest()
+    return Path(cache_dir) / f"{path.name}.{digest}{INDEX_SUFFIX}{TABLE_SUFFIX}"
+
+
+def _bytes_hash(data: bytes) -> int:
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little")
+
+
+def _key_hash(key: str) -> int:
+    """Stable 64-bit hash of a key; Python's hash() differs between processes."""
+    return _bytes_hash(key.encode("utf-8"))
+
+
+def _committed_size(path: Path, size: int) -> int:
+    """Bytes of a file that hold committed rows, per its commit marker if any."""
+    marker_path = path.with_name(path.name + _MARKER_SUFFIX)
+    try:
+        return min(size, int(marker_path.read_text().strip()))
+    except (OSError, ValueError):
+        return size
+
+
+class KeyedRowReader(Mapping):
+    """
+    Read-only mapping from primary key to row of a JSONL file.
+
+    The file is memory-mapped, and keys are found through an open-addressing
+    hash table of (key hash, row start, row end) slots. The table is built
+    from the ``<output>.keys`` sidecar that writers keep. With a
+    ``cache_dir`` it is stored there (see ``table_path_for``), then reused
+    by later readers and extended with rows appended since; otherwise it is
+    only kept in memory. A stored table is checked against the key of the
+    last row it covers and the first bytes of the file, so a rewritten file
+    is detected. A lookup is a few slot probes plus a parse of
+    the one row. Resident memory stays close to the pages actually touched,
+    whatever the size of the file. Rows are checked against the key itself,
+    so a hash collision never returns the wrong row. For a repeated key the
+    last row wins.
+
+    Only rows before the writer's ``.committed`` marker are visible. The
+    ``.keys`` sidecar is never modified, so the file may still be written by
+    a running node. Rows appended after the reader was opened are picked up
+    when a key is not found, unless ``refresh_on_miss`` is False.
+
+    Iteration yields keys in file order, by the position of each key's last
+    row.
+    """
+
+    # Keys found past the stored table before it is rebuilt to include them
+    MAX_RECENT_KEYS = 4096
+
+    def __init__(
+        self,
+        path: Path,
+        key_field: str,
+        refresh_on_miss: bool = True,
+        cache_dir: Optional[Path] = None,
+    ):
+        """
+        Args:
+            path: The JSONL file.
+            key_field: Name of the primary key field.
+            refresh_on_miss: Look for appended rows when a key is not found.
+            cache_dir: Directory to store the hash table in, typically
+                ``<output_dir>/TABLE_DIR`` of the reading node. Without it the
+                table is not stored.
+        """
+        self.path = Path(path)
+        self.key_field = key_field
+        self.refresh_on_miss = refresh_on_miss
+        self.table_path = table_path_for(self.path, cache_dir) if cache_dir is not None else None
+        self._key_field_hash = _key_hash(key_field)
+
+        self._data: Any = b""
+        self._size = 0
+        # Stored table: slots, distinct keys and the file offset it covers
+        self._table: Any = None
+        self._slots = 0
+        self._table_count = 0
+        # Rows past the table: key to (start, end), and the offset they reach
+        self._recent: Dict[str, Tuple[int, int]] = {}
+        self._end = 0
+        self._last_key: Optional[str] = None
+        self._count = 0
+        # Position in the .keys sidecar after the last entry read, if known
+        self._index_position: Optional[int] = None
+        # Cleared if the sidecar turns out not to match the file
+        self._use_index = True
+
+        self._map_data()
+        self._load_table()
+        self._refresh()
+        if self._recent:
+            # Build the table right away, so a next reader can reuse a stored one
+            self._rebuild_table()
+
+    def _map_data(self) -> None:
+        """Map the committed part of the file; appended rows need a new mapping."""
+        size = _committed_size(self.path, self.path.stat().st_size)
+        if size == self._size and self._size > 0:
+            return
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        if size == 0:
+            self._data = b""
+        else:
+            with open(self.path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        self._size = size
+
+    def _key_ending_at(self, end: int) -> Optional[str]:
+        """Key of the row ending at ``end``; earlier lines in its span are skipped."""
+        line_start = self._data.rfind(b"\n", 0, end - 1) + 1
+        return extract_key(self._data[line_start:end].strip(), self.key_field)
+
+    def _head_hash(self, end: int) -> int:
+        """Hash of the file's first bytes, up to ``end``."""
+        return _bytes_hash(bytes(self._data[: min(end, _HEAD_WINDOW)]))
+
+    def _load_table(self) -> None:
+        """Use the stored hash table if it still matches the file."""
+        if self.table_path is None:
+            return
+        try:
+            with open(self.table_path, "rb") as f:
+                header = f.read(_TABLE_HEADER.size)
+                if len(header) < _TABLE_HEADER.size:
+                    return
+                magic, key_field_hash, end, last_hash, head_hash, count, slots = (
+                    _TABLE_HEADER.unpack(header)
+                )
+                valid = (
+                    magic == _TABLE_MAGIC
+                    and key_field_hash == self._key_field_hash
+                    and end <= self._size
+                    and (end == 0 or head_hash == self._head_hash(end))
+                    and slots > 0
+                    and slots & (slots - 1) == 0
+                    and os.fstat(f.fileno()).st_size == _TABLE_HEADER.size + slots * _SLOT.size
+                )
+                if valid and end > 0:
+                    last_key = self._key_ending_at(end)
+                    valid = last_key is not None and _key_hash(last_key) == last_hash
+                if not valid:
+                    logger.info(f"Hash table {self.table_path} does not match {self.path}, rebuilding")
+                    return
+                self._table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable hash table {self.table_path}: {e}")
+            return
+
+        self._slots = slots
+        self._table_count = self._count = count
+        self._end = end
+        self._last_key = last_key if end > 0 else None
+
+    def _entries(
+        self, start: int, position: Optional[int] = None
+    ) -> Iterator[Tuple[int, str, Optional[int]]]:
+        """
+        Stream (end, key, sidecar position) of committed keyed rows ending after ``start``.
+
+        Entries are read from the ``.keys`` sidecar, from ``position`` if
+        known, and rows past its last entry are scanned; their position is
+        None. Nothing is accumulated, so memory use does not grow with the file.
+        """
+        scan_from = start
+        if self._use_index:
+            for end, key, next_position in _iter_index(
+                index_path_for(self.path), self.key_field, position
+            ):
+                if end > self._size:
+                    return
+                if end > start:
+                    yield end, key, next_position
+                scan_from = max(scan_from, end)
+
+        with open(self.path, "rb") as f:
+            for end, key in scan_keys(f, scan_from, self.key_field):
+                if end > self._size:
+                    return
+                if key is not None:
+                    yield end, key, None
+
+    def _reset(self) -> None:
+        """Forget everything indexed so far."""
+        if isinstance(self._table, mmap.mmap):
+            self._table.close()
+        self._table, self._slots, self._table_count = None, 0, 0
+        self._recent, self._end, self._last_key, self._count = {}, 0, None, 0
+        self._index_position = None
+
+    def _refresh(self) -> None:
+        """Index committed rows appended since the last refresh."""
+        self._map_data()
+        if self._size < self._end:
+            # The file was truncated or rewritten; start over
+            self._reset()
+        if self._size == self._end:
+            return
+
+        start = self._end
+        for end, key, position in self._entries(self._end, self._index_position):
+            if position is not None:
+                self._index_position = position
+            if key not in self._recent and self._table_lookup(key) is None:
+                self._count += 1
+            self._recent[key] = (start, end)
+            self._end, self._last_key = end, key
+            start = end
+            if len(self._recent) > max(self.MAX_RECENT_KEYS, self._table_count // 4):
+                self._rebuild_table()
+
+        if self._use_index and self._end > 0 and self._key_ending_at(self._end) != self._last_key:
+            # The file was rewritten without its sidecar; index it by scanning
+            logger.warning(f"Key index of {self.path} does not match the file, scanning it instead")
+            self._use_index = False
+            self._reset()
+            self._refresh()
+
+    def _table_lookup(self, key: str) -> Optional[Tuple[int, int]]:
+        """Probe the stored table for the span of the row with ``key``."""
+        if self._table is None:
+            return None
+        key_hash = _key_hash(key)
+        mask = self._slots - 1
+        slot = key_hash & mask
+        while True:
+            slot_hash, start, end = _SLOT.unpack_from(self._table, _TABLE_HEADER.size + slot * _SLOT.size)
+            if end == 0:
+                return None
+            if slot_hash == key_hash and self._key_ending_at(end) == key:
+                return start, end
+            slot = (slot + 1) & mask
+
+    def _rebuild_table(self) -> None:
+        """Merge recent rows into a new table with room to spare and store it."""
+        slots = 8
+        while slots < 2 * self._count:
+            slots *= 2
+        mask = slots - 1
+        table = bytearray(_TABLE_HEADER.size + slots * _SLOT.size)
+
+        def insert(key_hash: int, start: int, end: int, key: Optional[str]) -> None:
+            slot = key_hash & mask
+            while True:
+                offset = _TABLE_HEADER.size + slot * _SLOT.size
+                slot_hash, _, slot_end = _SLOT.unpack_from(table, offset)
+                # Keys of the old table are distinct; only recent keys can repeat
+                if slot_end == 0 or (
+                    key is not None and slot_hash == key_hash and self._key_ending_at(slot_end) == key
+                ):
+                    _SLOT.pack_into(table, offset, key_hash, start, end)
+                    return
+                slot = (slot + 1) & mask
+
+        for slot in range(self._slots):
+            slot_hash, start, end = _SLOT.unpack_from(self._table, _TABLE_HEADER.size + slot * _SLOT.size)
+            if end != 0:
+                insert(slot_hash, start, end, None)
+        for key, (start, end) in self._recent.items():
+            insert(_key_hash(key), start, end, key)
+
+        last_hash = _key_hash(self._last_key) if self._last_key is not None else 0
+        _TABLE_HEADER.pack_into(
+            table,
+            0,
+            _TABLE_MAGIC,
+            self._key_field_hash,
+            self._end,
+            last_hash,
+            self._head_hash(self._end),
+            self._count,
+            slots,
+        )
+        if isinstance(self._table, mmap.mmap):
+            self._table.close()
+        self._table, self._slots, self._table_count = table, slots, self._count
+        self._recent = {}
+
+        if self.table_path is None:
+            return
+        # Unique temporary name: other readers may store the same table
+        tmp_path = self.table_path.with_name(
+            f"{self.table_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            self.table_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w+b") as f:
+                f.write(table)
+                f.flush()
+                # Serve lookups from the page cache instead of the heap copy
+                self._table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.replace(tmp_path, self.table_path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning(f"Could not store hash table {self.table_path}, keeping it in memory: {e}")
+
+    def _span(self, key: str) -> Optional[Tuple[int, int]]:
+        span = self._recent.get(key)
+        return span if span is not None else self._table_lookup(key)
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        span = self._span(key)
+        if span is None and self.refresh_on_miss:
+            self._refresh()
+            span = self._span(key)
+        if span is None:
+            raise KeyError(key)
+        start, end = span
+        # Lines without a key can precede the row within its span
+        line = self._data[start:end].rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        return fast_json_loads(line)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the row with primary key ``key``, or ``default`` if there is none."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        if self._span(key) is None and self.refresh_on_miss:
+            self._refresh()
+        return self._span(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        start = 0
+        for end, key, _ in self._entries(0):
+            if end > self._end:
+                break
+            # Only the last row of a repeated key is current
+            if self._span(key) == (start, end):
+                yield key
+            start = end
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        for mapped in (self._data, self._table):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        self._data, self._table, self._slots = b"", None, 0
+
+    def __enter__(self) -> "KeyedRowReader":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class KeyIndexWriter:
+    """Appends (end offset, key) entries for rows written to a JSONL file."""
+
+    def __init__(self, output_path: Path, key_field: str):
+        self.output_path = Path(output_path)
+        self.index_path = index_path_for(output_path)
+        self.key_field = key_field
+        self._file_handle = None
+
+    def open(self, mode: str) -> None:
+        """
+        Open the index for a writer opened with ``mode``.
+
+        In append mode the index is first brought in line with the output, so
+        new entries continue where the file currently ends.
+        """
+        if mode == "a" and self.output_path.exists():
+            if not self._is_current():
+                load_key_index(self.output_path, self.key_field)
+            self._file_handle = open(self.index_path, "ab")
+        else:
+            self._file_handle = open(self.index_path, "wb")
+            self._file_handle.write(_header(self.key_field))
+
+    def _is_current(self) -> bool:
+        """Cheap check that the index header matches and its last entry ends the file."""
+        if not self.index_path.exists():
+            return False
+        size = self.output_path.stat().st_size
+        with open(self.index_path, "rb") as f:
+            if f.readline() != _header(self.key_field):
+                return False
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            tail = f.read()
+        if not tail.endswith(b"\n"):
+            return False
+        last = tail.rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        if last.startswith(_HEADER_PREFIX):
+            return size == 0
+        try:
+            return int(last.partition(b"\t")[0]) == size
+        except ValueError:
+            return False
+
+    def add(self, end_offset: int, key: str) -> None:
+        self._file_handle.write(_encode_entry(end_offset, key))
+
+    def flush(self) -> None:
+        self._file_handle.flush()
+
+    def close(self) -> None:
+        if self._file_handle:
+            self._file_handle.close()
+            self._file_handle = None
@@ -4,6 +4,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 import pandas as pd
 
+from polysome.utils.arrow_ipc import ARROW_SUFFIX, iter_arrow_rows
+
 logger = logging.getLogger(__name__)
 
 
@@ -228,6 +230,10 @@ class OutputFormatter:
         if not jsonl_path.exists():
             logger.warning(f"JSONL file not found: {jsonl_path}")
             return pd.DataFrame()
+
+        if jsonl_path.suffix.lower() == ARROW_SUFFIX:
+            # Nodes writing the Arrow intermediate format
+            return pd.DataFrame(list(iter_arrow_rows(jsonl_path)))
             
         data = []
         try:
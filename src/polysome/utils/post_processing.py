@@ -2,7 +2,7 @@ import json
 import re
 import logging
 from typing import Optional, Dict, Any, Union, List
-from .json_parsing_pipeline import create_default_json_parser
+from .json_parsing_pipeline import fast_json_loads, get_default_json_parser
 
 # Configure logging for potential issues
 logging.basicConfig(
@@ -14,7 +14,9 @@ def extract_and_parse_json(text: str) -> Optional[Union[Dict[str, Any], List[Any
     """
     Extracts JSON content from a string using a comprehensive parsing pipeline.
 
-    This function now uses the advanced json_parsing_pipeline which handles:
+    Text that is already a JSON object or array is decoded directly (with
+    orjson when installed). Anything else goes through the
+    json_parsing_pipeline, which handles:
     1. Plain JSON strings
     2. JSON strings embedded within Markdown code fences (```json ... ``` or ``` ... ```)
     3. Python dict format conversion (single quotes, True/False/None values)
@@ -34,10 +36,20 @@ def extract_and_parse_json(text: str) -> Optional[Union[Dict[str, Any], List[Any
         logging.warning("Input is not a string. Type: %s", type(text))
         return None
 
+    # Fast path: most outputs are already plain JSON
+    stripped = text.strip()
+    if stripped.startswith(("{", "[")):
+        try:
+            data = fast_json_loads(stripped)
+        except ValueError:
+            pass
+        else:
+            if isinstance(data, (dict, list)):
+                return data
+
     # Use the comprehensive JSON parsing pipeline
-    parser = create_default_json_parser()
-    result = parser.parse(text)
-    
+    result = get_default_json_parser().parse(text)
+
     if result.success and result.data is not None:
         # Ensure the parsed result is a dictionary or list, as valid JSON types
         if isinstance(result.data, (dict, list)):
@@ -57,3 +69,23 @@ def extract_and_parse_json(text: str) -> Optional[Union[Dict[str, Any], List[Any
             text[:100]
         )
         return None
+
+
+def parse_json_outputs(outputs: List[Any]) -> List[Any]:
+    """
+    Parse a batch of model outputs with extract_and_parse_json.
+
+    Module-level so it can run in a worker process.
+
+    Args:
+        outputs: Model outputs, in batch order.
+
+    Returns:
+        The parsed dict or list for each output, or the output unchanged when
+        it cannot be parsed.
+    """
+    parsed_outputs = []
+    for output in outputs:
+        parsed = extract_and_parse_json(output)
+        parsed_outputs.append(output if parsed is None else parsed)
+    return parsed_outputs
@@ -0,0 +1,274 @@
+"""
+Streaming joins of keyed record files.
+
+Joins any number of files on their primary key while holding only a bounded
+part of the data in memory, so combining many node outputs does not need a
+copy of every output at once.
+"""
+
+import heapq
+import json
+import logging
+import math
+import shutil
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from polysome.utils.data_loader import DataFileLoader
+from polysome.utils.key_index import scan_keys
+
+logger = logging.getLogger(__name__)
+
+JOIN_HOWS = ("inner", "left", "outer")
+
+Record = Tuple[str, Dict[str, Any]]
+
+
+def is_key_sorted(path: Path, key_field: str) -> bool:
+    """
+    Check whether the rows of a file appear in ascending key order.
+
+    Keys are compared as strings. JSONL files are checked with a key-only
+    scan that does not parse whole rows; the scan stops at the first key
+    out of order.
+
+    Args:
+        path: File to check.
+        key_field: Name of the primary key field.
+
+    Returns:
+        True if every key is greater than or equal to the key before it.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".jsonl":
+        with open(path, "rb") as f:
+            return _ascending(key for _, key in scan_keys(f, 0, key_field) if key is not None)
+    # Read only the key column where the format allows it
+    records = DataFileLoader(path, key_field, columns=()).iter_records(skip_duplicates=False)
+    return _ascending(key for key, _ in records)
+
+
+def _ascending(keys: Iterator[str]) -> bool:
+    previous = None
+    for key in keys:
+        if previous is not None and key < previous:
+            return False
+        previous = key
+    return True
+
+
+class StreamingJoin:
+    """
+    Join keyed record files on their primary key without loading them whole.
+
+    When every file is sorted by key, the files are merged in one pass that
+    holds a single row per file. Otherwise each file is split into hash
+    partitions on disk and the partitions are joined one at a time, with as
+    many partitions as needed for one partition of all files to fit
+    ``memory_budget_bytes``.
+
+    Iterating yields (key, rows) where rows maps each source name to its row
+    for that key, or None if that source has no row for it. Which keys are
+    yielded depends on ``how``: keys present in all sources ("inner"), in the
+    first source ("left") or in any source ("outer"). A key that repeats
+    within a source keeps its last row, like DataFileLoader.load_input_data.
+    """
+
+    # Estimated bytes of Python objects per byte of file held in memory
+    MEMORY_PER_FILE_BYTE = 4
+    # Upper bound on partitions, which is also the number of open spill files
+    MAX_PARTITIONS = 1024
+
+    def __init__(
+        self,
+        sources: Dict[str, Path],
+        key_field: str,
+        how: str = "inner",
+        memory_budget_bytes: int = 1 << 30,
+        spill_dir: Optional[Path] = None,
+        columns: Optional[Dict[str, Optional[Iterable[str]]]] = None,
+    ):
+        """
+        Initialize the join.
+
+        Args:
+            sources: Mapping of source name to file, in join order. The first
+                source is the left side of a left join.
+            key_field: Name of the primary key field shared by all files.
+            how: One of "inner", "left" or "outer".
+            memory_budget_bytes: Memory available for the rows of one hash
+                partition.
+            spill_dir: Directory for hash partition files. Defaults to the
+                system temporary directory.
+            columns: Fields to read from each source besides the key, by
+                source name. Sources that are missing or map to None keep
+                all fields.
+        """
+        if how not in JOIN_HOWS:
+            raise ValueError(f"Join 'how' must be one of {list(JOIN_HOWS)}, got '{how}'")
+        if not sources:
+            raise ValueError("StreamingJoin needs at least one source")
+
+        self.sources = {name: Path(path) for name, path in sources.items()}
+        self.key_field = key_field
+        self.how = how
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.columns = columns or {}
+
+        # Filled in while iterating
+        self.strategy: Optional[str] = None
+        self.partitions = 0
+        self.row_counts: Dict[str, int] = {name: 0 for name in self.sources}
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Optional[Dict[str, Any]]]]]:
+        if all(is_key_sorted(path, self.key_field) for path in self.sources.values()):
+            self.strategy = "merge"
+            logger.info(f"Joining {len(self.sources)} key-sorted files with a merge join")
+            return self._merge_join()
+
+        self.strategy = "hash"
+        return self._hash_join()
+
+    def _records(self, name: str) -> Iterator[Record]:
+        loader = DataFileLoader(self.sources[name], self.key_field, self.columns.get(name))
+        return loader.iter_records(skip_duplicates=False)
+
+    def _keep(self, rows: Dict[str, Optional[Dict[str, Any]]]) -> bool:
+        if self.how == "inner":
+            return all(row is not None for row in rows.values())
+        if self.how == "left":
+            return next(iter(rows.values())) is not None
+        return True
+
+    def _last_row_per_key(self, name: str, records: Iterator[Record]) -> Iterator[Record]:
+        """Collapse runs of a repeated key in a sorted stream to their last row."""
+        previous: Optional[Record] = None
+        for key, row in records:
+            if previous is not None:
+                if key == previous[0]:
+                    logger.warning(
+                        f"Duplicate primary key '{key}' found in '{self.sources[name]}'. "
+                        f"Overwriting previous value."
+                    )
+                elif key < previous[0]:
+                    raise ValueError(
+                        f"'{self.sources[name]}' is no longer sorted by '{self.key_field}' "
+                        f"(key '{key}' after '{previous[0]}')"
+                    )
+                else:
+                    yield previous
+            previous = (key, row)
+        if previous is not None:
+            yield previous
+
+    def _merge_join(self) -> Iterator[Tuple[str, Dict[str, Optional[Dict[str, Any]]]]]:
+        names = list(self.sources)
+        streams = [
+            self._last_row_per_key(name, self._records(name)) for name in names
+        ]
+
+        # Entries are (key, source index, row); key and index never tie
+        heap = []
+        for index, stream in enumerate(streams):
+            record = next(stream, None)
+            if record is not None:
+                heap.append((record[0], index, record[1]))
+        heapq.heapify(heap)
+
+        while heap:
+            key = heap[0][0]
+            rows: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(names)
+            while heap and heap[0][0] == key:
+                _, index, row = heapq.heappop(heap)
+                rows[names[index]] = row
+                self.row_counts[names[index]] += 1
+                record = next(streams[index], None)
+                if record is not None:
+                    heapq.heappush(heap, (record[0], index, record[1]))
+            if self._keep(rows):
+                yield key, rows
+
+    def _hash_join(self) -> Iterator[Tuple[str, Dict[str, Optional[Dict[str, Any]]]]]:
+        total_bytes = sum(path.stat().st_size for path in self.sources.values())
+        self.partitions = min(
+            self.MAX_PARTITIONS,
+            max(1, math.ceil(total_bytes * self.MEMORY_PER_FILE_BYTE / self.memory_budget_bytes)),
+        )
+        logger.info(
+            f"Joining {len(self.sources)} files ({total_bytes / 1e6:.1f} MB) with a hash join "
+            f"in {self.partitions} partition(s)"
+        )
+
+        if self.partitions == 1:
+            yield from self._join_partition(
+                {name: self._records(name) for name in self.sources}
+            )
+            return
+
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+        spill_root = Path(tempfile.mkdtemp(prefix="join-", dir=self.spill_dir))
+        try:
+            spills = {
+                name: self._spill(name, spill_root / str(index))
+                for index, name in enumerate(self.sources)
+            }
+            for partition in range(self.partitions):
+                yield from self._join_partition(
+                    {name: self._read_spill(parts[partition]) for name, parts in spills.items()}
+                )
+                for parts in spills.values():
+                    parts[partition].unlink()
+        finally:
+            shutil.rmtree(spill_root, ignore_errors=True)
+
+    def _spill(self, name: str, directory: Path) -> List[Path]:
+        """Split a file into hash partitions of (key, row) lines, keeping file order."""
+        directory.mkdir()
+        part_paths = [directory / f"{partition}.jsonl" for partition in range(self.partitions)]
+        files = [open(part_path, "w", encoding="utf-8") for part_path in part_paths]
+        try:
+            for key, row in self._records(name):
+                partition = zlib.crc32(key.encode("utf-8")) % self.partitions
+                files[partition].write(json.dumps([key, row], ensure_ascii=False) + "\n")
+        finally:
+            for f in files:
+                f.close()
+        return part_paths
+
+    @staticmethod
+    def _read_spill(part_path: Path) -> Iterator[Record]:
+        with open(part_path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, row = json.loads(line)
+                yield key, row
+
+    def _join_partition(
+        self, streams: Dict[str, Iterator[Record]]
+    ) -> Iterator[Tuple[str, Dict[str, Optional[Dict[str, Any]]]]]:
+        tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for name, records in streams.items():
+            table = {}
+            for key, row in records:
+                if key in table:
+                    logger.warning(
+                        f"Duplicate primary key '{key}' found in '{self.sources[name]}'. "
+                        f"Overwriting previous value."
+                    )
+                table[key] = row
+            tables[name] = table
+            self.row_counts[name] += len(table)
+
+        first = next(iter(tables.values()))
+        if self.how == "inner":
+            keys = (key for key in first if all(key in table for table in tables.values()))
+        elif self.how == "left":
+            keys = iter(first)
+        else:
+            keys = iter(dict.fromkeys(key for table in tables.values() for key in table))
+
+        for key in keys:
+            yield key, {name: table.get(key) for name, table in tables.items()}
@@ -3,6 +3,7 @@ from pathlib import Path
 import logging
 from typing import Dict, List, Any, Union, Tuple, Optional
 from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 
 # Import Node classes and the map
@@ -150,6 +151,9 @@ class Workflow:
     The workflow represents a Directed Acyclic Graph (DAG) of processing nodes.
     """
 
+    EXECUTION_MODES = ("sequential", "concurrent")
+    DEFAULT_MAX_WORKERS = 4
+
     def __init__(
         self, config_path: Union[str, Path], optimize_for_engines: bool = True
     ):
@@ -175,6 +179,8 @@ class Workflow:
         ] = {}  # node_id -> output_info dict from node.run()
         self.execution_order: List[str] = []
         self.optimize_for_engines = optimize_for_engines
+        self.execution_mode = "sequential"
+        self.max_workers = self.DEFAULT_MAX_WORKERS
 
         self.config = self._load_and_parse_config()
         self.data_dir = Path(self.config["data_dir"])
@@ -189,6 +195,14 @@ class Workflow:
             logger.info(
                 f"Engine optimization setting from config: {self.optimize_for_engines}"
             )
+        self.execution_mode = workflow_config.get("execution_mode", self.execution_mode)
+        if self.execution_mode not in self.EXECUTION_MODES:
+            raise ValueError(
+                f"Invalid execution_mode '{self.execution_mode}'. Must be one of {self.EXECUTION_MODES}"
+            )
+        self.max_workers = int(workflow_config.get("max_workers", self.max_workers))
+        if self.max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {self.max_workers}")
 
         self._build_dag()
         self._validate_dag()
@@ -386,6 +400,34 @@ class Workflow:
 
 
 
+    def _get_node_engine_key(self, node_id: str) -> Optional[str]:
+        """
+        Build the engine key of a node, or None if it does not use a model.
+        """
+        params = self.nodes_config[node_id].get("params", {})
+        model_name = params.get("model_name")
+        if not model_name:
+            return None
+
+        engine_name = params.get("inference_engine", "huggingface")
+        engine_options = params.get("engine_options", {})
+        sorted_options = json.dumps(engine_options, sort_keys=True)
+        return f"{engine_name}::{model_name}::{sorted_options}"
+
+    def _uses_request_scheduler(self, node_id: str) -> bool:
+        """
+        Whether a node sends all of its engine calls through the shared
+        engine's request scheduler, which serializes them.
+
+        Asked of the node itself, since a node that fails to acquire the
+        shared engine falls back to calling its own engine directly.
+        """
+        try:
+            node_instance = self._get_node_instance(node_id)
+        except Exception:
+            return False  # Reported when the node is executed
+        return getattr(node_instance, "uses_request_scheduler", False)
+
     def _group_nodes_by_engine(self) -> Dict[str, List[str]]:
         """
         Group nodes by their engine configuration.
@@ -395,18 +437,9 @@ class Workflow:
         """
         engine_groups = defaultdict(list)
 
-        for node_id, node_config in self.nodes_config.items():
-            params = node_config.get("params", {})
-            model_name = params.get("model_name")
-
-            if model_name:
-                engine_name = params.get("inference_engine", "huggingface")
-                engine_options = params.get("engine_options", {})
-                sorted_options = json.dumps(engine_options, sort_keys=True)
-                engine_key = f"{engine_name}::{model_name}::{sorted_options}"
-                engine_groups[engine_key].append(node_id)
-            else:
-                engine_groups["_no_engine_"].append(node_id)
+        for node_id in self.nodes_config:
+            engine_key = self._get_node_engine_key(node_id)
+            engine_groups[engine_key or "_no_engine_"].append(node_id)
 
         return engine_groups
 
@@ -695,95 +728,173 @@ class Workflow:
 
         return report.is_overall_valid, report.to_dict()
 
-    def run(self, validate_first: bool = True):
+    # =====================================================================
+    # EXECUTION METHODS
+    # =====================================================================
+
+    def _log_engine_pool_status(self) -> None:
+        """Log the current engine pool reference counts at debug level."""
+        try:
+            from polysome.engines.engine_pool import get_engine_pool
+
+            engine_pool = get_engine_pool()
+            stats = engine_pool.get_engine_stats()
+            if stats:
+                logger.debug(f"Engine pool status: {len(stats)} engines loaded")
+                for _, engine_stat in stats.items():
+                    logger.debug(
+                        f"  {engine_stat['engine_name']} '{engine_stat['model_name']}': {engine_stat['reference_count']} refs"
+                    )
+        except Exception as e:
+            logger.debug(f"Could not log engine pool status: {e}")
+
+    def _collect_node_inputs(self, node_id: str) -> Optional[Dict[str, Any]]:
         """
-        Executes the workflow nodes in the determined topological order.
+        Gather the recorded outputs of all dependencies of a node.
+
+        Returns:
+            Mapping of dependency id to its output info, or None if a
+            dependency has no output recorded.
+        """
+        input_data_for_node: Dict[str, Any] = {}
+        for dep_id in self.dependencies[node_id]:
+            if dep_id not in self.node_outputs:
+                logger.error(
+                    f"Critical internal error: Dependency '{dep_id}' for node '{node_id}' was expected to run but has no output recorded. Aborting workflow."
+                )
+                return None
+            input_data_for_node[dep_id] = self.node_outputs[dep_id]
+        return input_data_for_node
+
+    def _get_node_instance(self, node_id: str) -> BaseNode:
+        """Use existing instance if available (from validation), otherwise create new one."""
+        if node_id not in self.node_instances:
+            self.node_instances[node_id] = self._instantiate_node(node_id)
+        return self.node_instances[node_id]
+
+    def _get_stream_source(self, node_id: str, running_node_ids: set) -> Optional[str]:
+        """
+        Return the running upstream node a node can stream its input from.
+
+        A node streams when it sets ``stream_input``, has exactly one
+        dependency, that dependency is currently running and writes JSONL,
+        and both nodes are streaming-capable JSONL processing nodes.
+        """
+        if not self.nodes_config[node_id]["params"].get("stream_input", False):
+            return None
+
+        deps = self.dependencies[node_id]
+        if len(deps) != 1 or deps[0] not in running_node_ids:
+            return None
+
+        from polysome.nodes.jsonl_processing_node import JSONLProcessingNode
+
+        source = self.node_instances.get(deps[0])
+        node_class = NODE_TYPE_MAP[self.nodes_config[node_id]["type"]]
+        if not (
+            isinstance(source, JSONLProcessingNode)
+            and source.STREAMING_CAPABLE
+            and issubclass(node_class, JSONLProcessingNode)
+            and node_class.STREAMING_CAPABLE
+        ):
+            return None
+        if source.intermediate_format != "jsonl":
+            logger.info(
+                f"Node '{node_id}': Cannot stream '{deps[0]}' output in format "
+                f"'{source.intermediate_format}', waiting for it to finish"
+            )
+            return None
+        return deps[0]
+
+    def _execute_node(
+        self, node_id: str, input_data_for_node: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Instantiate (if needed) and run a single node, recording its output.
 
         Args:
-            validate_first: If True, validates all nodes before execution
+            node_id: ID of the node to run.
+            input_data_for_node: Output info of the node's dependencies.
+
+        Returns:
+            The node's output info, or None if the node raised an unhandled
+            exception (which aborts the workflow).
         """
-        logger.info(f"--- Starting Workflow Execution: '{self.workflow_name}' ---")
-        
-        # Show execution tree at the start
-        if self.execution_order:
-            logger.info("")
-            ascii_tree = generate_execution_tree_ascii(self.execution_order, self.nodes_config, self.dependencies)
-            logger.info(ascii_tree)
-            logger.info("")
+        try:
+            node_instance = self._get_node_instance(node_id)
 
-        # Enable deferred cleanup for engine sharing if optimization is enabled
-        if self.optimize_for_engines:
-            try:
-                from polysome.engines.engine_pool import get_engine_pool
+            # Run the node
+            output_info = node_instance.run(input_data=input_data_for_node)
 
-                engine_pool = get_engine_pool()
-                engine_pool.set_defer_cleanup(True)
-                logger.info("Enabled deferred cleanup for engine sharing optimization")
-            except Exception as e:
-                logger.warning(f"Could not enable deferred cleanup: {e}")
+            # Store the output information
+            self.node_outputs[node_id] = output_info
+            logger.info(
+                f"Node '{node_id}' finished with status: {output_info.get('status', 'unknown')}"
+            )
 
-        # Optional validation phase
-        if validate_first:
-            is_valid, validation_report = self.validate_workflow()
+            if output_info.get("status", "").startswith("failed"):
+                logger.warning(
+                    f"Node '{node_id}' reported a failure. Subsequent nodes may be affected or fail."
+                )
 
-            if not is_valid:
-                error_msg = (
-                    f"Workflow validation failed with {validation_report['summary']['total_errors']} errors. "
-                    f"Execution aborted. Check logs for detailed validation report."
+            # Clean up node resources (like models) after execution
+            # JSONLProcessingNode already calls cleanup_processing in its finally block,
+            # but other node types might not, so we ensure it gets called
+            try:
+                # Check if this is NOT a JSONLProcessingNode (which handles its own cleanup)
+                from polysome.nodes.jsonl_processing_node import (
+                    JSONLProcessingNode,
                 )
-                logger.error(error_msg)
-                raise WorkflowValidationError(error_msg)
 
-            logger.info("Workflow validation passed. Proceeding with execution...")
+                if not isinstance(node_instance, JSONLProcessingNode):
+                    node_instance.cleanup_processing()
+                    logger.debug(
+                        f"Node '{node_id}': Called cleanup_processing for resource cleanup"
+                    )
+            except Exception as e:
+                logger.warning(
+                    f"Node '{node_id}': Error during cleanup (ignored): {e}"
+                )
 
-        self.node_outputs = {}  # Clear previous run outputs if any
+            return output_info
 
+        except Exception as e:
+            logger.critical(
+                f"Node '{node_id}' raised an unhandled exception during execution: {e}",
+                exc_info=True,
+            )
+            self.node_outputs[node_id] = {
+                "status": "failed_exception",
+                "error": str(e),
+            }
+            logger.error(
+                f"Workflow execution aborted due to critical error in node '{node_id}'."
+            )
+            return None
+
+    def _run_sequential(self) -> bool:
+        """Run the execution order one node at a time."""
         actual_node_count = len([item for item in self.execution_order if not item.startswith("__ENGINE_CLEANUP__")])
         node_counter = 0
-        
+
         # Track overall success
         all_nodes_successful = True
 
-        for i, item in enumerate(self.execution_order):
+        for item in self.execution_order:
             # Check if this is a cleanup marker
             if item.startswith("__ENGINE_CLEANUP__"):
                 self._process_engine_cleanup_marker(item)
                 continue
-            
+
             # This is a regular node
             node_id = item
             node_counter += 1
             logger.info(f"--- [{node_counter}/{actual_node_count}] Executing Node: '{node_id}' ---")
-
-            # Log engine pool status if applicable
-            try:
-                from polysome.engines.engine_pool import get_engine_pool
-
-                engine_pool = get_engine_pool()
-                stats = engine_pool.get_engine_stats()
-                if stats:
-                    logger.debug(f"Engine pool status: {len(stats)} engines loaded")
-                    for _, engine_stat in stats.items():
-                        logger.debug(
-                            f"  {engine_stat['engine_name']} '{engine_stat['model_name']}': {engine_stat['reference_count']} refs"
-                        )
-            except Exception as e:
-                logger.debug(f"Could not log engine pool status: {e}")
+            self._log_engine_pool_status()
 
             # --- Prepare Input Data from Dependencies ---
-            input_data_for_node: Dict[str, Any] = {}
-            node_dependencies = self.dependencies[node_id]
-            all_deps_met = True
-            for dep_id in node_dependencies:
-                if dep_id not in self.node_outputs:
-                    logger.error(
-                        f"Critical internal error: Dependency '{dep_id}' for node '{node_id}' was expected to run but has no output recorded. Aborting workflow."
-                    )
-                    all_deps_met = False
-                    break
-                input_data_for_node[dep_id] = self.node_outputs[dep_id]
-
-            if not all_deps_met:
+            input_data_for_node = self._collect_node_inputs(node_id)
+            if input_data_for_node is None:
                 logger.error(
                     f"Workflow execution aborted due to unmet dependency for node '{node_id}'."
                 )
@@ -791,62 +902,220 @@ class Workflow:
                 break
 
             # --- Run Node ---
-            try:
-                # Use existing instance if available (from validation), otherwise create new one
-                if node_id not in self.node_instances:
-                    node_instance = self._instantiate_node(node_id)
-                    self.node_instances[node_id] = node_instance
-                else:
-                    node_instance = self.node_instances[node_id]
+            output_info = self._execute_node(node_id, input_data_for_node)
+            if output_info is None:
+                all_nodes_successful = False
+                break
+            if output_info.get("status", "").startswith("failed"):
+                all_nodes_successful = False
 
-                # Run the node
-                output_info = node_instance.run(input_data=input_data_for_node)
+        return all_nodes_successful
 
-                # Store the output information
-                self.node_outputs[node_id] = output_info
-                logger.info(
-                    f"Node '{node_id}' finished with status: {output_info.get('status', 'unknown')}"
-                )
+    def _run_concurrent(self) -> bool:
+        """
+        Run every node whose dependencies are satisfied in a thread pool.
+
+        The optimized execution order is split into stages at the engine
+        cleanup markers. A stage only starts once the previous one has fully
+        drained and its cleanup marker has been processed, so engines from
+        different groups never coexist. Within a stage, nodes that need a
+        different engine than one already running are held back until the
+        running engine's nodes have finished. Nodes sharing an engine only run
+        at the same time if all of them use ``shared_batching``, whose request
+        scheduler serializes their engine calls; engines are not safe to call
+        from several threads. Nodes with ``stream_input`` may
+        start while their single dependency is still running and consume its
+        output as it is written.
+        """
+        actual_node_count = len([item for item in self.execution_order if not item.startswith("__ENGINE_CLEANUP__")])
+        logger.info(
+            f"Running workflow in concurrent mode with up to {self.max_workers} worker(s)"
+        )
 
-                if output_info.get("status", "").startswith("failed"):
-                    logger.warning(
-                        f"Node '{node_id}' reported a failure. Subsequent nodes may be affected or fail."
-                    )
-                    all_nodes_successful = False
-
-                # Clean up node resources (like models) after execution
-                # JSONLProcessingNode already calls cleanup_processing in its finally block,
-                # but other node types might not, so we ensure it gets called
-                try:
-                    # Check if this is NOT a JSONLProcessingNode (which handles its own cleanup)
-                    from polysome.nodes.jsonl_processing_node import (
-                        JSONLProcessingNode,
+        all_nodes_successful = True
+        progress = {"started": 0, "total": actual_node_count}
+        stage: List[str] = []
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="polysome-node"
+        ) as executor:
+            for item in self.execution_order + [None]:
+                if item is not None and not item.startswith("__ENGINE_CLEANUP__"):
+                    stage.append(item)
+                    continue
+
+                if stage:
+                    stage_successful, aborted = self._run_concurrent_stage(
+                        stage, executor, progress
                     )
+                    all_nodes_successful = all_nodes_successful and stage_successful
+                    if aborted:
+                        break
+                    stage = []
 
-                    if not isinstance(node_instance, JSONLProcessingNode):
-                        node_instance.cleanup_processing()
-                        logger.debug(
-                            f"Node '{node_id}': Called cleanup_processing for resource cleanup"
+                if item is not None:
+                    self._process_engine_cleanup_marker(item)
+
+        return all_nodes_successful
+
+    def _run_concurrent_stage(
+        self,
+        stage_nodes: List[str],
+        executor: ThreadPoolExecutor,
+        progress: Dict[str, int],
+    ) -> Tuple[bool, bool]:
+        """
+        Run the nodes of one engine stage concurrently.
+
+        Args:
+            stage_nodes: Node ids of the stage in topological order.
+            executor: Pool the nodes are submitted to.
+            progress: Shared counter used for the ``[n/total]`` log prefix.
+
+        Returns:
+            Tuple of (all nodes successful, workflow aborted).
+        """
+        pending = list(stage_nodes)
+        running: Dict[Future, Tuple[str, Optional[str]]] = {}
+        stage_successful = True
+        aborted = False
+
+        while pending or running:
+            if not aborted:
+                running_engines = {key for _, key in running.values() if key}
+                # Engines in use by a node that calls the engine directly
+                exclusive_engines = {
+                    key
+                    for node, key in running.values()
+                    if key and not self._uses_request_scheduler(node)
+                }
+                running_node_ids = {node for node, _ in running.values()}
+                for node_id in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    stream_source = None
+                    if any(dep not in self.node_outputs for dep in self.dependencies[node_id]):
+                        stream_source = self._get_stream_source(node_id, running_node_ids)
+                        if stream_source is None:
+                            continue
+                    engine_key = self._get_node_engine_key(node_id)
+                    if engine_key and running_engines - {engine_key}:
+                        continue
+                    if engine_key in running_engines and (
+                        engine_key in exclusive_engines
+                        or not self._uses_request_scheduler(node_id)
+                    ):
+                        continue
+
+                    if stream_source is not None:
+                        try:
+                            node_instance = self._get_node_instance(node_id)
+                        except Exception as e:
+                            logger.debug(
+                                f"Node '{node_id}': Could not prepare streaming input, waiting for '{stream_source}': {e}"
+                            )
+                            continue
+                        node_instance.attach_stream_source(
+                            stream_source, self.node_instances[stream_source]
                         )
-                except Exception as e:
-                    logger.warning(
-                        f"Node '{node_id}': Error during cleanup (ignored): {e}"
+                        input_data_for_node = {}
+                    else:
+                        input_data_for_node = self._collect_node_inputs(node_id)
+                        if input_data_for_node is None:
+                            pending.remove(node_id)
+                            stage_successful = False
+                            aborted = True
+                            break
+                        try:
+                            # Instantiate up front so streaming consumers can attach
+                            self._get_node_instance(node_id)
+                        except Exception:
+                            pass  # Reported when the node is executed
+
+                    pending.remove(node_id)
+
+                    progress["started"] += 1
+                    logger.info(
+                        f"--- [{progress['started']}/{progress['total']}] Executing Node: '{node_id}' ---"
                     )
+                    self._log_engine_pool_status()
+                    future = executor.submit(self._execute_node, node_id, input_data_for_node)
+                    running[future] = (node_id, engine_key)
+                    running_node_ids.add(node_id)
+                    if engine_key:
+                        running_engines.add(engine_key)
+                        if not self._uses_request_scheduler(node_id):
+                            exclusive_engines.add(engine_key)
+
+            if not running:
+                if pending and not aborted:
+                    logger.error(
+                        f"Workflow execution aborted: nodes {pending} have dependencies that never completed."
+                    )
+                    stage_successful = False
+                    aborted = True
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node_id, _ = running.pop(future)
+                output_info = future.result()
+                if output_info is None:
+                    # Stop dispatching but let in-flight nodes finish cleanly
+                    stage_successful = False
+                    aborted = True
+                elif output_info.get("status", "").startswith("failed"):
+                    stage_successful = False
+
+        return stage_successful, aborted
+
+    def run(self, validate_first: bool = True):
+        """
+        Executes the workflow nodes in the determined topological order.
 
+        Args:
+            validate_first: If True, validates all nodes before execution
+        """
+        logger.info(f"--- Starting Workflow Execution: '{self.workflow_name}' ---")
+        
+        # Show execution tree at the start
+        if self.execution_order:
+            logger.info("")
+            ascii_tree = generate_execution_tree_ascii(self.execution_order, self.nodes_config, self.dependencies)
+            logger.info(ascii_tree)
+            logger.info("")
+
+        # Enable deferred cleanup for engine sharing if optimization is enabled
+        if self.optimize_for_engines:
+            try:
+                from polysome.engines.engine_pool import get_engine_pool
+
+                engine_pool = get_engine_pool()
+                engine_pool.set_defer_cleanup(True)
+                logger.info("Enabled deferred cleanup for engine sharing optimization")
             except Exception as e:
-                logger.critical(
-                    f"Node '{node_id}' raised an unhandled exception during execution: {e}",
-                    exc_info=True,
-                )
-                self.node_outputs[node_id] = {
-                    "status": "failed_exception",
-                    "error": str(e),
-                }
-                logger.error(
-                    f"Workflow execution aborted due to critical error in node '{node_id}'."
+                logger.warning(f"Could not enable deferred cleanup: {e}")
+
+        # Optional validation phase
+        if validate_first:
+            is_valid, validation_report = self.validate_workflow()
+
+            if not is_valid:
+                error_msg = (
+                    f"Workflow validation failed with {validation_report['summary']['total_errors']} errors. "
+                    f"Execution aborted. Check logs for detailed validation report."
                 )
-                all_nodes_successful = False
-                break
+                logger.error(error_msg)
+                raise WorkflowValidationError(error_msg)
+
+            logger.info("Workflow validation passed. Proceeding with execution...")
+
+        self.node_outputs = {}  # Clear previous run outputs if any
+
+        if self.execution_mode == "concurrent":
+            all_nodes_successful = self._run_concurrent()
+        else:
+            all_nodes_successful = self._run_sequential()
 
         logger.info(f"--- Workflow Execution Finished: '{self.workflow_name}' ---")
 
@@ -2,10 +2,14 @@ import pytest
 import tempfile
 import shutil
 import json
+import time
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from unittest.mock import Mock
 
+from polysome.nodes.jsonl_processing_node import JSONLProcessingNode
+from polysome.nodes.text_prompt_node import TextPromptNode
+
 
 @pytest.fixture
 def temp_workspace():
@@ -77,5 +81,104 @@ def mock_data_loader():
         "1": {"text": "hello world", "category": "greeting"},
         "2": {"text": "goodbye world", "category": "farewell"},
     }
+    mock_loader.iter_records.side_effect = lambda: iter(
+        mock_loader.load_input_data.return_value.items()
+    )
     return mock_loader
 
+
+
+@pytest.fixture
+def read_jsonl_rows():
+    """
+    Reads the rows of a JSONL file, such as a node's output.
+    Returns a function taking the path and, optionally, an attribute to
+    return from each row instead of the whole row.
+    """
+
+    def _read_rows(path: Path, attribute: Optional[str] = None) -> List[Any]:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        if attribute is not None:
+            return [row[attribute] for row in rows]
+        return rows
+
+    return _read_rows
+
+
+class TransformNode(JSONLProcessingNode):
+    """
+    Stand-in processing node that upper-cases the text attribute, or appends
+    the ``suffix`` param when one is set. Fails on rows without text.
+    """
+
+    def __init__(self, *args, delay: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.processed_at = []
+
+    def process_item(self, key, row_data):
+        time.sleep(self.delay)
+        self.processed_at.append(time.monotonic())
+        suffix = self.params.get("suffix")
+        if suffix is not None:
+            return row_data["text"] + suffix
+        return row_data["text"].upper()
+
+
+@pytest.fixture
+def make_transform_node(temp_workspace):
+    """
+    Factory fixture that creates TransformNodes in the workspace.
+    Returns a function taking the node id, the node params and an optional
+    per-item delay in seconds.
+    """
+
+    def _make_node(node_id: str, delay: float = 0.0, **params) -> TransformNode:
+        return TransformNode(
+            node_id=node_id,
+            node_type="transform",
+            parent_wf_name="wf",
+            data_dir=temp_workspace["data_dir"],
+            output_dir=temp_workspace["output_dir"],
+            prompts_dir=temp_workspace["root"],
+            params={"name": node_id, **params},
+            delay=delay,
+        )
+
+    return _make_node
+
+
+@pytest.fixture
+def make_text_prompt_node(temp_workspace):
+    """
+    Factory fixture that creates TextPromptNodes without loading a model.
+    Returns a function taking the stand-in engine and the node params; the
+    prompt formatter is a mock that sends the row's ``text`` as the user
+    message.
+    """
+
+    def _make_node(engine=None, **params) -> TextPromptNode:
+        node = TextPromptNode(
+            node_id="gen",
+            node_type="text_prompt",
+            parent_wf_name="wf",
+            data_dir=temp_workspace["data_dir"],
+            output_dir=temp_workspace["output_dir"],
+            prompts_dir=temp_workspace["root"],
+            params={
+                "name": "gen",
+                "model_name": "stub",
+                "primary_key": "id",
+                "template_context_map": {"text": "text"},
+                **params,
+            },
+        )
+        node.prompt_formatter = Mock()
+        node.prompt_formatter.create_messages.side_effect = lambda ctx: [
+            {"role": "user", "content": str(ctx["text"])}
+        ]
+        node.model = engine
+        return node
+
+    return _make_node
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of DataParallelCoordinator transport overhead.
+
+Runs the coordinator with a dummy CPU worker that echoes its prompts, so the
+measured time is pure coordination cost: chunking, pickling, queue hops and
+result collection. Reports the overhead per 10k prompts.
+
+Usage:
+    python tests/integration/scripts/bench_dp_coordinator.py
+    python tests/integration/scripts/bench_dp_coordinator.py --prompt-chars 16000 --prompts 2000
+    python tests/integration/scripts/bench_dp_coordinator.py --transport manager  # old Manager queues
+"""
+
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Manager
+from pathlib import Path
+from queue import Empty
+
+# Add the source directory to Python path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "src"))
+
+from polysome.engines.vllm_dp import DataParallelCoordinator  # noqa: E402
+
+
+def echo_worker(
+    dp_rank,
+    dp_size,
+    dp_master_ip,
+    dp_master_port,
+    gpus_per_dp_rank,
+    model_name,
+    vllm_kwargs,
+    input_queue,
+    output_queue,
+    error_queue,
+    ready_queue,
+):
+    """Dummy worker with the vLLM worker protocol that returns its prompts."""
+    ready_queue.put(dp_rank)
+    while True:
+        try:
+            work_item = input_queue.get(timeout=1.0)
+        except Empty:
+            continue
+        if work_item is None:
+            break
+        batch_id, prompts, _ = work_item
+        output_queue.put((batch_id, dp_rank, None))
+        output_queue.put((batch_id, dp_rank, prompts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--prompts", type=int, default=10_000)
+    parser.add_argument("--prompt-chars", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--transport", choices=["queue", "manager"], default="queue")
+    args = parser.parse_args()
+
+    os.environ.setdefault(
+        "CUDA_VISIBLE_DEVICES", ",".join(str(i) for i in range(args.workers))
+    )
+    coordinator = DataParallelCoordinator(
+        dp_size=args.workers,
+        gpus_per_dp_rank=1,
+        dp_master_port=0,
+        chunk_size=args.chunk_size,
+        worker_target=echo_worker,
+    )
+    if args.transport == "manager":
+        manager = Manager()
+        coordinator.work_queue = manager.Queue()
+        coordinator.output_queue = manager.Queue()
+        coordinator.error_queue = manager.Queue()
+        coordinator.ready_queue = manager.Queue()
+
+    prompts = [
+        (f"{i} " + "x" * args.prompt_chars)[: args.prompt_chars]
+        for i in range(args.prompts)
+    ]
+    coordinator.start_workers("echo", {})
+    try:
+        start = time.perf_counter()
+        for offset in range(0, len(prompts), args.batch_size):
+            batch = prompts[offset : offset + args.batch_size]
+            results = coordinator.distribute_batch(batch, {})
+            assert results == batch
+        elapsed = time.perf_counter() - start
+    finally:
+        coordinator.shutdown()
+
+    per_10k = elapsed / len(prompts) * 10_000
+    print(
+        f"transport={args.transport} workers={args.workers} prompts={len(prompts)} "
+        f"chars={args.prompt_chars} batch={args.batch_size}: "
+        f"{elapsed:.2f}s total, {per_10k:.2f}s per 10k prompts"
+    )
+
+
+if __name__ == "__main__":
+    main()
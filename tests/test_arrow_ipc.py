@@ -0,0 +1,108 @@
+"""
+Unit tests for the Arrow IPC intermediate format: the batch writer, its
+resume behaviour, memory-mapped projected reads and its use by nodes.
+"""
+
+from pathlib import Path
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from polysome.nodes.jsonl_processing_node import JSONLProcessingNode
+from polysome.utils.arrow_ipc import IncrementalArrowWriter, iter_arrow_rows, read_arrow_keys
+from polysome.utils.data_loader import DataFileLoader
+
+
+class TestIncrementalArrowWriter:
+    """Test suite for IncrementalArrowWriter and the Arrow readers."""
+
+    def test_rows_round_trip_across_batches(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.arrow"
+        rows = [
+            {"id": "1", "n": 1, "out": {"labels": ["a", "b"]}, "flag": True},
+            {"id": "2", "n": 2, "out": "unparsed text", "flag": None},
+            # A new field and a float in an int column do not fit the schema
+            {"id": "3", "n": 2.5, "out": [1, 2], "extra": "x"},
+        ]
+
+        with IncrementalArrowWriter(path, mode="w", flush_every_rows=2) as writer:
+            for row in rows:
+                writer.write_row(row)
+
+        assert list(iter_arrow_rows(path)) == [
+            {"id": "1", "n": 1, "out": {"labels": ["a", "b"]}, "flag": True},
+            {"id": "2", "n": 2, "out": "unparsed text", "flag": None},
+            {"id": "3", "n": 2.5, "out": [1, 2], "flag": None, "extra": "x"},
+        ]
+        assert read_arrow_keys(path, "id") == ["1", "2", "3"]
+        # A single valid IPC stream that standard readers accept
+        with pa.memory_map(str(path), "r") as source:
+            assert pa.ipc.open_stream(source).read_all().num_rows == 3
+
+    def test_append_truncates_uncommitted_batch(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.arrow"
+        with IncrementalArrowWriter(path, mode="w", flush_every_rows=2) as writer:
+            for i in range(4):
+                writer.write_row({"id": str(i), "text": "t"})
+        committed = path.stat().st_size
+        # A batch written after the last marker update, as left by a crash
+        with open(path, "ab") as f:
+            f.write(b"\xff\xff\xff\xff\x10\x00\x00\x00partial")
+
+        assert read_arrow_keys(path, "id") == ["0", "1", "2", "3"]
+        with IncrementalArrowWriter(path, mode="a", flush_every_rows=2) as writer:
+            assert path.stat().st_size == committed
+            writer.write_row({"id": "4", "text": "t", "late": 1})
+
+        assert read_arrow_keys(path, "id") == ["0", "1", "2", "3", "4"]
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_stream(source).read_all()
+        assert table.num_rows == 5
+        assert list(iter_arrow_rows(path, ["late"]))[-1] == {"late": 1}
+
+    def test_loader_reads_only_requested_columns(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.arrow"
+        with IncrementalArrowWriter(path, mode="w", flush_every_rows=10) as writer:
+            for i in range(3):
+                writer.write_row({"id": i, "text": f"t{i}", "report": {"long": "x" * 100}})
+
+        loader = DataFileLoader(path, "id", columns=["text"])
+
+        assert list(loader.iter_records()) == [
+            (str(i), {"id": i, "text": f"t{i}"}) for i in range(3)
+        ]
+        assert DataFileLoader(path, "id").load_input_data()["2"]["report"] == {"long": "x" * 100}
+
+
+class TestArrowIntermediateFormat:
+    """Test suite for intermediate_format in JSONLProcessingNode."""
+
+    def test_chain_and_resume_through_arrow_output(self, create_jsonl_file, make_transform_node):
+        create_jsonl_file("input.jsonl", [{"id": str(i), "text": f"t{i}"} for i in range(5)])
+        first = make_transform_node(
+            "first", output_data_attribute="first", input_data_path="input.jsonl",
+            primary_key="id", intermediate_format="arrow", output_flush_rows=2,
+        )
+
+        first_info = first.run()
+        second = make_transform_node("second", output_data_attribute="second")
+        second_info = second.run({"first": first_info})
+
+        assert first_info["output_path"].endswith("first.arrow")
+        second_rows = DataFileLoader(Path(second_info["output_path"]), "id").load_input_data()
+        assert second_rows["4"] == {
+            "id": "4", "second": "T4", "first": "T4", "text": "t4",
+        }
+
+        resumed = make_transform_node(
+            "first", output_data_attribute="first", input_data_path="input.jsonl",
+            primary_key="id", intermediate_format="arrow", resume=True,
+        )
+        assert resumed.output_flush_rows == JSONLProcessingNode.ARROW_FLUSH_ROWS
+        assert resumed.run()["status"] == "completed_no_new_items"
+        assert len(read_arrow_keys(first.output_full_path, "id")) == 5
+
+    def test_invalid_format_rejected(self, make_transform_node):
+        with pytest.raises(ValueError, match="intermediate_format"):
+            make_transform_node("node", intermediate_format="csv")
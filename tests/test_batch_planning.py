@@ -0,0 +1,214 @@
+"""
+Unit tests for how TextPromptNode forms batches: length bucketing, token
+budgets with out-of-memory retries, and prompt token estimates.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from polysome.engines.base import Engine
+
+
+class PaddingEngine(Engine):
+    """Stand-in engine that records batches and the padding they would need."""
+
+    def __init__(self):
+        super().__init__("padding")
+        self.batches = []
+
+    def generate_text(self, messages, **kwargs):
+        return self.generate_text_batch([messages], **kwargs)[0]
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        self.batches.append([m[-1]["content"] for m in messages_batch])
+        return [f"len {len(m[-1]['content'])}" for m in messages_batch]
+
+    def supports_native_batching(self):
+        return True
+
+    @property
+    def padded_tokens(self):
+        lengths = self.count_prompt_tokens
+        total = 0
+        for batch in self.batches:
+            sizes = lengths([[{"role": "user", "content": c}] for c in batch])
+            total += max(sizes) * len(sizes) - sum(sizes)
+        return total
+
+
+# Lengths alternate long/short in input order
+DATA = {str(i): {"id": str(i), "text": "x" * (400 if i % 2 else 8 + i)} for i in range(8)}
+
+
+class TestLengthBucketing:
+    """Test suite for length_bucketing in TextPromptNode."""
+
+    @pytest.mark.parametrize("in_flight", [1, 3])
+    def test_similar_lengths_batched_output_in_input_order(
+        self, make_text_prompt_node, read_jsonl_rows, in_flight
+    ):
+        node = make_text_prompt_node(
+            PaddingEngine(), batch_size=2, length_bucketing=True, max_batches_in_flight=in_flight
+        )
+
+        node._execute_processing(DATA, len(DATA))
+
+        assert [len(set(map(len, batch))) for batch in node.model.batches[:2]] == [2, 2]
+        assert all(len(c) == 400 for batch in node.model.batches[2:] for c in batch)
+        assert read_jsonl_rows(node.output_full_path, "id") == [str(i) for i in range(8)]
+        assert node.errors == []
+
+    def test_reduces_padding(self, make_text_prompt_node):
+        padded = {}
+        for bucketing in (False, True):
+            node = make_text_prompt_node(PaddingEngine(), batch_size=2, length_bucketing=bucketing)
+            node._execute_processing(DATA, len(DATA))
+            padded[bucketing] = node.model.padded_tokens
+
+        assert padded[True] < padded[False] / 10
+
+    def test_window_limits_reordering(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(
+            PaddingEngine(), batch_size=2, length_bucketing=True, length_bucketing_window=4
+        )
+
+        node._execute_processing(DATA, len(DATA))
+
+        first_window = {DATA[str(i)]["text"] for i in range(4)}
+        assert set(node.model.batches[0] + node.model.batches[1]) == first_window
+        assert read_jsonl_rows(node.output_full_path, "id") == [str(i) for i in range(8)]
+
+    def test_failed_items_are_skipped_in_order(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(PaddingEngine(), batch_size=2, length_bucketing=True)
+        original = node.model.generate_text_batch
+
+        def fail_long(batch, **kwargs):
+            if len(batch[0][-1]["content"]) == 400:
+                raise RuntimeError("out of memory")
+            return original(batch, **kwargs)
+
+        node.model.generate_text_batch = fail_long
+        node._execute_processing(DATA, len(DATA))
+
+        assert read_jsonl_rows(node.output_full_path, "id") == ["0", "2", "4", "6"]
+        assert len(node.errors) == 4
+
+
+class TestCountPromptTokens:
+    """Test suite for Engine.count_prompt_tokens."""
+
+    def test_character_estimate_without_tokenizer(self):
+        engine = PaddingEngine()
+
+        assert engine.count_prompt_tokens([[{"role": "user", "content": "x" * 40}]]) == [11]
+
+    def test_uses_tokenizer_in_one_call(self):
+        engine = PaddingEngine()
+        engine.tokenizer = Mock(chat_template="template")
+        engine.tokenizer.apply_chat_template.side_effect = (
+            lambda messages, **kw: " ".join(m["content"] for m in messages)
+        )
+        engine.tokenizer.side_effect = lambda prompts, **kw: {
+            "input_ids": [p.split() for p in prompts]
+        }
+
+        lengths = engine.count_prompt_tokens(
+            [[{"role": "user", "content": "a b c"}], [{"role": "user", "content": "d"}]]
+        )
+
+        assert lengths == [3, 1]
+        assert engine.tokenizer.call_count == 1
+
+
+class OomEngine(PaddingEngine):
+    """Stand-in engine that runs out of memory above a token limit."""
+
+    def __init__(self, limit, in_band=False):
+        super().__init__()
+        self.limit = limit
+        self.in_band = in_band
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        if sum(self.count_prompt_tokens(messages_batch)) > self.limit:
+            message = "CUDA out of memory. Tried to allocate 2.00 GiB"
+            if self.in_band:
+                return [f"Error generating text with HF: {message}"] * len(messages_batch)
+            raise RuntimeError(message)
+        return super().generate_text_batch(messages_batch, **kwargs)
+
+
+# Prompts of 10 tokens each (40 chars)
+EVEN = {str(i): {"id": str(i), "text": "y" * 36} for i in range(10)}
+
+
+class TestTokenBudgetBatching:
+    """Test suite for max_batch_tokens in TextPromptNode."""
+
+    def test_batches_packed_to_budget(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(
+            PaddingEngine(),
+            batch_size=1,
+            max_batch_tokens=40,
+            generation_options={"max_tokens": 10},
+        )
+
+        node._execute_processing(EVEN, len(EVEN))
+
+        # Each item costs 10 prompt + 10 generated tokens
+        assert [len(batch) for batch in node.model.batches] == [2, 2, 2, 2, 2]
+        assert read_jsonl_rows(node.output_full_path, "id") == [str(i) for i in range(10)]
+        assert node._prompt_tokens == {}
+
+    def test_padding_engines_pay_for_longest_prompt(self, make_text_prompt_node):
+        data = {"0": {"id": "0", "text": "z" * 396}, "1": {"id": "1", "text": "z" * 36},
+                "2": {"id": "2", "text": "z" * 36}}
+        node = make_text_prompt_node(PaddingEngine(), batch_size=1, max_batch_tokens=150)
+        node.model.PADS_BATCHES = True
+
+        node._execute_processing(data, len(data))
+
+        assert [len(batch) for batch in node.model.batches] == [1, 2]
+
+    @pytest.mark.parametrize("in_band", [False, True])
+    def test_out_of_memory_splits_and_lowers_budget(self, make_text_prompt_node, read_jsonl_rows, in_band):
+        node = make_text_prompt_node(
+            OomEngine(limit=30, in_band=in_band), batch_size=1, max_batch_tokens=100
+        )
+
+        node._execute_processing(EVEN, len(EVEN))
+
+        assert read_jsonl_rows(node.output_full_path, "id") == [str(i) for i in range(10)]
+        assert node.errors == []
+        assert node._token_budget < 100
+        assert all(len(batch) <= 3 for batch in node.model.batches)
+
+    def test_out_of_memory_halves_batch_size(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(OomEngine(limit=40), batch_size=8, max_batches_in_flight=2)
+
+        node._execute_processing(EVEN, len(EVEN))
+
+        ids = read_jsonl_rows(node.output_full_path, "id")
+        assert sorted(ids, key=int) == [str(i) for i in range(10)]
+        assert node.errors == []
+        assert node._batch_size_limit <= 4
+
+    def test_single_item_out_of_memory_is_an_item_error(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(OomEngine(limit=5), batch_size=2)
+
+        node._execute_processing(EVEN, len(EVEN))
+
+        assert read_jsonl_rows(node.output_full_path, "id") == []
+        assert len(node.errors) == 10
+
+    def test_completion_mentioning_out_of_memory_is_not_an_error(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(PaddingEngine(), batch_size=4)
+        node.model.generate_text_batch = lambda batch, **kw: [
+            "The server ran out of memory at 3am." for _ in batch
+        ]
+
+        node._execute_processing(EVEN, len(EVEN))
+
+        assert read_jsonl_rows(node.output_full_path, "id") == [str(i) for i in range(10)]
+        assert node._batch_size_limit == 4
+        assert node.errors == []
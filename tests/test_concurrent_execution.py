@@ -0,0 +1,275 @@
+"""
+Unit tests for the concurrent workflow execution mode.
+
+Node instances are replaced by lightweight fakes so that only the scheduling
+logic of Workflow.run is exercised.
+"""
+
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from polysome.workflow import Workflow
+
+
+class FakeNode:
+    """Stand-in node that records when it ran."""
+
+    def __init__(self, node_id, events, delay=0.1, barrier=None, uses_request_scheduler=False):
+        self.node_id = node_id
+        self.events = events
+        self.delay = delay
+        self.barrier = barrier
+        self.uses_request_scheduler = uses_request_scheduler
+
+    def run(self, input_data):
+        self.events.append(("start", self.node_id, time.monotonic()))
+        if self.barrier is not None:
+            # Only passes if the sibling node is running at the same time
+            self.barrier.wait(timeout=5)
+        time.sleep(self.delay)
+        self.events.append(("end", self.node_id, time.monotonic()))
+        return {
+            "output_path": f"/tmp/{self.node_id}.jsonl",
+            "output_attribute": "output",
+            "primary_key": "id",
+            "status": "completed_successfully",
+            "errors_count": 0,
+        }
+
+    def cleanup_processing(self):
+        pass
+
+
+class ReentrancyDetectingEngine:
+    """Engine stand-in that records calls made while another is in progress."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.reentrant_calls = 0
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        with self._lock:
+            self.active += 1
+            if self.active > 1:
+                self.reentrant_calls += 1
+        time.sleep(0.1)
+        with self._lock:
+            self.active -= 1
+        return ["output"] * len(messages_batch)
+
+
+class EngineNode(FakeNode):
+    """Stand-in node that calls a shared engine while it runs."""
+
+    def __init__(self, node_id, events, engine):
+        super().__init__(node_id, events, delay=0)
+        self.engine = engine
+
+    def run(self, input_data):
+        self.engine.generate_text_batch([[{"role": "user", "content": self.node_id}]])
+        return super().run(input_data)
+
+
+class TestConcurrentExecution:
+    """Test suite for Workflow concurrent execution mode."""
+
+    def write_config(self, temp_workspace, nodes, workflow_settings):
+        config = {
+            "name": "concurrent_test",
+            "data_dir": str(temp_workspace["data_dir"]),
+            "output_dir": str(temp_workspace["output_dir"]),
+            "prompts_dir": str(temp_workspace["root"]),
+            "workflow_settings": workflow_settings,
+            "nodes": nodes,
+        }
+        config_path = temp_workspace["root"] / "workflow.json"
+        config_path.write_text(json.dumps(config))
+        return config_path
+
+    def branch_node(self, node_id, deps, model_name=None, **extra_params):
+        params = {"name": node_id, **extra_params}
+        if model_name:
+            params["model_name"] = model_name
+            params["inference_engine"] = "huggingface"
+        return {
+            "id": node_id,
+            "type": "text_prompt" if model_name else "sentence_split",
+            "params": params,
+            "dependencies": deps,
+        }
+
+    def test_independent_branches_run_in_parallel(self, temp_workspace):
+        nodes = [
+            {"id": "loader", "type": "load", "params": {"name": "loader"}, "dependencies": []},
+            self.branch_node("branch_a", ["loader"]),
+            self.branch_node("branch_b", ["loader"]),
+            self.branch_node("combine", ["branch_a", "branch_b"]),
+        ]
+        config_path = self.write_config(
+            temp_workspace, nodes, {"execution_mode": "concurrent", "max_workers": 2}
+        )
+        workflow = Workflow(config_path)
+
+        events = []
+        barrier = threading.Barrier(2)
+        fakes = {
+            node_id: FakeNode(
+                node_id, events, barrier=barrier if node_id.startswith("branch") else None
+            )
+            for node_id in ["loader", "branch_a", "branch_b", "combine"]
+        }
+
+        with patch.object(workflow, "_instantiate_node", side_effect=fakes.get):
+            assert workflow.run(validate_first=False) is True
+
+        order = [(kind, node_id) for kind, node_id, _ in events]
+        assert order[0] == ("start", "loader")
+        assert order[-1] == ("end", "combine")
+        assert order.index(("end", "loader")) < order.index(("start", "branch_a"))
+        assert order.index(("end", "branch_b")) < order.index(("start", "combine"))
+        assert set(workflow.node_outputs) == set(fakes)
+
+    def test_different_engines_never_overlap(self, temp_workspace):
+        nodes = [
+            {"id": "loader", "type": "load", "params": {"name": "loader"}, "dependencies": []},
+            self.branch_node("gen_a", ["loader"], model_name="/models/a"),
+            self.branch_node("gen_b", ["loader"], model_name="/models/b"),
+        ]
+        config_path = self.write_config(
+            temp_workspace,
+            nodes,
+            {"execution_mode": "concurrent", "max_workers": 4, "optimize_for_engines": False},
+        )
+        workflow = Workflow(config_path)
+
+        events = []
+        fakes = {node_id: FakeNode(node_id, events) for node_id in ["loader", "gen_a", "gen_b"]}
+
+        with patch.object(workflow, "_instantiate_node", side_effect=fakes.get):
+            assert workflow.run(validate_first=False) is True
+
+        times = {(kind, node_id): ts for kind, node_id, ts in events}
+        first, second = sorted(["gen_a", "gen_b"], key=lambda n: times[("start", n)])
+        assert times[("end", first)] <= times[("start", second)]
+
+    def test_same_engine_nodes_run_one_at_a_time(self, temp_workspace):
+        nodes = [
+            {"id": "loader", "type": "load", "params": {"name": "loader"}, "dependencies": []},
+            self.branch_node("gen_a", ["loader"], model_name="/models/a", batch_size=4),
+            self.branch_node("gen_b", ["loader"], model_name="/models/a", batch_size=4),
+        ]
+        config_path = self.write_config(
+            temp_workspace, nodes, {"execution_mode": "concurrent", "max_workers": 4}
+        )
+        workflow = Workflow(config_path)
+
+        events = []
+        engine = ReentrancyDetectingEngine()
+        fakes = {
+            "loader": FakeNode("loader", events, delay=0),
+            "gen_a": EngineNode("gen_a", events, engine),
+            "gen_b": EngineNode("gen_b", events, engine),
+        }
+
+        with patch.object(workflow, "_instantiate_node", side_effect=fakes.get):
+            assert workflow.run(validate_first=False) is True
+
+        assert engine.reentrant_calls == 0
+        assert {"gen_a", "gen_b"} <= set(workflow.node_outputs)
+
+    def test_shared_batching_nodes_share_an_engine(self, temp_workspace):
+        shared = {"batch_size": 4, "shared_batching": True}
+        nodes = [
+            {"id": "loader", "type": "load", "params": {"name": "loader"}, "dependencies": []},
+            self.branch_node("gen_a", ["loader"], model_name="/models/a", **shared),
+            self.branch_node("gen_b", ["loader"], model_name="/models/a", **shared),
+        ]
+        config_path = self.write_config(
+            temp_workspace, nodes, {"execution_mode": "concurrent", "max_workers": 4}
+        )
+        workflow = Workflow(config_path)
+
+        events = []
+        barrier = threading.Barrier(2)
+        fakes = {
+            node_id: FakeNode(
+                node_id,
+                events,
+                barrier=barrier if node_id != "loader" else None,
+                uses_request_scheduler=node_id != "loader",
+            )
+            for node_id in ["loader", "gen_a", "gen_b"]
+        }
+
+        with patch.object(workflow, "_instantiate_node", side_effect=fakes.get):
+            assert workflow.run(validate_first=False) is True
+
+        # The barrier only releases if both nodes ran at the same time
+        assert not barrier.broken
+
+    def test_shared_batching_node_without_scheduler_runs_alone(self, temp_workspace):
+        shared = {"batch_size": 4, "shared_batching": True}
+        nodes = [
+            {"id": "loader", "type": "load", "params": {"name": "loader"}, "dependencies": []},
+            self.branch_node("gen_a", ["loader"], model_name="/models/a", **shared),
+            self.branch_node("gen_b", ["loader"], model_name="/models/a", **shared),
+        ]
+        config_path = self.write_config(
+            temp_workspace, nodes, {"execution_mode": "concurrent", "max_workers": 4}
+        )
+        workflow = Workflow(config_path)
+
+        events = []
+        fakes = {
+            "loader": FakeNode("loader", events, delay=0),
+            "gen_a": FakeNode("gen_a", events, uses_request_scheduler=True),
+            # Configured for shared batching but fell back to its own batches
+            "gen_b": FakeNode("gen_b", events),
+        }
+
+        with patch.object(workflow, "_instantiate_node", side_effect=fakes.get):
+            assert workflow.run(validate_first=False) is True
+
+        times = {(kind, node_id): ts for kind, node_id, ts in events}
+        first, second = sorted(["gen_a", "gen_b"], key=lambda n: times[("start", n)])
+        assert times[("end", first)] <= times[("start", second)]
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            ({"batch_size": 4, "shared_batching": True}, True),
+            ({"max_batch_tokens": 512, "shared_batching": True}, True),
+            ({"batch_size": 4}, False),
+            ({"batch_size": 1, "shared_batching": True}, False),
+            ({"batch_size": 4, "shared_batching": True, "max_in_flight": 8}, False),
+            ({"batch_size": 4, "shared_batching": True, "use_shared_engines": False}, False),
+        ],
+    )
+    def test_node_predicts_request_scheduler_from_params(
+        self, make_text_prompt_node, params, expected
+    ):
+        node = make_text_prompt_node(**params)
+
+        assert node.uses_request_scheduler is expected
+
+    def test_node_reports_scheduler_fallback_after_setup(self, make_text_prompt_node):
+        node = make_text_prompt_node(batch_size=4, shared_batching=True)
+
+        # Set up without a shared engine, so no scheduler was attached
+        node.model = object()
+        assert node.uses_request_scheduler is False
+
+        node.request_scheduler = object()
+        assert node.uses_request_scheduler is True
+
+    def test_invalid_execution_mode_rejected(self, temp_workspace):
+        nodes = [{"id": "loader", "type": "load", "params": {"name": "loader"}, "dependencies": []}]
+        config_path = self.write_config(temp_workspace, nodes, {"execution_mode": "parallel"})
+
+        with pytest.raises(ValueError, match="execution_mode"):
+            Workflow(config_path)
@@ -0,0 +1,212 @@
+"""
+Unit tests for continuous-feed generation.
+
+Tests the default Engine.generate_text_stream implementation and the
+TextPromptNode continuous processing mode using CPU stand-in engines.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from polysome.engines.base import Engine
+from polysome.engines.vllm import VLLMEngine
+
+
+class SleepEngine(Engine):
+    """Stand-in engine whose generation time is given by the prompt."""
+
+    def __init__(self):
+        super().__init__("sleep")
+        self.active = 0
+        self.max_active = 0
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def generate_text(self, messages, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(float(messages[-1]["content"]))
+        with self._lock:
+            self.active -= 1
+        return f"slept {messages[-1]['content']}"
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        self.batch_sizes.append(len(messages_batch))
+        return [f"slept {m[-1]['content']}" for m in messages_batch]
+
+
+def requests_for(delays):
+    return [(f"r{i}", [{"role": "user", "content": str(d)}]) for i, d in enumerate(delays)]
+
+
+class TestGenerateTextStream:
+    """Test suite for the default generate_text_stream implementation."""
+
+    def test_default_stream_runs_consecutive_batches(self):
+        engine = SleepEngine()
+        results = list(engine.generate_text_stream(requests_for([0] * 5), 2))
+
+        assert [r for r, _, _ in results] == ["r0", "r1", "r2", "r3", "r4"]
+        assert engine.batch_sizes == [2, 2, 1]
+
+    def test_batch_errors_are_reported_per_request(self):
+        engine = SleepEngine()
+        engine.generate_text_batch = Mock(side_effect=[RuntimeError("boom"), ["ok"]])
+        results = list(engine.generate_text_stream(requests_for([0] * 3), 2))
+
+        assert [(r, out) for r, out, _ in results] == [("r0", None), ("r1", None), ("r2", "ok")]
+        assert all(isinstance(err, RuntimeError) for _, _, err in results[:2])
+
+
+class FakeLLMEngine:
+    """Stand-in vLLM LLMEngine whose every step finishes the oldest request."""
+
+    def __init__(self):
+        self.running = []
+        self.aborted = []
+
+    def add_request(self, request_id, prompt, sampling_params):
+        self.running.append(request_id)
+
+    def step(self):
+        request_id = self.running.pop(0)
+        return [
+            SimpleNamespace(
+                request_id=request_id, finished=True, outputs=[SimpleNamespace(text="done")]
+            )
+        ]
+
+    def abort_request(self, request_ids):
+        self.aborted.extend(request_ids)
+        self.running = [r for r in self.running if r not in request_ids]
+
+
+class TestVLLMGenerateTextStream:
+    """Test suite for VLLMEngine.generate_text_stream."""
+
+    def test_requests_aborted_when_consumer_stops(self):
+        engine = VLLMEngine.__new__(VLLMEngine)
+        engine._request_counter = iter(range(100))
+        engine._apply_chat_template = lambda messages: messages[-1]["content"]
+        engine._build_sampling_params = lambda kwargs: None
+        llm_engine = FakeLLMEngine()
+        engine.llm = SimpleNamespace(llm_engine=llm_engine)
+
+        stream = engine.generate_text_stream(requests_for([0] * 5), 3)
+        assert next(stream) == ("r0", "done", None)
+        stream.close()
+
+        assert llm_engine.aborted == ["polysome-1", "polysome-2"]
+        assert llm_engine.running == []
+
+
+class PipelinedEngine(SleepEngine):
+    """Stand-in engine that queues submitted batches on a background thread."""
+
+    def __init__(self):
+        super().__init__()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.queued = 0
+        self.max_queued = 0
+
+    def submit_text_batch(self, messages_batch, **kwargs):
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def run():
+            time.sleep(0.02)
+            with self._lock:
+                self.queued -= 1
+            return self.generate_text_batch(messages_batch, **kwargs)
+
+        return self.executor.submit(run)
+
+    def supports_native_batching(self):
+        return True
+
+
+class CompletionOrderEngine(SleepEngine):
+    """Stand-in streaming engine: each window of requests finishes shortest first."""
+
+    def generate_text_stream(self, requests, max_in_flight, **kwargs):
+        requests = iter(requests)
+        while chunk := list(islice(requests, max_in_flight)):
+            for request_id, messages in sorted(chunk, key=lambda r: float(r[1][-1]["content"])):
+                yield request_id, self.generate_text(messages), None
+
+
+class SlowBatchEngine(SleepEngine):
+    """Stand-in batching engine that generates the items of a batch in turn."""
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        return [self.generate_text(messages) for messages in messages_batch]
+
+    def supports_native_batching(self):
+        return True
+
+
+# Prompts carry the delay each stand-in engine request sleeps for
+DELAY_PROMPTS = {"template_context_map": {"text": "delay"}}
+
+
+class TestTextPromptNodeBatchesInFlight:
+    """Test suite for TextPromptNode batch pipelining."""
+
+    def test_batches_submitted_ahead_written_in_order(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(
+            PipelinedEngine(), batch_size=2, max_batches_in_flight=3, **DELAY_PROMPTS
+        )
+        data = {str(i): {"id": str(i), "delay": 0} for i in range(9)}
+
+        node._execute_processing(data, len(data))
+
+        assert read_jsonl_rows(node.output_full_path, "id") == [str(i) for i in range(9)]
+        assert node.model.batch_sizes == [2, 2, 2, 2, 1]
+        assert node.model.max_queued == 3
+        assert node.errors == []
+
+
+class TestTextPromptNodeBatchTimeout:
+    """Test suite for batch_timeout outside the main thread."""
+
+    def test_batch_timeout_enforced_in_worker_thread(self, make_text_prompt_node):
+        node = make_text_prompt_node(
+            SlowBatchEngine(), batch_size=2, batch_timeout=0.2, **DELAY_PROMPTS
+        )
+        data = {str(i): {"id": str(i), "delay": 1.0 if i == 0 else 0} for i in range(4)}
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(node._execute_processing, data, len(data)).result(timeout=5)
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.9
+        assert len(node.errors) == 4
+        assert all("timed out" in error for error in node.errors)
+        # The second batch waited for the abandoned first one instead of overlapping it
+        time.sleep(1.0)
+        assert node.model.max_active == 1
+
+
+class TestTextPromptNodeContinuous:
+    """Test suite for TextPromptNode continuous processing."""
+
+    def test_continuous_processing_writes_every_item(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(CompletionOrderEngine(), max_in_flight=3, **DELAY_PROMPTS)
+        data = {str(i): {"id": str(i), "delay": 0.05 if i == 0 else 0.0} for i in range(6)}
+
+        node._execute_processing(data, len(data))
+
+        rows = read_jsonl_rows(node.output_full_path)
+        ids = [r["id"] for r in rows]
+        assert sorted(ids) == sorted(data)
+        # Written as completed: the slow first item after the rest of its window
+        assert ids[:3] == ["1", "2", "0"]
+        assert rows[0]["output"] == f"slept {rows[0]['delay']}"
+        assert node.errors == []
@@ -0,0 +1,108 @@
+"""
+Unit tests for streaming record iteration in DataFileLoader.
+"""
+
+import json
+
+import pytest
+
+from polysome.utils.data_loader import DataFileLoader
+
+
+class TestIterRecords:
+    """Test suite for DataFileLoader.iter_records."""
+
+    def test_csv_read_in_chunks(self, temp_workspace, monkeypatch):
+        path = temp_workspace["data_dir"] / "input.csv"
+        path.write_text("id,text\n" + "".join(f"{i},row {i}\n" for i in range(7)))
+        monkeypatch.setattr(DataFileLoader, "CSV_CHUNK_SIZE", 3)
+
+        loader = DataFileLoader(path, "id")
+        records = list(loader.iter_records())
+
+        assert [key for key, _ in records] == [str(i) for i in range(7)]
+        assert records[4][1] == {"text": "row 4"}
+        assert dict(records) == loader.load_input_data()
+
+    def test_json_array_parsed_incrementally(self, temp_workspace, monkeypatch):
+        data = [{"id": i, "text": "x" * (i * 7), "n": 12345} for i in range(20)]
+        data.insert(3, "not a record")
+        path = temp_workspace["data_dir"] / "input.json"
+        path.write_text(json.dumps(data, indent=2))
+        monkeypatch.setattr(DataFileLoader, "JSON_READ_SIZE", 5)
+
+        records = list(DataFileLoader(path, "id").iter_records())
+
+        assert [key for key, _ in records] == [str(i) for i in range(20)]
+        assert all(row["n"] == 12345 for _, row in records)
+
+    def test_json_must_be_array(self, temp_workspace):
+        path = temp_workspace["data_dir"] / "input.json"
+        path.write_text('{"id": 1}')
+
+        with pytest.raises(ValueError, match="array"):
+            list(DataFileLoader(path, "id").iter_records())
+
+    def test_jsonl_duplicates_keep_first(self, temp_workspace, create_jsonl_file):
+        path = create_jsonl_file(
+            "input.jsonl",
+            [{"id": "1", "v": "a"}, {"id": "2", "v": "b"}, {"id": "1", "v": "c"}],
+        )
+
+        records = list(DataFileLoader(path, "id").iter_records())
+
+        assert records == [("1", {"id": "1", "v": "a"}), ("2", {"id": "2", "v": "b"})]
+
+    def test_missing_file_raises_before_iteration(self, temp_workspace):
+        with pytest.raises(FileNotFoundError):
+            DataFileLoader(temp_workspace["data_dir"] / "missing.jsonl", "id").iter_records()
+
+
+class TestProjectedReads:
+    """Test suite for DataFileLoader column projection."""
+
+    def test_csv_reads_only_requested_columns(self, temp_workspace):
+        path = temp_workspace["data_dir"] / "input.csv"
+        path.write_text("id,text,report,n\n1,a,long report,3\n2,b,other report,4\n")
+
+        loader = DataFileLoader(path, "id", columns=["n"])
+
+        assert loader.load_input_data() == {"1": {"n": 3}, "2": {"n": 4}}
+        assert dict(loader.iter_records()) == loader.load_input_data()
+
+    def test_jsonl_records_projected(self, temp_workspace):
+        path = temp_workspace["data_dir"] / "input.jsonl"
+        path.write_text(
+            json.dumps({"id": "1", "report": "r" * 1000, "summary": "s1"}) + "\n"
+            + json.dumps({"id": "2", "summary": "s2", "score": float("nan")}) + "\n"
+        )
+
+        loader = DataFileLoader(path, "id", columns={"summary"})
+
+        assert loader.load_input_data() == {
+            "1": {"id": "1", "summary": "s1"},
+            "2": {"id": "2", "summary": "s2"},
+        }
+        assert list(DataFileLoader(path, "id").iter_records())[1][1]["score"] != 0
+
+
+class TestStreamingNodeInput:
+    """Test suite for JSONL processing nodes consuming records lazily."""
+
+    def test_resume_skips_processed_items(
+        self, create_jsonl_file, make_transform_node, read_jsonl_rows
+    ):
+        create_jsonl_file("input.jsonl", [{"id": str(i), "text": f"row {i}"} for i in range(4)])
+        node = make_transform_node(
+            "upper", input_data_path="input.jsonl", primary_key="id", resume=True
+        )
+        node.output_full_path.parent.mkdir(parents=True, exist_ok=True)
+        node.output_full_path.write_text(json.dumps({"id": "0", "output": "ROW 0"}) + "\n")
+
+        result = node.run()
+
+        rows = read_jsonl_rows(node.output_full_path)
+        assert [r["id"] for r in rows] == ["0", "1", "2", "3"]
+        assert rows[3]["output"] == "ROW 3"
+        assert node._streamed_items == 3
+        assert result["status"] == "completed_successfully"
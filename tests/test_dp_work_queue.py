@@ -0,0 +1,179 @@
+"""
+Unit tests for the data parallel work queue.
+
+Runs the DataParallelCoordinator with a CPU stand-in worker in place of the
+vLLM worker, so chunking, load balancing and result ordering can be tested
+without GPUs.
+"""
+
+import os
+import time
+from queue import Empty
+
+import pytest
+
+from polysome.engines.vllm_dp import DataParallelCoordinator, _make_prompt_renderer
+
+
+def _sleep_worker(
+    dp_rank,
+    dp_size,
+    dp_master_ip,
+    dp_master_port,
+    gpus_per_dp_rank,
+    model_name,
+    vllm_kwargs,
+    input_queue,
+    output_queue,
+    error_queue,
+    ready_queue,
+):
+    """Stand-in worker: sleeps 10ms per "." in each prompt and echoes it upper-cased."""
+    ready_queue.put(dp_rank)
+    while True:
+        try:
+            work_item = input_queue.get(timeout=1.0)
+        except Empty:
+            continue
+        if work_item is None:
+            break
+        batch_id, prompts, _ = work_item
+        output_queue.put((batch_id, dp_rank, None))
+        for prompt in prompts:
+            time.sleep(0.01 * prompt.count("."))
+        output_queue.put((batch_id, dp_rank, [p.upper() for p in prompts]))
+
+
+def _dying_worker(
+    dp_rank,
+    dp_size,
+    dp_master_ip,
+    dp_master_port,
+    gpus_per_dp_rank,
+    model_name,
+    vllm_kwargs,
+    input_queue,
+    output_queue,
+    error_queue,
+    ready_queue,
+):
+    """Stand-in worker whose rank 1 dies right after taking its first chunk."""
+    if dp_rank == 1:
+        ready_queue.put(dp_rank)
+        input_queue.get()
+        os._exit(1)
+    _sleep_worker(
+        dp_rank, dp_size, dp_master_ip, dp_master_port, gpus_per_dp_rank, model_name,
+        vllm_kwargs, input_queue, output_queue, error_queue, ready_queue,
+    )
+
+
+@pytest.fixture
+def coordinator(monkeypatch):
+    monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "0,1")
+    coordinator = DataParallelCoordinator(
+        dp_size=2, gpus_per_dp_rank=1, dp_master_port=0, worker_target=_sleep_worker
+    )
+    coordinator.start_workers("stand-in", {})
+    yield coordinator
+    coordinator.shutdown()
+
+
+class TestDataParallelWorkQueue:
+    """Test suite for work-queue distribution in DataParallelCoordinator."""
+
+    def test_results_keep_prompt_order(self, coordinator):
+        prompts = [f"p{i}" + "." * (i % 3) for i in range(20)]
+
+        results = coordinator.distribute_batch(prompts, {})
+
+        assert results == [p.upper() for p in prompts]
+        assert coordinator.batch_stats["completed_prompts"] == 20
+
+    def test_uneven_prompts_are_balanced(self, coordinator):
+        # A static split by count would hand all long prompts to rank 0
+        prompts = ["long" + "." * 30] * 4 + ["short"] * 4
+
+        start = time.time()
+        results = coordinator.distribute_batch(prompts, {})
+        elapsed = time.time() - start
+
+        assert results == [p.upper() for p in prompts]
+        # Balanced: ~0.6s per rank instead of ~1.2s on one rank
+        assert elapsed < 1.0
+        counts = coordinator.batch_stats["worker_batch_counts"]
+        assert counts[0] > 0 and counts[1] > 0
+
+    def test_batches_in_flight_complete_independently(self, coordinator):
+        batches = [[f"b{b}-{i}" + "." * b for i in range(5)] for b in range(3)]
+
+        futures = [coordinator.submit_batch(prompts, {}) for prompts in batches]
+
+        for prompts, future in zip(batches, futures):
+            assert future.result(timeout=10) == [p.upper() for p in prompts]
+        assert coordinator._chunks == {}
+
+    def test_chunk_lost_by_dying_worker_is_requeued(self, monkeypatch):
+        monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "0,1")
+        coordinator = DataParallelCoordinator(
+            dp_size=2, gpus_per_dp_rank=1, dp_master_port=0, chunk_size=1,
+            worker_target=_dying_worker,
+        )
+        coordinator.HEALTH_CHECK_INTERVAL = 0.2
+        coordinator.start_workers("stand-in", {})
+        try:
+            prompts = [f"p{i}..." for i in range(6)]
+
+            results = coordinator.distribute_batch(prompts, {}, timeout=10)
+
+            assert results == [p.upper() for p in prompts]
+            assert coordinator._get_healthy_workers() == [0]
+        finally:
+            coordinator.shutdown()
+
+    def test_distribute_batch_wait_is_bounded(self, coordinator):
+        with pytest.raises(TimeoutError):
+            coordinator.distribute_batch(["slow" + "." * 100], {}, timeout=0.2)
+
+        assert coordinator._chunks == {}
+
+    def test_chunks_ordered_longest_first(self):
+        coordinator = DataParallelCoordinator(
+            dp_size=2, gpus_per_dp_rank=1, dp_master_port=0, chunk_size=2
+        )
+        prompts = ["a", "aaaa", "aa", "aaa", "aaaaa"]
+
+        chunks = coordinator._make_chunks(prompts, num_workers=2)
+
+        assert chunks == [[4, 1], [3, 2], [0]]
+
+
+class TestWorkerPromptRenderer:
+    """Test suite for chat-template rendering inside data parallel workers."""
+
+    class FakeTokenizer:
+        chat_template = "{{ messages }}"
+
+        def __init__(self):
+            self.calls = 0
+
+        def apply_chat_template(self, messages, tokenize, add_generation_prompt):
+            self.calls += 1
+            assert tokenize is False and add_generation_prompt is True
+            body = "".join(f"<{m['role']}>{m['content']}" for m in messages)
+            return body + "<assistant>"
+
+    def test_applies_template_and_caches(self):
+        tokenizer = self.FakeTokenizer()
+        render = _make_prompt_renderer(tokenizer)
+        messages = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Hi"}]
+
+        assert render(messages) == "<system>Be brief.<user>Hi<assistant>"
+        assert render([dict(m) for m in messages]) == "<system>Be brief.<user>Hi<assistant>"
+        assert tokenizer.calls == 1
+        assert render("already rendered") == "already rendered"
+
+    def test_falls_back_without_template(self):
+        render = _make_prompt_renderer(None)
+
+        assert render([{"role": "user", "content": "Hi"}]) == "user: Hi\nassistant:"
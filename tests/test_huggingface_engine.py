@@ -0,0 +1,84 @@
+"""
+Unit tests for HuggingFaceEngine batch generation.
+
+Uses a character-level stand-in tokenizer and model, so tokenization, left
+padding and output slicing can be checked without downloading a model.
+"""
+
+import torch
+from transformers import BatchEncoding
+
+from polysome.engines.huggingface import HuggingFaceEngine
+
+PAD = 0
+
+
+class CharTokenizer:
+    """One token per character, left padding with PAD."""
+
+    chat_template = "chars"
+    pad_token = "<pad>"
+
+    def __init__(self):
+        self.calls = []
+
+    def apply_chat_template(self, messages, tokenize, add_generation_prompt):
+        return messages[-1]["content"]
+
+    def __call__(self, prompts, padding_side=None, **kwargs):
+        self.calls.append((list(prompts), padding_side))
+        width = max(len(p) for p in prompts)
+        ids = [[PAD] * (width - len(p)) + [ord(c) for c in p] for p in prompts]
+        mask = [[0] * (width - len(p)) + [1] * len(p) for p in prompts]
+        return BatchEncoding(
+            {"input_ids": torch.tensor(ids), "attention_mask": torch.tensor(mask)}
+        )
+
+    def batch_decode(self, sequences, skip_special_tokens):
+        return ["".join(chr(t) for t in seq.tolist() if t != PAD) for seq in sequences]
+
+
+class EchoModel:
+    """Generates the prompt's own last three tokens, upper-cased."""
+
+    device = "cpu"
+
+    def generate(self, input_ids, attention_mask, **kwargs):
+        new_tokens = torch.tensor(
+            [[ord(chr(t).upper()) for t in row[-3:].tolist()] for row in input_ids]
+        )
+        return torch.cat([input_ids, new_tokens], dim=-1)
+
+
+def make_engine():
+    engine = HuggingFaceEngine.__new__(HuggingFaceEngine)
+    engine.model_name = "chars"
+    engine.tokenizer = CharTokenizer()
+    engine.model = EchoModel()
+    return engine
+
+
+class TestHuggingFaceBatchGeneration:
+    """Test suite for HuggingFaceEngine.generate_text_batch."""
+
+    def test_tokenizes_once_and_slices_left_padded_outputs(self):
+        engine = make_engine()
+        batch = [
+            [{"role": "user", "content": "short"}],
+            [{"role": "user", "content": "a much longer prompt"}],
+        ]
+
+        results = engine.generate_text_batch(batch, max_new_tokens=3)
+
+        assert results == ["ORT", "MPT"]
+        assert engine.tokenizer.calls == [(["short", "a much longer prompt"], "left")]
+
+    def test_stream_uses_batches_instead_of_threads(self):
+        engine = make_engine()
+        requests = [(i, [{"role": "user", "content": f"prompt {i}"}]) for i in range(3)]
+
+        results = list(engine.generate_text_stream(requests, 2, max_new_tokens=3))
+
+        assert results == [(0, "T 0", None), (1, "T 1", None), (2, "T 2", None)]
+        # Tokenizers must not be shared across threads: one call per batch
+        assert len(engine.tokenizer.calls) == 2
@@ -7,6 +7,9 @@ Tests each step individually and the complete pipeline integration.
 
 import unittest
 import json
+from unittest.mock import patch
+
+from polysome.utils.post_processing import extract_and_parse_json
 from polysome.utils.json_parsing_pipeline import (
     JSONParsingPipeline,
     MarkdownRemovalStep,
@@ -17,6 +20,7 @@ from polysome.utils.json_parsing_pipeline import (
     parse_json_string,
     JSONParser,
     create_default_json_parser,
+    get_default_json_parser,
     PythonDictFallback,
     TruncatedJSONFallback,
 )
@@ -823,6 +827,36 @@ class TestConvenienceFunctionWithFallbacks(unittest.TestCase):
                 self.assertEqual(result.success, should_succeed)
 
 
+class TestExtractAndParseJson(unittest.TestCase):
+    """Test cases for the extract_and_parse_json fast path."""
+
+    def test_default_parser_is_shared(self):
+        """Test that the default parser is created once and reused."""
+        self.assertIs(get_default_json_parser(), get_default_json_parser())
+        self.assertIsNot(create_default_json_parser(), create_default_json_parser())
+
+    def test_plain_json_skips_parser(self):
+        """Test that plain JSON is decoded without the fallback chain."""
+        with patch.object(JSONParser, "parse") as parse:
+            result = extract_and_parse_json(' {"label": "a", "score": [1, 2]}\n')
+
+        parse.assert_not_called()
+        self.assertEqual(result, {"label": "a", "score": [1, 2]})
+
+    def test_malformed_json_falls_back(self):
+        """Test that outputs the fast path rejects still reach the fallback chain."""
+        test_cases = [
+            ('```json\n{"markdown": "block"}\n```', {"markdown": "block"}),
+            ("{'python': True}", {"python": True}),
+            ('{"truncated": "value', {"truncated": "value"}),
+            ('"just a string"', None),
+        ]
+
+        for input_text, expected in test_cases:
+            with self.subTest(input_text=input_text):
+                self.assertEqual(extract_and_parse_json(input_text), expected)
+
+
 if __name__ == "__main__":
     # Run tests with verbose output
     unittest.main(verbosity=2)
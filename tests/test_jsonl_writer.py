@@ -0,0 +1,135 @@
+"""
+Unit tests for IncrementalJsonlWriter group commits, crash recovery and the
+sidecar key index used on resume.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from polysome.utils.jsonl_writer import IncrementalJsonlWriter
+from polysome.utils.key_index import index_path_for, load_key_index
+
+
+class TestIncrementalJsonlWriter:
+    """Test suite for buffered writing in IncrementalJsonlWriter."""
+
+    def test_rows_committed_in_groups(self, temp_workspace, read_jsonl_rows):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+
+        with IncrementalJsonlWriter(path, mode="w", flush_every_rows=3) as writer:
+            for i in range(4):
+                writer.write_row({"id": str(i)})
+                if i == 1:
+                    assert path.read_text() == ""
+            # First group of three is on disk, fourth still buffered
+            assert len(read_jsonl_rows(path)) == 3
+            assert int(writer.marker_path.read_text()) == path.stat().st_size
+
+        assert read_jsonl_rows(path, "id") == ["0", "1", "2", "3"]
+        assert int(writer.marker_path.read_text()) == path.stat().st_size
+
+    def test_fsync_on_commit(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+
+        with patch("polysome.utils.jsonl_writer.os.fsync") as fsync:
+            with IncrementalJsonlWriter(path, flush_every_rows=2, fsync="commit") as writer:
+                for i in range(4):
+                    writer.write_row({"id": str(i)})
+                assert fsync.call_count == 2
+
+    def test_invalid_fsync_level(self, temp_workspace):
+        with pytest.raises(ValueError, match="fsync"):
+            IncrementalJsonlWriter(temp_workspace["output_dir"] / "out.jsonl", fsync="always")
+
+    def test_append_drops_rows_past_commit_marker(self, temp_workspace, read_jsonl_rows):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        with IncrementalJsonlWriter(path, mode="w", flush_every_rows=2) as writer:
+            writer.write_row({"id": "0"})
+            writer.write_row({"id": "1"})
+        # Simulate a crash in the middle of the next commit
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"id": "2"}\n{"id": ')
+
+        with IncrementalJsonlWriter(path, mode="a", flush_every_rows=2) as writer:
+            writer.write_row({"id": "3"})
+
+        assert read_jsonl_rows(path, "id") == ["0", "1", "3"]
+
+    def test_append_without_marker_drops_torn_line(self, temp_workspace, read_jsonl_rows):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        path.write_text('{"id": "0"}\n{"id": "1"}\n{"id"')
+
+        with IncrementalJsonlWriter(path, mode="a") as writer:
+            writer.write_row({"id": "2"})
+
+        assert read_jsonl_rows(path, "id") == ["0", "1", "2"]
+        assert not writer.marker_path.exists()
+
+
+class TestKeyIndex:
+    """Test suite for the sidecar key index used on resume."""
+
+    def test_writer_maintains_index(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        with IncrementalJsonlWriter(path, mode="w", key_field="id") as writer:
+            for i in range(3):
+                writer.write_row({"id": f"k{i}", "output": "x"})
+            writer.write_row({"output": "no key"})
+
+        index_path = index_path_for(path)
+        lines = index_path.read_bytes().splitlines()
+        assert len(lines) == 4  # header + three keyed rows
+        assert load_key_index(path, "id") == {"k0", "k1", "k2"}
+        assert index_path.read_bytes().splitlines() == lines
+
+    def test_missing_index_rebuilt_by_scan(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        rows = [
+            {"id": "a", "v": 1},
+            {"v": 2, "id": 7},
+            {"id": 'quote "b"', "v": 3},
+            {"id": "c", "nested": {"id": "not-a-key"}},
+        ]
+        path.write_text("".join(json.dumps(r) + "\n" for r in rows) + "not json\n")
+
+        assert load_key_index(path, "id") == {"a", "7", 'quote "b"', "c"}
+        assert index_path_for(path).exists()
+
+    def test_stale_index_catches_up_and_drops_truncated_rows(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        with IncrementalJsonlWriter(path, mode="w", key_field="id") as writer:
+            writer.write_row({"id": "0"})
+            writer.write_row({"id": "1"})
+        # Rows appended by another writer, then a torn row
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"id": "2"}\n{"id": "3')
+
+        assert load_key_index(path, "id") == {"0", "1", "2"}
+
+        # Output truncated behind the index's back
+        with open(path, "r+b") as f:
+            f.truncate(len(b'{"id": "0"}\n'))
+        assert load_key_index(path, "id") == {"0"}
+
+    def test_append_continues_index(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        with IncrementalJsonlWriter(path, mode="w", key_field="id") as writer:
+            writer.write_row({"id": "0"})
+        path.write_text(path.read_text() + '{"id": "1"}\n')
+
+        with IncrementalJsonlWriter(path, mode="a", key_field="id", flush_every_rows=5) as writer:
+            writer.write_row({"id": "2"})
+
+        assert load_key_index(path, "id") == {"0", "1", "2"}
+        entries = index_path_for(path).read_bytes().splitlines()[1:]
+        assert int(entries[-1].split(b"\t")[0]) == path.stat().st_size
+
+    def test_index_of_rewritten_output_is_rebuilt(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        with IncrementalJsonlWriter(path, mode="w", key_field="id") as writer:
+            writer.write_row({"id": "old"})
+        path.write_text('{"id": "new"}\n{"id": "more"}\n')
+
+        assert load_key_index(path, "id") == {"new", "more"}
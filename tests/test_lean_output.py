@@ -0,0 +1,185 @@
+"""
+Unit tests for lean node outputs, whose rows carry only the primary key and
+the node's output, and for resolving the other attributes by key.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from polysome.utils.jsonl_writer import IncrementalJsonlWriter
+from polysome.utils.key_index import (
+    TABLE_DIR,
+    KeyedRowReader,
+    _iter_index,
+    index_path_for,
+    scan_keys,
+    table_path_for,
+)
+
+
+class TestLeanOutput:
+    """Test suite for lean_output in JSONLProcessingNode."""
+
+    def test_chain_resolves_attributes_from_original_rows(
+        self, temp_workspace, create_jsonl_file, make_transform_node, read_jsonl_rows
+    ):
+        report = "long report " * 50
+        create_jsonl_file(
+            "input.jsonl",
+            [{"id": str(i), "text": f"t{i}", "report": report} for i in range(3)],
+        )
+        first = make_transform_node(
+            "first", output_data_attribute="first", input_data_path="input.jsonl",
+            primary_key="id", suffix="!", lean_output=True,
+        )
+        second = make_transform_node(
+            "second", output_data_attribute="second", suffix="?", lean_output=True
+        )
+        third = make_transform_node("third", output_data_attribute="third", suffix=".")
+
+        first_info = first.run()
+        second_info = second.run({"first": first_info})
+        third_info = third.run({"second": second_info})
+
+        input_path = str(temp_workspace["data_dir"] / "input.jsonl")
+        assert first_info["attribute_source"] == input_path
+        assert second_info["attribute_source"] == input_path
+        assert "attribute_source" not in third_info
+        assert read_jsonl_rows(first_info["output_path"])[0] == {"id": "0", "first": "t0!"}
+        assert read_jsonl_rows(second_info["output_path"])[0] == {"id": "0", "second": "t0?"}
+        # The non-lean end of the chain gets every attribute back
+        assert read_jsonl_rows(third_info["output_path"])[2] == {
+            "id": "2", "third": "t2.", "second": "t2?", "text": "t2", "report": report,
+        }
+        assert third_info["status"] == "completed_successfully"
+
+    def test_non_jsonl_input_writes_full_rows(
+        self, temp_workspace, make_transform_node, read_jsonl_rows
+    ):
+        (temp_workspace["data_dir"] / "input.csv").write_text("id,text\n1,a\n")
+        node = make_transform_node(
+            "node", output_data_attribute="node", input_data_path="input.csv",
+            primary_key="id", suffix="!", lean_output=True,
+        )
+
+        info = node.run()
+
+        assert "attribute_source" not in info
+        assert read_jsonl_rows(info["output_path"]) == [{"id": "1", "node": "a!", "text": "a"}]
+
+
+class TestKeyedRowReader:
+    """Test suite for KeyedRowReader."""
+
+    def test_reads_rows_by_key_and_sees_appended_rows(self, temp_workspace):
+        path = temp_workspace["data_dir"] / "rows.jsonl"
+        path.write_text(
+            '{"id": "a", "v": 1}\n'
+            "not json\n"
+            '{"id": "b", "v": 2}\n'
+            '{"id": "a", "v": 3}\n'
+        )
+
+        with KeyedRowReader(path, "id") as reader:
+            assert reader.get("b") == {"id": "b", "v": 2}
+            # Last row wins for a repeated key
+            assert reader.get("a") == {"id": "a", "v": 3}
+            assert reader.get("c") is None
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('{"id": "c", "v": 4}\n')
+            assert reader.get("c") == {"id": "c", "v": 4}
+
+        # The reader never writes a key index sidecar
+        assert not path.with_name("rows.jsonl.keys").exists()
+
+    def test_mapping_interface_in_file_order(self, temp_workspace, create_jsonl_file):
+        path = create_jsonl_file("rows.jsonl", [{"id": k, "v": i} for i, k in enumerate("abca")])
+
+        with KeyedRowReader(path, "id") as reader:
+            assert len(reader) == 3
+            assert list(reader) == ["b", "c", "a"]
+            assert "c" in reader and "z" not in reader
+            assert reader["a"] == {"id": "a", "v": 3}
+            with pytest.raises(KeyError):
+                reader["z"]
+
+    def test_hash_table_is_stored_and_extended(self, temp_workspace, create_jsonl_file):
+        path = create_jsonl_file("rows.jsonl", [{"id": str(i)} for i in range(50)])
+        cache_dir = temp_workspace["output_dir"] / TABLE_DIR
+        with KeyedRowReader(path, "id", cache_dir=cache_dir):
+            pass
+        # Stored in the cache directory, keyed by the file's path
+        assert table_path_for(path, cache_dir).exists()
+        assert sorted(p.name for p in path.parent.iterdir()) == ["rows.jsonl"]
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"id": "new"}\n')
+        with patch("polysome.utils.key_index.scan_keys", wraps=scan_keys) as scan:
+            with KeyedRowReader(path, "id", cache_dir=cache_dir) as reader:
+                assert reader.get("7") == {"id": "7"}
+                assert reader.get("new") == {"id": "new"}
+                assert len(reader) == 51
+        # Only the appended row was scanned; the stored table covered the rest
+        assert scan.call_count == 1
+        assert scan.call_args.args[1] == path.stat().st_size - len('{"id": "new"}\n')
+
+        # A rewritten file is detected by the key of the last row
+        create_jsonl_file("rows.jsonl", [{"id": "x"}, {"id": "y"}])
+        with KeyedRowReader(path, "id", cache_dir=cache_dir) as reader:
+            assert list(reader) == ["x", "y"]
+        # ... and by its first bytes, even with the same size and last key
+        create_jsonl_file("rows.jsonl", [{"id": "z"}, {"id": "y"}])
+        with KeyedRowReader(path, "id", cache_dir=cache_dir) as reader:
+            assert list(reader) == ["z", "y"]
+
+    def test_refresh_streams_sidecar_from_last_entry(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        with IncrementalJsonlWriter(path, mode="w", key_field="id") as writer:
+            for i in range(5):
+                writer.write_row({"id": str(i)})
+        indexed = index_path_for(path).stat().st_size
+
+        with patch("polysome.utils.key_index._load_entries") as load_all:
+            with KeyedRowReader(path, "id") as reader:
+                with IncrementalJsonlWriter(path, mode="a", key_field="id") as writer:
+                    writer.write_row({"id": "5"})
+                with patch("polysome.utils.key_index._iter_index", wraps=_iter_index) as stream:
+                    assert reader.get("5") == {"id": "5"}
+                assert list(reader) == [str(i) for i in range(6)]
+
+        # The refresh continued after the entry of row 4, not from the start
+        assert stream.call_count == 1
+        assert stream.call_args.args[2] == indexed
+        load_all.assert_not_called()
+
+    def test_stale_sidecar_is_ignored(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        with IncrementalJsonlWriter(path, mode="w", key_field="id") as writer:
+            for key in "abc":
+                writer.write_row({"id": key})
+        # Rewritten by another tool, leaving the sidecar behind
+        path.write_text('{"id": "x"}\n{"id": "y"}\n{"id": "z"}\n')
+
+        with KeyedRowReader(path, "id") as reader:
+            assert list(reader) == ["x", "y", "z"]
+            assert reader.get("a") is None
+
+    def test_hash_collisions_resolved_by_key(self, temp_workspace, create_jsonl_file):
+        path = create_jsonl_file("rows.jsonl", [{"id": str(i), "v": i} for i in range(20)])
+
+        with patch("polysome.utils.key_index._key_hash", return_value=42):
+            with KeyedRowReader(path, "id") as reader:
+                assert [reader[str(i)]["v"] for i in range(20)] == list(range(20))
+                assert reader.get("20") is None
+
+    def test_only_committed_rows_are_visible(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "out.jsonl"
+        with IncrementalJsonlWriter(path, mode="w", flush_every_rows=2, key_field="id") as writer:
+            for i in range(3):
+                writer.write_row({"id": str(i)})
+
+            with KeyedRowReader(path, "id", refresh_on_miss=False) as reader:
+                assert list(reader) == ["0", "1"]
+                assert "2" not in reader
@@ -0,0 +1,162 @@
+"""
+Unit tests for the llama.cpp multi-instance worker pool.
+
+Runs LlamaCppWorkerPool with a CPU stand-in worker in place of the Llama
+worker, so fan-out, ordering and failure handling can be tested without
+llama-cpp-python or a GGUF model.
+"""
+
+import os
+import signal
+import time
+
+import pytest
+
+from polysome.engines.llama import LlamaCppWorkerPool, _completion_text
+
+
+def _sleep_worker(rank, model_path, llama_kwargs, cpu_ids, task_queue, result_queue):
+    """Stand-in worker: sleeps for the prompt's number of "." x 10ms, echoes it upper-cased."""
+    if model_path == "broken":
+        result_queue.put(("ready", rank, None, "cannot load model"))
+        return
+    result_queue.put(("ready", rank, None, None))
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        batch_id, index, messages, kwargs = task
+        content = messages[-1]["content"]
+        if content == "crash":
+            os._exit(1)
+        if content == "crash while reporting":
+            # Half a message: the length header promises more bytes than follow
+            os.write(result_queue.connection.fileno(), b"\x00\x00\x10\x00partial")
+            os._exit(1)
+        if content == "hang":
+            time.sleep(60)
+        time.sleep(0.01 * content.count("."))
+        result_queue.put(("done", rank, (batch_id, index), f"{content.upper()} @{llama_kwargs['n_threads']}"))
+
+
+def messages(text):
+    return [{"role": "user", "content": text}]
+
+
+@pytest.fixture
+def pool():
+    pool = LlamaCppWorkerPool("model.gguf", {}, num_instances=2, worker_target=_sleep_worker)
+    pool.POLL_INTERVAL = 0.1
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+class TestLlamaCppWorkerPool:
+    """Test suite for LlamaCppWorkerPool."""
+
+    def test_batch_fans_out_and_keeps_order(self, pool):
+        batch = [messages(f"p{i}" + "." * 20) for i in range(4)]
+        threads = len(LlamaCppWorkerPool._split_cpus(2)[0])
+
+        start = time.time()
+        results = pool.generate(batch, {})
+        elapsed = time.time() - start
+
+        assert results == [f"P{i}" + "." * 20 + f" @{threads}" for i in range(4)]
+        # Two workers: ~0.4s instead of ~0.8s sequentially
+        assert elapsed < 0.7
+
+    def test_stream_yields_in_completion_order(self, pool):
+        requests = [(f"r{i}", messages(f"p{i}" + "." * d)) for i, d in enumerate([40, 1, 1, 1])]
+
+        ids = [request_id for request_id, _ in pool.generate_stream(requests, {})]
+
+        # The long first request holds one worker; the other takes the rest
+        assert ids == ["r1", "r2", "r3", "r0"]
+
+    def test_stream_respects_max_in_flight(self, pool):
+        requests = [(f"r{i}", messages(f"p{i}" + "." * d)) for i, d in enumerate([20, 1])]
+
+        ids = [request_id for request_id, _ in pool.generate_stream(requests, {}, max_in_flight=1)]
+
+        assert ids == ["r0", "r1"]
+
+    def test_dead_worker_fails_only_its_prompt(self, pool):
+        results = pool.generate([messages("crash"), messages("a."), messages("b.")], {})
+
+        assert results[0] == "Error generating text with Llama.cpp: worker 0 exited"
+        assert [r.split(" @")[0] for r in results[1:]] == ["A.", "B."]
+        assert pool.generate([messages("c")], {})[0].startswith("C")
+
+    def test_worker_dying_while_reporting_does_not_block_others(self, pool):
+        results = pool.generate(
+            [messages("crash while reporting"), messages("a."), messages("b.")], {}
+        )
+
+        assert results[0] == "Error generating text with Llama.cpp: worker 0 exited"
+        assert [r.split(" @")[0] for r in results[1:]] == ["A.", "B."]
+
+    def test_hung_worker_is_restarted(self):
+        pool = LlamaCppWorkerPool(
+            "model.gguf", {}, num_instances=2, worker_target=_sleep_worker, task_timeout=0.5
+        )
+        pool.POLL_INTERVAL = 0.1
+        pool.start()
+        try:
+            results = pool.generate([messages("hang"), messages("a."), messages("b.")], {})
+
+            assert results[0] == "Error generating text with Llama.cpp: worker 0 timed out after 0.5s"
+            assert [r.split(" @")[0] for r in results[1:]] == ["A.", "B."]
+            # The restarted worker takes prompts again
+            results = pool.generate([messages(f"c{i}" + "." * 10) for i in range(4)], {})
+            assert [r.split(" @")[0] for r in results] == [f"C{i}" + "." * 10 for i in range(4)]
+            assert pool._dead_ranks == set()
+        finally:
+            pool.shutdown()
+
+    def test_abandoned_batch_does_not_delay_next_one(self):
+        pool = LlamaCppWorkerPool(
+            "model.gguf", {}, num_instances=2, worker_target=_sleep_worker, task_timeout=1.0
+        )
+        pool.POLL_INTERVAL = 0.1
+        pool.start()
+
+        def interrupt(signum, frame):
+            raise TimeoutError("interrupted")
+
+        old_handler = signal.signal(signal.SIGALRM, interrupt)
+        try:
+            signal.setitimer(signal.ITIMER_REAL, 0.1)
+            with pytest.raises(TimeoutError):
+                pool.generate([messages("x" + "." * 80)] * 2, {})
+
+            # Dispatched once the abandoned prompts finish, so within task_timeout
+            results = pool.generate([messages("a" + "." * 50), messages("b" + "." * 50)], {})
+
+            assert [r.split(" @")[0] for r in results] == ["A" + "." * 50, "B" + "." * 50]
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, old_handler)
+            pool.shutdown()
+
+    def test_startup_error_is_raised(self):
+        pool = LlamaCppWorkerPool("broken", {}, num_instances=2, worker_target=_sleep_worker)
+        pool.POLL_INTERVAL = 0.1
+
+        with pytest.raises(RuntimeError, match="cannot load model"):
+            pool.start()
+        assert pool.processes == []
+
+    def test_cpus_split_evenly(self):
+        slices = LlamaCppWorkerPool._split_cpus(2)
+
+        assert len(slices) == 2
+        assert len(slices[0]) == len(slices[1])
+        if len(slices[0]) > 0 and os.cpu_count() > 1:
+            assert not set(slices[0]) & set(slices[1])
+
+
+def test_completion_text():
+    assert _completion_text({"choices": [{"message": {"content": " hi "}}]}) == "hi"
+    assert _completion_text({"choices": []}).startswith("Error")
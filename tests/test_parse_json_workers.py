@@ -0,0 +1,80 @@
+"""
+Unit tests for parsing batch outputs as JSON in worker processes.
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from polysome.engines.base import Engine
+
+
+class JsonEngine(Engine):
+    """Stand-in engine that answers every prompt with a markdown JSON block."""
+
+    def __init__(self):
+        super().__init__("json")
+
+    def generate_text(self, messages, **kwargs):
+        return self.generate_text_batch([messages], **kwargs)[0]
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        outputs = []
+        for messages in messages_batch:
+            text = messages[-1]["content"]
+            if text == "bad":
+                outputs.append("not json")
+            else:
+                outputs.append(f"```json\n{{'text': '{text}', 'ok': True}}\n```")
+        return outputs
+
+    def supports_native_batching(self):
+        return True
+
+
+DATA = {str(i): {"id": str(i), "text": "bad" if i == 4 else f"t{i}"} for i in range(10)}
+
+
+class TestParseJsonWorkers:
+    """Test suite for parse_json_workers in TextPromptNode."""
+
+    def test_parsed_in_workers_and_written_in_order(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(
+            JsonEngine(), batch_size=3, parse_json=True, parse_json_workers=2, max_batches_in_flight=2
+        )
+        node.json_parse_pool = ProcessPoolExecutor(
+            max_workers=2, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            node._execute_processing(DATA, len(DATA))
+        finally:
+            node.json_parse_pool.shutdown()
+
+        rows = read_jsonl_rows(node.output_full_path)
+        assert [r["id"] for r in rows] == [str(i) for i in range(10)]
+        assert rows[0]["output"] == {"text": "t0", "ok": True}
+        assert rows[4]["output"] == "not json"
+        assert node.errors == []
+        assert not node._pending_parses
+
+    def test_failed_parse_job_falls_back_to_inline(self, make_text_prompt_node, read_jsonl_rows):
+        node = make_text_prompt_node(
+            JsonEngine(), batch_size=3, parse_json=True, parse_json_workers=1
+        )
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        pool.submit(len, []).result(timeout=30)
+        for process in list(pool._processes.values()):
+            process.kill()
+            process.join()
+        deadline = time.monotonic() + 10
+        while not pool._broken and time.monotonic() < deadline:
+            time.sleep(0.05)
+        node.json_parse_pool = pool
+
+        node._execute_processing(DATA, len(DATA))
+
+        rows = read_jsonl_rows(node.output_full_path)
+        assert [r["id"] for r in rows] == [str(i) for i in range(10)]
+        assert rows[9]["output"] == {"text": "t9", "ok": True}
+        assert node.json_parse_pool is None
+        assert node.errors == []
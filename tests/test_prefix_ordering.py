@@ -0,0 +1,122 @@
+"""
+Unit tests for prefix-aware request ordering in TextPromptNode.
+
+Uses a real PromptFormatter with few-shot examples and a CPU stand-in
+engine that records the prompts of each batch.
+"""
+
+import json
+
+import pytest
+
+from polysome.engines.base import Engine
+from polysome.prompt_formatter import PromptFormatter
+
+
+class RecordingEngine(Engine):
+    """Stand-in engine that records each batch it receives."""
+
+    def __init__(self):
+        super().__init__("recording")
+        self.batches = []
+
+    def generate_text(self, messages, **kwargs):
+        return self.generate_text_batch([messages], **kwargs)[0]
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        self.batches.append(messages_batch)
+        return [m[-1]["content"].upper() for m in messages_batch]
+
+    def supports_native_batching(self):
+        return True
+
+
+@pytest.fixture
+def few_shot_formatter(temp_workspace):
+    """Real PromptFormatter with a long system prompt and ten few-shot examples."""
+    prompt_dir = temp_workspace["root"] / "gen"
+    prompt_dir.mkdir()
+    (prompt_dir / "system_prompt.txt").write_text("You label documents. " * 20)
+    (prompt_dir / "user_prompt.txt").write_text("Document: {{ text }}")
+    with open(prompt_dir / "few_shot.jsonl", "w", encoding="utf-8") as f:
+        for i in range(10):
+            f.write(json.dumps({"context": {"text": f"example {i}"}, "assistant": f"label {i}"}) + "\n")
+    return PromptFormatter(
+        system_prompt_path=prompt_dir / "system_prompt.txt",
+        user_prompt_template_path=prompt_dir / "user_prompt.txt",
+        few_shot_examples_path=prompt_dir / "few_shot.jsonl",
+        num_few_shots=2,
+    )
+
+
+# Interleaved so that input order alternates between two prompt families
+DATA = {
+    str(i): {"id": str(i), "text": ("alpha report " if i % 2 else "beta memo ") + str(i)}
+    for i in range(12)
+}
+
+
+class TestPrefixOrdering:
+    """Test suite for prefix_ordering in TextPromptNode."""
+
+    def test_batches_grouped_by_prefix_with_pinned_few_shots(
+        self, make_text_prompt_node, few_shot_formatter, read_jsonl_rows
+    ):
+        node = make_text_prompt_node(
+            RecordingEngine(), batch_size=3, num_few_shots=2, prefix_ordering=True
+        )
+        node.prompt_formatter = few_shot_formatter
+
+        node._execute_processing(DATA, len(DATA))
+
+        for batch in node.model.batches:
+            # Same few-shot examples for every prompt of a batch
+            assert len({json.dumps(m[1:-1]) for m in batch}) == 1
+            # And one prompt family per batch
+            assert len({m[-1]["content"].split()[1] for m in batch}) == 1
+
+        rows = read_jsonl_rows(node.output_full_path)
+        assert sorted(r["id"] for r in rows) == sorted(DATA)
+        assert all(r["output"] == f"DOCUMENT: {r['text'].upper()}" for r in rows)
+
+    def test_prefix_reuse_rate_reported(self, make_text_prompt_node, few_shot_formatter):
+        rates = {}
+        for ordering in (False, True):
+            node = make_text_prompt_node(
+                RecordingEngine(), batch_size=3, num_few_shots=2, prefix_ordering=ordering
+            )
+            node.prompt_formatter = few_shot_formatter
+            node._execute_processing(DATA, len(DATA))
+            rates[ordering] = node.prefix_reuse_rate
+
+        assert rates[True] > rates[False]
+        assert node._prepare_output_info("completed_successfully", 0)["prefix_reuse_rate"] == round(
+            rates[True], 4
+        )
+
+    def test_window_bounds_reordering(self, make_text_prompt_node, few_shot_formatter):
+        node = make_text_prompt_node(
+            RecordingEngine(),
+            batch_size=3,
+            num_few_shots=2,
+            prefix_ordering=True,
+            prefix_ordering_window=6,
+        )
+        node.prompt_formatter = few_shot_formatter
+
+        node._execute_processing(DATA, len(DATA))
+
+        # Items 0-5 are sorted among themselves before 6-11 are read
+        seen = [m[-1]["content"].split()[-1] for batch in node.model.batches for m in batch]
+        assert sorted(seen[:6], key=int) == [str(i) for i in range(6)]
+
+    def test_enables_vllm_prefix_caching(self, make_text_prompt_node):
+        node = make_text_prompt_node(prefix_ordering=True, inference_engine="vllm")
+        assert node.engine_options["enable_prefix_caching"] is True
+
+        node = make_text_prompt_node(
+            prefix_ordering=True,
+            inference_engine="vllm",
+            engine_options={"enable_prefix_caching": False},
+        )
+        assert node.engine_options["enable_prefix_caching"] is False
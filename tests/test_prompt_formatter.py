@@ -0,0 +1,83 @@
+"""
+Unit tests for PromptFormatter template compilation, few-shot caching and
+batch rendering.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from polysome.prompt_formatter import PromptFormatter
+
+
+@pytest.fixture
+def make_formatter(temp_workspace):
+    def _make(system_prompt="You are helpful.", num_few_shots=2):
+        prompt_dir = temp_workspace["root"] / "prompts"
+        prompt_dir.mkdir(exist_ok=True)
+        (prompt_dir / "system_prompt.txt").write_text(system_prompt)
+        (prompt_dir / "user_prompt.txt").write_text("Q: {{ question }}")
+        with open(prompt_dir / "few_shot.jsonl", "w", encoding="utf-8") as f:
+            for i in range(3):
+                f.write(json.dumps({"context": {"question": f"q{i}"}, "assistant": f"a{i}"}) + "\n")
+        return PromptFormatter(
+            system_prompt_path=prompt_dir / "system_prompt.txt",
+            user_prompt_template_path=prompt_dir / "user_prompt.txt",
+            few_shot_examples_path=prompt_dir / "few_shot.jsonl",
+            num_few_shots=num_few_shots,
+        )
+
+    return _make
+
+
+class TestPromptFormatter:
+    """Test suite for PromptFormatter rendering."""
+
+    def test_system_template_compiled_once(self, make_formatter):
+        formatter = make_formatter(system_prompt="Topic: {{ topic }}")
+
+        with patch.object(formatter.jinja_env, "from_string") as from_string:
+            messages = [formatter.create_messages({"topic": t, "question": "x"}) for t in "ab"]
+
+        from_string.assert_not_called()
+        assert [m[0]["content"] for m in messages] == ["Topic: a", "Topic: b"]
+        assert formatter.static_system_prompt is None
+
+    def test_static_system_prompt_rendered_once(self, make_formatter):
+        formatter = make_formatter(system_prompt="Be {{ 'brief' }}.")
+
+        with patch.object(formatter.system_template, "render") as render:
+            messages = formatter.create_messages({"question": "x"})
+
+        render.assert_not_called()
+        assert messages[0]["content"] == "Be brief."
+
+    def test_few_shot_renderings_cached(self, make_formatter):
+        formatter = make_formatter(num_few_shots=3)
+        formatter.create_messages({"question": "first"})
+
+        with patch.object(formatter.user_template, "render", return_value="Q: next") as render:
+            messages = formatter.create_messages({"question": "next"})
+
+        # Only the item's own prompt is rendered; the three examples are cached
+        assert render.call_count == 1
+        assert sorted(m["content"] for m in messages[1:-1:2]) == ["Q: q0", "Q: q1", "Q: q2"]
+
+    def test_create_messages_batch_matches_single(self, make_formatter):
+        formatter = make_formatter(system_prompt="Topic: {{ topic }}")
+        shots = formatter.render_few_shot_messages(formatter.few_shot_examples[:2])
+        contexts = [{"topic": "t1", "question": "x"}, {"topic": "t2", "question": "y"}]
+
+        batch = formatter.create_messages_batch(contexts, few_shot_messages=shots)
+
+        assert batch == [formatter.create_messages(c, few_shot_messages=shots) for c in contexts]
+        assert len(batch[0]) == 1 + 4 + 1
+
+    def test_seeded_few_shot_selection_is_stable(self, make_formatter):
+        formatter = make_formatter(num_few_shots=2)
+
+        picks = {tuple(e["assistant"] for e in formatter.select_few_shot_examples(seed=k)) for k in "ab"}
+        again = {tuple(e["assistant"] for e in formatter.select_few_shot_examples(seed=k)) for k in "ab"}
+
+        assert picks == again
@@ -0,0 +1,137 @@
+"""
+Unit tests for the shared engine request scheduler.
+
+Tests that batches submitted by several nodes are merged into common engine
+calls and that every node gets back exactly its own results.
+"""
+
+import threading
+import time
+
+import pytest
+
+from polysome.engines.base import Engine
+from polysome.engines.request_scheduler import SharedEngineScheduler
+
+
+class EchoEngine(Engine):
+    """CPU stand-in engine that echoes the last message content."""
+
+    def __init__(self, model_name="echo", delay=0.0):
+        super().__init__(model_name)
+        self.delay = delay
+        self.calls = []
+
+    def generate_text(self, messages, **kwargs):
+        return messages[-1]["content"]
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        self.calls.append((len(messages_batch), kwargs))
+        time.sleep(self.delay)
+        return [self.generate_text(m) for m in messages_batch]
+
+    def supports_native_batching(self):
+        return True
+
+
+def make_batch(prefix, size):
+    return [[{"role": "user", "content": f"{prefix}-{i}"}] for i in range(size)]
+
+
+class TestSharedEngineScheduler:
+    """Test suite for SharedEngineScheduler."""
+
+    @pytest.fixture
+    def engine(self):
+        return EchoEngine()
+
+    def test_concurrent_submissions_are_merged(self, engine):
+        scheduler = SharedEngineScheduler(engine, coalesce_window=0.2)
+        results = {}
+
+        def node(node_id):
+            results[node_id] = scheduler.generate_text_batch(
+                make_batch(node_id, 3), node_id=node_id, timeout=5, max_new_tokens=8
+            )
+
+        threads = [threading.Thread(target=node, args=(f"node{i}",)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        scheduler.shutdown()
+
+        assert engine.calls == [(9, {"max_new_tokens": 8})]
+        for i in range(3):
+            assert results[f"node{i}"] == [f"node{i}-{j}" for j in range(3)]
+
+    def test_different_generation_options_not_merged(self, engine):
+        scheduler = SharedEngineScheduler(engine, coalesce_window=0.1)
+        first = scheduler.submit(make_batch("a", 2), node_id="a", temperature=0.0)
+        second = scheduler.submit(make_batch("b", 2), node_id="b", temperature=0.7)
+
+        assert first.result(timeout=5) == ["a-0", "a-1"]
+        assert second.result(timeout=5) == ["b-0", "b-1"]
+        scheduler.shutdown()
+
+        assert sorted(size for size, _ in engine.calls) == [2, 2]
+
+    def test_max_batch_prompts_limits_merge(self, engine):
+        scheduler = SharedEngineScheduler(engine, max_batch_prompts=4, coalesce_window=0.1)
+        futures = [scheduler.submit(make_batch(f"n{i}", 3), node_id=f"n{i}") for i in range(2)]
+
+        for i, future in enumerate(futures):
+            assert future.result(timeout=5) == [f"n{i}-{j}" for j in range(3)]
+        scheduler.shutdown()
+
+        assert [size for size, _ in engine.calls] == [3, 3]
+
+    def test_engine_error_propagates_to_all_requests(self):
+        class FailingEngine(EchoEngine):
+            def generate_text_batch(self, messages_batch, **kwargs):
+                raise RuntimeError("CUDA out of memory")
+
+        scheduler = SharedEngineScheduler(FailingEngine(), coalesce_window=0.1)
+        futures = [scheduler.submit(make_batch(f"n{i}", 1), node_id=f"n{i}") for i in range(2)]
+
+        for future in futures:
+            with pytest.raises(RuntimeError, match="out of memory"):
+                future.result(timeout=5)
+        scheduler.shutdown()
+
+    def test_timeout(self):
+        scheduler = SharedEngineScheduler(EchoEngine(delay=1.0), coalesce_window=0)
+
+        with pytest.raises(TimeoutError):
+            scheduler.generate_text_batch(make_batch("slow", 1), node_id="slow", timeout=0.1)
+        scheduler.shutdown()
+
+    def test_token_counting_waits_for_running_batch(self):
+        class TokenizingEngine(EchoEngine):
+            """Fails like an HF fast tokenizer used from two threads at once."""
+
+            def __init__(self):
+                super().__init__(delay=0.3)
+                self.busy = threading.Lock()
+
+            def generate_text_batch(self, messages_batch, **kwargs):
+                if not self.busy.acquire(blocking=False):
+                    raise RuntimeError("Already borrowed")
+                try:
+                    return super().generate_text_batch(messages_batch, **kwargs)
+                finally:
+                    self.busy.release()
+
+            def count_prompt_tokens(self, messages_batch):
+                if not self.busy.acquire(blocking=False):
+                    raise RuntimeError("Already borrowed")
+                self.busy.release()
+                return [1] * len(messages_batch)
+
+        scheduler = SharedEngineScheduler(TokenizingEngine(), coalesce_window=0)
+        future = scheduler.submit(make_batch("a", 2), node_id="a")
+        time.sleep(0.1)
+
+        assert scheduler.count_prompt_tokens(make_batch("b", 3)) == [1, 1, 1]
+        assert future.result(timeout=5) == ["a-0", "a-1"]
+        scheduler.shutdown()
@@ -0,0 +1,228 @@
+"""
+Unit tests for the on-disk response cache and the CachedEngine wrapper.
+"""
+
+import json
+
+from polysome.engines.base import Engine
+from polysome.engines.response_cache import (
+    CachedEngine,
+    ResponseCache,
+    is_deterministic,
+)
+from polysome.prompt_formatter import PromptFormatter
+
+
+def messages(text):
+    return [{"role": "user", "content": text}]
+
+
+class CountingEngine(Engine):
+    """Stand-in engine that records every prompt it generates for."""
+
+    def __init__(self):
+        super().__init__("counting")
+        self.prompts = []
+
+    def generate_text(self, messages, **kwargs):
+        return self.generate_text_batch([messages], **kwargs)[0]
+
+    def generate_text_batch(self, messages_batch, **kwargs):
+        self.prompts.extend(m[-1]["content"] for m in messages_batch)
+        return [f"out {m[-1]['content']}" for m in messages_batch]
+
+    def supports_native_batching(self):
+        return True
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache storage and eviction."""
+
+    def test_hits_and_misses_are_counted(self, temp_workspace):
+        cache = ResponseCache(temp_workspace["output_dir"] / "cache.sqlite", 1 << 20)
+        cache.put_many([("a", "alpha")])
+
+        assert cache.get_many(["a", "b"]) == {"a": "alpha"}
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["size_bytes"] == len("alpha")
+
+    def test_evicts_least_recently_used(self, temp_workspace):
+        cache = ResponseCache(temp_workspace["output_dir"] / "cache.sqlite", 30)
+        cache.put_many([("a", "x" * 10), ("b", "x" * 10)])
+        cache.get_many(["a"])  # b is now the least recently used
+        cache.put_many([("c", "x" * 15)])
+
+        assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+        assert cache.stats()["size_bytes"] <= 30
+
+    def test_persists_across_instances(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "cache.sqlite"
+        ResponseCache(path, 1 << 20).put_many([("a", "alpha")])
+
+        reopened = ResponseCache(path, 1 << 20)
+        assert reopened.get_many(["a"]) == {"a": "alpha"}
+        assert reopened.stats()["size_bytes"] == len("alpha")
+
+    def test_is_deterministic(self):
+        assert is_deterministic({"temperature": 0})
+        assert is_deterministic({"temperature": 0.8, "seed": 7})
+        assert is_deterministic({"do_sample": False})
+        assert not is_deterministic({"temperature": 0.7})
+        assert not is_deterministic({})
+
+
+class TestCachedEngine:
+    """Test suite for serving completions from the cache."""
+
+    def make_engine(self, temp_workspace):
+        inner = CountingEngine()
+        cache = ResponseCache(temp_workspace["output_dir"] / "cache.sqlite", 1 << 20)
+        return inner, CachedEngine(inner, cache, "counting", {"opt": 1})
+
+    def test_only_misses_reach_the_engine(self, temp_workspace):
+        inner, engine = self.make_engine(temp_workspace)
+        engine.generate_text_batch([messages("a"), messages("b")], temperature=0)
+
+        outputs = engine.generate_text_batch(
+            [messages("b"), messages("c"), messages("a")], temperature=0
+        )
+
+        assert outputs == ["out b", "out c", "out a"]
+        assert inner.prompts == ["a", "b", "c"]
+        assert (engine.hits, engine.misses) == (2, 3)
+
+    def test_key_includes_generation_options(self, temp_workspace):
+        inner, engine = self.make_engine(temp_workspace)
+        engine.generate_text_batch([messages("a")], temperature=0)
+        engine.generate_text_batch([messages("a")], temperature=0, max_tokens=5)
+
+        assert inner.prompts == ["a", "a"]
+
+    def test_sampling_bypasses_cache(self, temp_workspace):
+        inner, engine = self.make_engine(temp_workspace)
+        engine.generate_text_batch([messages("a")], temperature=0.7)
+        engine.generate_text_batch([messages("a")], temperature=0.7)
+
+        assert inner.prompts == ["a", "a"]
+        assert engine.cache.stats()["size_bytes"] == 0
+
+    def test_error_outputs_are_not_cached(self, temp_workspace):
+        inner, engine = self.make_engine(temp_workspace)
+        inner.generate_text_batch = lambda batch, **kw: ["Error generating text: boom"]
+        engine.generate_text_batch([messages("a")], temperature=0)
+
+        assert engine.cache.stats()["size_bytes"] == 0
+
+    def test_submitted_batches_merge_hits_and_misses(self, temp_workspace):
+        inner, engine = self.make_engine(temp_workspace)
+        engine.generate_text_batch([messages("a")], temperature=0)
+
+        future = engine.submit_text_batch([messages("b"), messages("a")], temperature=0)
+
+        assert future.result(timeout=5) == ["out b", "out a"]
+        assert inner.prompts == ["a", "b"]
+
+    def test_stream_answers_hits_without_engine(self, temp_workspace):
+        inner, engine = self.make_engine(temp_workspace)
+        engine.generate_text_batch([messages("a")], temperature=0)
+
+        requests = [("r0", messages("a")), ("r1", messages("b"))]
+        results = {r: out for r, out, _ in engine.generate_text_stream(requests, 2, temperature=0)}
+
+        assert results == {"r0": "out a", "r1": "out b"}
+        assert inner.prompts == ["a", "b"]
+
+
+class TestTextPromptNodeResponseCache:
+    """Test suite for the response_cache parameter of TextPromptNode."""
+
+    def test_rerun_is_served_from_cache(
+        self, temp_workspace, make_text_prompt_node, read_jsonl_rows
+    ):
+        data = {str(i): {"id": str(i), "text": str(i)} for i in range(4)}
+        engines = []
+        for _ in range(2):
+            node = make_text_prompt_node(
+                CountingEngine(),
+                batch_size=2,
+                response_cache=True,
+                generation_options={"temperature": 0},
+            )
+            engines.append(node.model)
+            node._setup_response_cache()
+            node._execute_processing(data, len(data))
+
+        outputs = read_jsonl_rows(node.output_full_path, "output")
+        assert outputs == [f"out {i}" for i in range(4)]
+        assert engines[0].prompts == ["0", "1", "2", "3"]
+        assert engines[1].prompts == []
+        assert node.cached_engine.hits == 4
+        assert (temp_workspace["output_dir"] / node.RESPONSE_CACHE_FILE).exists()
+
+    def make_few_shot_node(self, temp_workspace, make_text_prompt_node, **params):
+        prompt_dir = temp_workspace["root"] / "gen"
+        if not prompt_dir.exists():
+            prompt_dir.mkdir()
+            (prompt_dir / "system_prompt.txt").write_text("Answer.")
+            (prompt_dir / "user_prompt.txt").write_text("{{ text }}")
+            with open(prompt_dir / "few_shot.jsonl", "w", encoding="utf-8") as f:
+                for i in range(6):
+                    f.write(json.dumps({"context": {"text": f"q{i}"}, "assistant": f"a{i}"}) + "\n")
+        node = make_text_prompt_node(
+            CountingEngine(),
+            num_few_shots=2,
+            response_cache=True,
+            generation_options={"temperature": 0},
+            **params,
+        )
+        node.prompt_formatter = PromptFormatter(
+            system_prompt_path=prompt_dir / "system_prompt.txt",
+            user_prompt_template_path=prompt_dir / "user_prompt.txt",
+            few_shot_examples_path=prompt_dir / "few_shot.jsonl",
+            num_few_shots=2,
+        )
+        node._setup_response_cache()
+        return node
+
+    def test_rerun_with_few_shots_is_served_from_cache(self, temp_workspace, make_text_prompt_node):
+        data = {str(i): {"id": str(i), "text": str(i)} for i in range(8)}
+
+        engines = []
+        for _ in range(2):
+            node = self.make_few_shot_node(temp_workspace, make_text_prompt_node, batch_size=4)
+            engines.append(node.model.engine)
+            node._execute_processing(data, len(data))
+
+        assert len(engines[0].prompts) == 8
+        assert engines[1].prompts == []
+        assert node.cached_engine.hits == 8
+
+    def test_resume_with_prefix_ordering_is_served_from_cache(
+        self, temp_workspace, make_text_prompt_node
+    ):
+        data = {str(i): {"id": str(i), "text": str(i)} for i in range(8)}
+        first = self.make_few_shot_node(
+            temp_workspace, make_text_prompt_node, batch_size=2, prefix_ordering=True
+        )
+        first._execute_processing(data, len(data))
+
+        # Resume after half of the rows were written: the remaining items
+        # form other groups, here also with another batch size
+        remaining = {key: row for key, row in data.items() if int(key) % 2}
+        resumed = self.make_few_shot_node(
+            temp_workspace, make_text_prompt_node, batch_size=4, prefix_ordering=True, resume=True
+        )
+        resumed._execute_processing(remaining, len(remaining))
+
+        assert resumed.model.engine.prompts == []
+        assert (resumed.cached_engine.hits, resumed.cached_engine.misses) == (4, 0)
+
+    def test_cache_disabled_for_sampling(self, make_text_prompt_node):
+        node = make_text_prompt_node(
+            CountingEngine(), response_cache=True, generation_options={"temperature": 0.7}
+        )
+        node._setup_response_cache()
+
+        assert node.cached_engine is None
+        assert isinstance(node.model, CountingEngine)
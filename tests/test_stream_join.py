@@ -0,0 +1,155 @@
+"""
+Unit tests for the streaming join engine and the combine intermediate
+outputs node that uses it.
+"""
+
+import json
+
+import pytest
+
+from polysome.nodes.combine_outputs_node import CombineIntermediateOutputsNode
+from polysome.utils import stream_join
+from polysome.utils.stream_join import StreamingJoin, is_key_sorted
+
+
+def write_jsonl(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+    return path
+
+
+@pytest.fixture
+def sources(temp_workspace):
+    """Three outputs over overlapping key ranges, in shuffled key order."""
+    data_dir = temp_workspace["data_dir"]
+    specs = {"a": range(0, 40), "b": range(10, 50), "c": range(5, 45, 2)}
+    paths = {}
+    for name, keys in specs.items():
+        keys = sorted(keys, key=lambda k: (k * 7) % 13)
+        paths[name] = write_jsonl(
+            data_dir / f"{name}.jsonl",
+            [{"id": f"k{k:03d}", name: f"{name}{k}"} for k in keys],
+        )
+    return paths
+
+
+def expected_keys(how):
+    a, b, c = set(range(0, 40)), set(range(10, 50)), set(range(5, 45, 2))
+    keys = {"inner": a & b & c, "left": a, "outer": a | b | c}[how]
+    return {f"k{k:03d}" for k in keys}
+
+
+class TestStreamingJoin:
+    """Test suite for StreamingJoin."""
+
+    @pytest.mark.parametrize("how", ["inner", "left", "outer"])
+    @pytest.mark.parametrize("budget", [1 << 30, 512])
+    def test_hash_join_matches_expected_keys(self, temp_workspace, sources, how, budget):
+        join = StreamingJoin(
+            sources, "id", how=how, memory_budget_bytes=budget,
+            spill_dir=temp_workspace["output_dir"] / "spill",
+        )
+
+        rows = dict(join)
+
+        assert join.strategy == "hash"
+        assert (join.partitions > 1) == (budget == 512)
+        assert set(rows) == expected_keys(how)
+        for key, dep_rows in rows.items():
+            k = int(key[1:])
+            assert dep_rows["a"] == ({"id": key, "a": f"a{k}"} if k < 40 else None)
+        assert join.row_counts == {"a": 40, "b": 40, "c": 20}
+        # Partition files are removed once joined
+        spill_dir = temp_workspace["output_dir"] / "spill"
+        assert not spill_dir.exists() or list(spill_dir.iterdir()) == []
+
+    @pytest.mark.parametrize("how", ["inner", "left", "outer"])
+    def test_sorted_inputs_are_merged_in_key_order(self, temp_workspace, sources, how):
+        sorted_sources = {}
+        for name, path in sources.items():
+            with open(path, encoding="utf-8") as f:
+                rows = sorted((json.loads(line) for line in f), key=lambda r: r["id"])
+            sorted_sources[name] = write_jsonl(path.with_name(f"sorted_{name}.jsonl"), rows)
+        assert all(is_key_sorted(path, "id") for path in sorted_sources.values())
+
+        join = StreamingJoin(sorted_sources, "id", how=how)
+        keys = [key for key, _ in join]
+
+        assert join.strategy == "merge"
+        assert keys == sorted(expected_keys(how))
+
+    def test_duplicate_keys_keep_last_row(self, temp_workspace):
+        data_dir = temp_workspace["data_dir"]
+        left = write_jsonl(data_dir / "l.jsonl", [{"id": "1", "v": "old"}, {"id": "1", "v": "new"}])
+        right = write_jsonl(data_dir / "r.jsonl", [{"id": "1", "w": "x"}])
+
+        for unsorted in (False, True):
+            if unsorted:
+                write_jsonl(left, [{"id": "2", "v": "z"}, {"id": "1", "v": "old"}, {"id": "1", "v": "new"}])
+            rows = dict(StreamingJoin({"l": left, "r": right}, "id"))
+            assert rows["1"]["l"]["v"] == "new"
+
+
+class TestCombineIntermediateOutputsNode:
+    """Test suite for combining dependency outputs with the streaming join."""
+
+    def test_combines_without_loading_whole_outputs(self, temp_workspace, sources):
+        node = CombineIntermediateOutputsNode(
+            node_id="combine",
+            node_type="combine_intermediate_outputs",
+            parent_wf_name="wf",
+            data_dir=temp_workspace["data_dir"],
+            output_dir=temp_workspace["output_dir"],
+            prompts_dir=temp_workspace["root"],
+            params={
+                "join_strategy": "left",
+                "join_memory_mb": 1,
+                "column_mapping": {"a": "A", "b": "B", "c": "C"},
+            },
+        )
+        input_data = {
+            name: {"output_path": str(path), "primary_key": "id", "output_attribute": name}
+            for name, path in sources.items()
+        }
+
+        result = node.run(input_data)
+
+        assert result["status"] == "completed_successfully"
+        with open(result["output_path"], encoding="utf-8") as f:
+            rows = {row["id"]: row for row in map(json.loads, f)}
+        assert set(rows) == expected_keys("left")
+        assert rows["k007"] == {"id": "k007", "A": "a7", "B": None, "C": "c7"}
+
+    def test_dependencies_read_only_their_output_attribute(self, temp_workspace, sources, monkeypatch):
+        projections = {}
+        original_loader = stream_join.DataFileLoader
+
+        def recording_loader(path, key_field, columns=None):
+            projections[path.stem] = columns
+            return original_loader(path, key_field, columns)
+
+        monkeypatch.setattr(stream_join, "DataFileLoader", recording_loader)
+        node = CombineIntermediateOutputsNode(
+            node_id="combine",
+            node_type="combine_intermediate_outputs",
+            parent_wf_name="wf",
+            data_dir=temp_workspace["data_dir"],
+            output_dir=temp_workspace["output_dir"],
+            prompts_dir=temp_workspace["root"],
+            params={
+                "column_mapping": {"a": "A", "b": "B", "c": "C"},
+                "handle_conflicts": "suffix_source",
+                "retain_original_attributes": True,
+            },
+        )
+        input_data = {
+            name: {"output_path": str(path), "primary_key": "id", "output_attribute": name}
+            for name, path in sources.items()
+        }
+
+        result = node.run(input_data)
+
+        assert result["status"] == "completed_successfully"
+        # The original-attribute source "a" is read whole, the others projected
+        assert projections == {"a": None, "b": ["b"], "c": ["c"]}
@@ -0,0 +1,129 @@
+"""
+Unit tests for streaming edges between JSONL processing nodes.
+
+Tests that a downstream node consumes records from a running upstream node
+as soon as they are written, instead of waiting for the upstream to finish.
+"""
+
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from polysome.utils.jsonl_tail import follow_jsonl
+from polysome.workflow import Workflow
+
+
+class TestFollowJsonl:
+    """Test suite for tailing a growing JSONL file."""
+
+    def test_reads_rows_written_after_open(self, temp_workspace):
+        path = temp_workspace["output_dir"] / "growing.jsonl"
+        path.write_text("")
+        finished = threading.Event()
+
+        def writer():
+            with open(path, "a", encoding="utf-8") as f:
+                for i in range(5):
+                    f.write(json.dumps({"id": str(i)}) + "\n")
+                    f.flush()
+                    time.sleep(0.02)
+                # Half-written row completed later must still be parsed whole
+                f.write('{"id": ')
+                f.flush()
+                time.sleep(0.05)
+                f.write('"5"}\n')
+            finished.set()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        records = list(follow_jsonl(path, finished, poll_interval=0.01))
+        thread.join()
+
+        assert [r["id"] for r in records] == [str(i) for i in range(6)]
+
+
+class TestStreamingWorkflow:
+    """Test suite for streaming edges in concurrent workflow execution."""
+
+    def make_workflow(self, temp_workspace):
+        config = {
+            "name": "streaming_test",
+            "data_dir": str(temp_workspace["data_dir"]),
+            "output_dir": str(temp_workspace["output_dir"]),
+            "prompts_dir": str(temp_workspace["root"]),
+            "workflow_settings": {"execution_mode": "concurrent", "max_workers": 2},
+            "nodes": [
+                {
+                    "id": "producer",
+                    "type": "sentence_split",
+                    "params": {"name": "producer", "input_data_path": "input.jsonl", "primary_key": "id"},
+                    "dependencies": [],
+                },
+                {
+                    "id": "consumer",
+                    "type": "sentence_split",
+                    "params": {"name": "consumer", "stream_input": True, "stream_poll_interval": 0.01},
+                    "dependencies": ["producer"],
+                },
+            ],
+        }
+        config_path = temp_workspace["root"] / "workflow.json"
+        config_path.write_text(json.dumps(config))
+        return Workflow(config_path)
+
+    def test_consumer_fails_when_producer_fails(
+        self, temp_workspace, create_jsonl_file, make_transform_node
+    ):
+        create_jsonl_file("input.jsonl", [{"id": str(i), "text": f"case {i}"} for i in range(5)])
+        workflow = self.make_workflow(temp_workspace)
+
+        def instantiate(node_id):
+            node = make_transform_node(
+                node_id, delay=0.01, **workflow.nodes_config[node_id]["params"]
+            )
+            if node_id == "producer":
+                execute = node._execute_processing
+
+                def write_then_fail(data_to_process, items_count):
+                    # Writes its rows, then fails as if a processing step had raised
+                    execute(data_to_process, items_count)
+                    node.status = "failed_processing_execution"
+
+                node._execute_processing = write_then_fail
+            return node
+
+        with patch.object(workflow, "_instantiate_node", side_effect=instantiate):
+            assert workflow.run(validate_first=False) is False
+
+        consumer_output = workflow.node_outputs["consumer"]
+        assert consumer_output["status"] == "failed_input_stream"
+        assert "producer" in workflow.node_instances["consumer"].errors[-1]
+
+    def test_consumer_starts_before_producer_finishes(
+        self, temp_workspace, create_jsonl_file, make_transform_node, read_jsonl_rows
+    ):
+        data = [{"id": str(i), "text": f"case {i}"} for i in range(10)]
+        create_jsonl_file("input.jsonl", data)
+        workflow = self.make_workflow(temp_workspace)
+
+        def instantiate(node_id):
+            return make_transform_node(
+                node_id,
+                delay=0.05 if node_id == "producer" else 0.0,
+                **workflow.nodes_config[node_id]["params"],
+            )
+
+        with patch.object(workflow, "_instantiate_node", side_effect=instantiate):
+            assert workflow.run(validate_first=False) is True
+
+        producer = workflow.node_instances["producer"]
+        consumer = workflow.node_instances["consumer"]
+        assert consumer.stream_source is producer
+        assert consumer.processed_at[0] < producer.processed_at[-1]
+
+        output_path = workflow.node_outputs["consumer"]["output_path"]
+        rows = read_jsonl_rows(output_path)
+        assert sorted(r["id"] for r in rows) == sorted(d["id"] for d in data)
+        assert all(r["output"] == r["text"].upper() for r in rows)
+        assert workflow.node_outputs["consumer"]["status"] == "completed_successfully"